@@ -1,8 +1,10 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from config import settings
 from database import get_database
 from models import User
+from services.user_state import user_state
+from services.rate_limiter import rate_limiter, limit_headers
 from datetime import datetime, timedelta
 import httpx
 import jwt
@@ -13,7 +15,6 @@ import asyncio
 security = HTTPBearer()
 
 jwks_cache = TTLCache(maxsize=1, ttl=3600)
-user_cache = TTLCache(maxsize=1000, ttl=300)
 profile_update_tracker = TTLCache(maxsize=1000, ttl=3600)
 cache_lock = asyncio.Lock()
 
@@ -79,11 +80,9 @@ class ClerkAuth:
 clerk_auth = ClerkAuth()
 
 async def get_or_create_user(clerk_user_id: str) -> User:
-    cache_key = f"user_{clerk_user_id}"
-    
-    async with cache_lock:
-        if cache_key in user_cache:
-            return user_cache[cache_key]
+    user = user_state.get(clerk_user_id)
+    if user:
+        return user
     
     database = await get_database()
     collection = database["users"]
@@ -99,10 +98,7 @@ async def get_or_create_user(clerk_user_id: str) -> User:
             existing_user["reactify_count"] = 0
         
         existing_user["id"] = str(existing_user["_id"])
-        user = User(**existing_user)
-        async with cache_lock:
-            user_cache[cache_key] = user
-        return user
+        return user_state.put(User(**existing_user))
     
     new_user_data = {
         "clerk_id": clerk_user_id,
@@ -119,9 +115,7 @@ async def get_or_create_user(clerk_user_id: str) -> User:
     result = await collection.insert_one(new_user_data)
     new_user_data["id"] = str(result.inserted_id)
     
-    user = User(**new_user_data)
-    async with cache_lock:
-        user_cache[cache_key] = user
+    user = user_state.put(User(**new_user_data))
     
     asyncio.create_task(update_user_profile_once(clerk_user_id))
     
@@ -162,14 +156,12 @@ async def update_user_profile_once(clerk_user_id: str):
                     {"$set": update_data}
                 )
                 
-                cache_key = f"user_{clerk_user_id}"
-                async with cache_lock:
-                    if cache_key in user_cache:
-                        del user_cache[cache_key]
+                user_state.update(clerk_user_id, update_data)
     except:
         pass
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> User:
     if not credentials:
@@ -187,6 +179,14 @@ async def get_current_user(
             detail="Invalid token: no user ID"
         )
 
+    decision = await rate_limiter.check_user(clerk_user_id, request.url.path)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded. Please try again later.",
+            headers=limit_headers(decision)
+        )
+
     user = await get_or_create_user(clerk_user_id)
     
     return user
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""Archive build time and size with the compression policy, against deflating every entry.
+
+    python -m benchmarks.bench_archive [--scale 1.0] [--repeat 5] [--level 6]
+
+The fixture is asset heavy, about 56 MB at scale 1: 100 jpg/webp images,
+30 woff2 fonts, 4 mp4 files, 30 JS/CSS bundles and 25 synthetic pages. The
+binary files are random bytes, so they are as incompressible as real ones.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import zipfile
+from benchmarks.synthetic_site import page_html
+from scraper.archive import ArchiveWriter, CompressionPolicy
+from services.file_service import FileService
+
+
+class DeflateEverything(CompressionPolicy):
+    """The behaviour before the policy: every entry deflated"""
+
+    @staticmethod
+    def compress_type(arcname):
+        return zipfile.ZIP_DEFLATED
+
+
+def build_fixture(directory: str, scale: float):
+    rng = random.Random(0)
+
+    def write(path, data):
+        path = os.path.join(directory, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    for i in range(100):
+        write(f"images/photo-{i}.{'jpg' if i % 2 else 'webp'}", rng.randbytes(int(300_000 * scale)))
+    for i in range(30):
+        write(f"fonts/font-{i}.woff2", rng.randbytes(int(60_000 * scale)))
+    for i in range(4):
+        write(f"media/clip-{i}.mp4", rng.randbytes(int(5_000_000 * scale)))
+    for i in range(30):
+        line = f"function handler{i}(event) {{ return document.querySelector('#item-{i}').dataset.value; }}\n"
+        write(f"js/bundle-{i}.{'js' if i % 2 else 'css'}", (line * int(1_000 * scale)).encode())
+    for i in range(25):
+        write(f"page_{i}.html", page_html(i, 1000, int(700 * scale), 0.5, 10).encode())
+
+
+def fixture_files(directory: str):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            yield path, os.path.relpath(path, directory)
+
+
+def file_service_zip(directory: str, zip_path: str, compression: CompressionPolicy):
+    FileService.create_zip(directory, zip_path, compression)
+
+
+def archive_writer_zip(directory: str, zip_path: str, compression: CompressionPolicy):
+    async def write():
+        async with ArchiveWriter(zip_path, compression) as archive:
+            for path, arcname in fixture_files(directory):
+                await archive.write_file(arcname, path)
+    asyncio.run(write())
+
+
+def measure(build, directory: str, zip_path: str, policy, level: int, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build(directory, zip_path, policy(level))
+        timings.append(time.perf_counter() - started)
+        size = os.path.getsize(zip_path)
+        os.remove(zip_path)
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for every fixture file's size")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--level", type=int, default=6, help="Deflate level")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fixture = os.path.join(workdir, "fixture")
+        build_fixture(fixture, args.scale)
+        total = sum(os.path.getsize(path) for path, _ in fixture_files(fixture))
+        print(f"fixture: {total / 1e6:.2f} MB, median of {args.repeat} runs")
+
+        zip_path = os.path.join(workdir, "out.zip")
+        for name, build in (("FileService.create_zip", file_service_zip), ("ArchiveWriter", archive_writer_zip)):
+            before, before_size = measure(build, fixture, zip_path, DeflateEverything, args.level, args.repeat)
+            after, after_size = measure(build, fixture, zip_path, CompressionPolicy, args.level, args.repeat)
+            print(
+                f"{name:24} {before:.3f}s -> {after:.3f}s   "
+                f"({before_size / 1e6:.2f} MB -> {after_size / 1e6:.2f} MB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Wall and CPU time for GeneralScraper.discover_pages on the synthetic site.
+
+    python -m benchmarks.bench_discovery [--pages 1000 --links 2000 --latency 0.02] [--repeat 3]
+
+Each run times the sequential breadth-first crawl discovery used before the
+concurrent frontier, then the current discover_pages. The baseline never
+reads sitemaps, so compare without --sitemap. The parser backend
+follows HTML_PARSER, e.g. HTML_PARSER=html.parser.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urljoin, urlparse
+from benchmarks.synthetic_site import add_site_arguments, site_options, start_server
+from scraper.html_parser import DEFAULT_PARSER, make_soup
+from services.general_scraper import GeneralScraper
+
+
+class SequentialDiscovery(GeneralScraper):
+    """The crawl before the concurrent frontier: one page at a time, with list-based visited checks"""
+
+    async def discover_pages(self, start_url):
+        self.base_domain = urlparse(start_url).netloc
+        pages = []
+        to_visit = [start_url]
+        visited = set()
+
+        while to_visit and len(pages) < self.MAX_DISCOVERED_PAGES:
+            url = to_visit.pop(0)
+            if url in visited:
+                continue
+            visited.add(url)
+
+            try:
+                async with self.session.get(url) as response:
+                    if response.status != 200 or 'text/html' not in response.headers.get('content-type', ''):
+                        continue
+                    content = await response.text()
+            except Exception:
+                continue
+
+            soup = make_soup(content)
+            title = soup.find('title')
+            pages.append({
+                'url': url,
+                'title': title.get_text().strip() if title else urlparse(url).path,
+                'path': urlparse(url).path or '/'
+            })
+
+            for link in soup.find_all('a', href=True):
+                absolute_url = urljoin(url, link['href'])
+                if (self.is_same_domain(absolute_url) and
+                        absolute_url not in visited and
+                        absolute_url not in to_visit and
+                        not any(ext in absolute_url.lower() for ext in ['.pdf', '.doc', '.zip', '.exe']) and
+                        '#' not in absolute_url):
+                    to_visit.append(absolute_url)
+
+        return pages
+
+
+async def discover(base_url: str, scraper_class=GeneralScraper):
+    async with scraper_class() as scraper:
+        return await scraper.discover_pages(base_url)
+
+
+def timed(base_url: str, scraper_class):
+    wall, cpu = time.perf_counter(), time.process_time()
+    pages = asyncio.run(discover(base_url, scraper_class))
+    return len(pages), time.perf_counter() - wall, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_site_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base_url, server = start_server(**site_options(args))
+    try:
+        for run in range(1, args.repeat + 1):
+            old_pages, old_wall, old_cpu = timed(base_url, SequentialDiscovery)
+            pages, wall, cpu = timed(base_url, GeneralScraper)
+            print(
+                f"run {run}: sequential {old_pages} pages in {old_wall:.2f}s wall, {old_cpu:.2f}s CPU; "
+                f"frontier {pages} pages in {wall:.2f}s wall, {cpu:.2f}s CPU; "
+                f"{old_wall / wall:.1f}x wall, {old_cpu / cpu:.1f}x CPU ({DEFAULT_PARSER})"
+            )
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
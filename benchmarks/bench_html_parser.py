@@ -0,0 +1,53 @@
+"""Parse+serialize timings for each HTML parser backend on synthetic pages.
+
+    python -m benchmarks.bench_html_parser [--sections 40 400 1600] [--repeat 3]
+"""
+import argparse
+import time
+from scraper.html_parser import make_soup, FALLBACK_PARSER
+
+SECTION = """
+<section class="feature feature-{i}" id="feature-{i}">
+  <div class="container"><div class="row">
+    <div class="col"><h2 class="title">Feature {i}</h2>
+      <p class="lead">Paragraph {i} with <a href="/page/{i}">a link</a>, <strong>bold</strong> and <em>emphasis</em>.</p>
+      <img src="/images/{i}.png" srcset="/images/{i}.png 1x, /images/{i}@2x.png 2x" alt="Image {i}">
+      <ul><li>First</li><li>Second<li>Unclosed third</ul>
+    </div>
+    <div class="col" style="background-image: url('/images/bg-{i}.jpg')"><button data-id="{i}">Go</button></div>
+  </div></div>
+</section>"""
+
+
+def synthetic_page(sections: int) -> str:
+    body = "".join(SECTION.format(i=i) for i in range(sections))
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Synthetic</title>'
+        '<link rel="stylesheet" href="/css/site.css"><script src="/js/app.js"></script></head>'
+        f'<body><nav><a href="/">Home</a></nav><main>{body}</main></body></html>'
+    )
+
+
+def parse_and_serialize(markup: str, parser: str):
+    started = time.perf_counter()
+    str(make_soup(markup, parser=parser))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[40, 400, 1600])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for sections in args.sections:
+        markup = synthetic_page(sections)
+        timings = []
+        for backend in (FALLBACK_PARSER, "lxml"):
+            mean = sum(parse_and_serialize(markup, backend) for _ in range(args.repeat)) / args.repeat
+            timings.append(f"{backend} {mean * 1000:.0f} ms")
+        print(f"{len(markup) / 1024:8.0f} KiB: {', '.join(timings)}")
+
+
+if __name__ == "__main__":
+    main()
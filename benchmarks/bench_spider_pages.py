@@ -0,0 +1,89 @@
+"""CPU time for a spider to process one page: parse, extract assets and links, transform, serialize.
+
+    python -m benchmarks.bench_spider_pages [--platform framer] [--links 700 3500] [--repeat 5]
+
+Pages come from the synthetic site (about 33 KiB and 167 KiB by default) and
+are processed offline, so only page processing is timed. The parser backend
+follows HTML_PARSER.
+
+The baseline is the pipeline from before pages were parsed once: two regex
+passes over the raw page, a second parse for link rewriting, then badge
+removal on a third parse of the serialized result, as each spider's
+remove_platform_badge used to do. It applies today's badge rules, so the
+difference is the extra passes, not the rules.
+"""
+import argparse
+import importlib
+import re
+import time
+from urllib.parse import urlparse
+from benchmarks.synthetic_site import page_html
+from scraper.base_spider import BaseSiteSpider
+from scraper.html_parser import make_soup, DEFAULT_PARSER
+
+BASE_URL = "https://example.com/page/1"
+
+
+def spider_class(platform: str):
+    module = importlib.import_module(f"scraper.{platform}_spider")
+    for value in vars(module).values():
+        if isinstance(value, type) and issubclass(value, BaseSiteSpider) and value.platform == platform:
+            return value
+    raise ValueError(f"No spider for platform {platform}")
+
+
+def process_page(spider: BaseSiteSpider, html: str):
+    soup = make_soup(html)
+    spider.extract_asset_urls(soup)
+    spider.extract_internal_links(soup, BASE_URL)
+    return spider.transform_page(soup, BASE_URL)
+
+
+def baseline_process_page(spider: BaseSiteSpider, html: str):
+    soup = make_soup(html)
+    spider.extract_asset_urls(soup)
+    spider.extract_internal_links(soup, BASE_URL)
+
+    domain = urlparse(BASE_URL).netloc
+    html = re.sub(rf'https?://{re.escape(domain)}/', './', html)
+    html = re.sub(rf'https?://{re.escape(domain)}', '.', html)
+    rewritten = make_soup(html)
+    current_page_path = spider.get_clean_path(BASE_URL)
+    for link in rewritten.find_all('a', href=True):
+        link['href'] = spider.rewrite_page_link(link['href'], BASE_URL, current_page_path)
+    html = str(rewritten)
+
+    badged = make_soup(html)
+    spider.remove_platform_badge(badged)
+    spider.inject_badge_css(badged)
+    return str(badged)
+
+
+def mean_time(process, spider: BaseSiteSpider, html: str, repeat: int):
+    started = time.process_time()
+    for _ in range(repeat):
+        process(spider, html)
+    return (time.process_time() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--platform", default="framer")
+    parser.add_argument("--links", type=int, nargs="+", default=[700, 3500], help="Page links per page, which sets its size")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    spider = spider_class(args.platform)(BASE_URL)
+    for links in args.links:
+        html = page_html(1, 1000, links, 0.5, 10)
+        baseline = mean_time(baseline_process_page, spider, html, args.repeat)
+        single_pass = mean_time(process_page, spider, html, args.repeat)
+        print(
+            f"{len(html) / 1024:6.0f} KiB page: baseline {baseline * 1000:.0f} ms, "
+            f"single pass {single_pass * 1000:.0f} ms, {baseline / single_pass:.1f}x "
+            f"({args.platform}, {DEFAULT_PARSER})"
+        )
+
+
+if __name__ == "__main__":
+    main()
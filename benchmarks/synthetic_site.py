@@ -0,0 +1,165 @@
+"""A synthetic site for benchmarking discovery and scraping against a real HTTP server.
+
+Pages live at / and /page/<n>. Each links to `links` other pages chosen at
+random (a share of them with fragments, plus a few PDF links that discovery
+must skip) and references a stylesheet, a script and images under /assets/.
+Responses are delayed by `latency` seconds. /sitemap.xml exists only with
+--sitemap.
+
+    python -m benchmarks.synthetic_site --port 8765 --pages 1000 --links 2000
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import socket
+import time
+from aiohttp import web
+
+DEFAULTS = {
+    "pages": 1000,
+    "links": 2000,
+    "fragment_ratio": 0.5,
+    "images": 10,
+    "latency": 0.02,
+    "sitemap": False,
+}
+
+
+def page_html(n: int, pages: int, links: int, fragment_ratio: float, images: int) -> str:
+    rng = random.Random(n)
+    anchors = []
+    for i in range(links):
+        target = rng.randrange(pages)
+        href = "/" if target == 0 else f"/page/{target}"
+        if rng.random() < fragment_ratio:
+            href += f"#section-{i % 20}"
+        anchors.append(f'<li><a href="{href}">Page {target}</a></li>')
+    anchors.extend(f'<li><a href="/files/report-{n}-{i}.pdf">Report {i}</a></li>' for i in range(5))
+
+    figures = "".join(
+        f'<figure><img src="/assets/image-{(n + i) % 50}.png" alt="Image {i}"><figcaption>Figure {i}</figcaption></figure>'
+        for i in range(images)
+    )
+    paragraphs = "".join(
+        f'<p style="margin: {i}px">Paragraph {i} of page {n}, with <strong>bold</strong> and <em>emphasis</em>.</p>'
+        for i in range(20)
+    )
+    return (
+        f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Page {n}</title>'
+        f'<link rel="stylesheet" href="/assets/site.css"><script src="/assets/app.js"></script></head>'
+        f'<body><header><nav><a href="/">Home</a></nav></header>'
+        f'<main><h1>Page {n}</h1>{paragraphs}{figures}<ul class="links">{"".join(anchors)}</ul></main>'
+        f'</body></html>'
+    )
+
+
+def asset_body(name: str) -> tuple:
+    if name.endswith(".css"):
+        rules = "".join(
+            f".block-{i} {{ margin: {i}px; background: url('/assets/image-{i % 50}.png'); }}\n" for i in range(500)
+        )
+        return rules.encode(), "text/css"
+    if name.endswith(".js"):
+        return "".join(f"function handler{i}(event) {{ return event.target.id + {i}; }}\n" for i in range(500)).encode(), "application/javascript"
+    # Images are random bytes, like real compressed formats
+    return random.Random(name).randbytes(20000), "image/png"
+
+
+def make_app(pages=None, links=None, fragment_ratio=None, images=None, latency=None, sitemap=None) -> web.Application:
+    options = {key: DEFAULTS[key] if value is None else value for key, value in {
+        "pages": pages, "links": links, "fragment_ratio": fragment_ratio,
+        "images": images, "latency": latency, "sitemap": sitemap,
+    }.items()}
+    html_cache = {}
+
+    async def delay():
+        if options["latency"]:
+            await asyncio.sleep(options["latency"])
+
+    async def page(request):
+        n = int(request.match_info.get("n", 0))
+        if not 0 <= n < options["pages"]:
+            raise web.HTTPNotFound()
+        await delay()
+        if n not in html_cache:
+            html_cache[n] = page_html(n, options["pages"], options["links"], options["fragment_ratio"], options["images"])
+        return web.Response(text=html_cache[n], content_type="text/html")
+
+    async def asset(request):
+        await delay()
+        body, content_type = asset_body(request.match_info["name"])
+        return web.Response(body=body, content_type=content_type, headers={"Cache-Control": "no-store"})
+
+    async def sitemap_xml(request):
+        if not options["sitemap"]:
+            raise web.HTTPNotFound()
+        base = f"{request.scheme}://{request.host}"
+        urls = "".join(f"<url><loc>{base}/page/{n}</loc></url>" for n in range(1, options["pages"]))
+        return web.Response(
+            text=f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>',
+            content_type="application/xml"
+        )
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    app.router.add_get("/page/{n:\\d+}", page)
+    app.router.add_get("/assets/{name}", asset)
+    app.router.add_get("/sitemap.xml", sitemap_xml)
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(port: int, **options):
+    web.run_app(make_app(**options), host="127.0.0.1", port=port, print=None)
+
+
+def start_server(**options):
+    """Serve the site from a separate process so its CPU time is not counted; returns (base_url, process)"""
+    port = free_port()
+    process = multiprocessing.Process(target=serve, args=(port,), kwargs=options, daemon=True)
+    process.start()
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return f"http://127.0.0.1:{port}/", process
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("Synthetic site did not start")
+
+
+def add_site_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--pages", type=int, default=DEFAULTS["pages"])
+    parser.add_argument("--links", type=int, default=DEFAULTS["links"], help="Page links on each page")
+    parser.add_argument("--fragment-ratio", type=float, default=DEFAULTS["fragment_ratio"])
+    parser.add_argument("--images", type=int, default=DEFAULTS["images"], help="Images on each page")
+    parser.add_argument("--latency", type=float, default=DEFAULTS["latency"], help="Seconds added to each response")
+    parser.add_argument("--sitemap", action="store_true")
+
+
+def site_options(args) -> dict:
+    return {
+        "pages": args.pages, "links": args.links, "fragment_ratio": args.fragment_ratio,
+        "images": args.images, "latency": args.latency, "sitemap": args.sitemap,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_site_arguments(parser)
+    args = parser.parse_args()
+    print(f"Serving on http://127.0.0.1:{args.port}/")
+    serve(args.port, **site_options(args))
+
+
+if __name__ == "__main__":
+    main()
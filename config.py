@@ -6,10 +6,54 @@ load_dotenv()
 class Settings:
     MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     DATABASE_NAME = os.getenv("DATABASE_NAME", "scraper_db")
+    MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true"
+    MONGO_CHECK_QUERIES = os.getenv("MONGO_CHECK_QUERIES", "true").lower() == "true"
+    MONGO_TLS = os.getenv("MONGO_TLS", "true").lower() == "true"
     CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY")
     CLERK_PUBLISHABLE_KEY = os.getenv("CLERK_PUBLISHABLE_KEY")
     CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL")
     ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
     STATIC_DIR = os.getenv("STATIC_DIR", "app/static")
+    HTML_PARSER = os.getenv("HTML_PARSER", "lxml")
+    MAX_ASSET_BYTES = int(os.getenv("MAX_ASSET_BYTES", str(25 * 1024 * 1024)))
+    MAX_JOB_BYTES = int(os.getenv("MAX_JOB_BYTES", str(500 * 1024 * 1024)))
+    ASSET_STORE_DIR = os.getenv("ASSET_STORE_DIR", "app/asset_store")
+    ASSET_STORE_MAX_BYTES = int(os.getenv("ASSET_STORE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+    ASSET_STORE_TTL = int(os.getenv("ASSET_STORE_TTL", str(24 * 60 * 60)))
+    ASSET_STORE_MIN_IDLE = int(os.getenv("ASSET_STORE_MIN_IDLE", str(60 * 60)))
+    ARCHIVE_COMPRESSION_LEVEL = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", "6"))
+    HTTP_CACHE_RETENTION = int(os.getenv("HTTP_CACHE_RETENTION", str(7 * 24 * 60 * 60)))
+    BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "4"))
+    BLOCKING_IO_QUEUE_DEPTH = int(os.getenv("BLOCKING_IO_QUEUE_DEPTH", "64"))
+    LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1"))
+    LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", "0.25"))
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "15"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))
+    WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1.0"))
+    WORKER_SHUTDOWN_GRACE = float(os.getenv("WORKER_SHUTDOWN_GRACE", "30"))
+    WORKER_STATS_INTERVAL = float(os.getenv("WORKER_STATS_INTERVAL", "60"))
+    SCHEDULER_MAX_RUNNING = int(os.getenv("SCHEDULER_MAX_RUNNING", "8"))
+    SCHEDULER_MAX_PER_USER = int(os.getenv("SCHEDULER_MAX_PER_USER", "2"))
+    SCHEDULER_MIN_BULK_SLOTS = int(os.getenv("SCHEDULER_MIN_BULK_SLOTS", "1"))
+    SCHEDULER_FULL_SITE_COST = int(os.getenv("SCHEDULER_FULL_SITE_COST", "25"))
+    SCHEDULER_DEFAULT_JOB_SECONDS = float(os.getenv("SCHEDULER_DEFAULT_JOB_SECONDS", "60"))
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    EVENT_BUS_URL = os.getenv("EVENT_BUS_URL", REDIS_URL)
+    EVENT_SNAPSHOT_MAX_JOBS = int(os.getenv("EVENT_SNAPSHOT_MAX_JOBS", "10000"))
+    EVENT_SNAPSHOT_TTL = int(os.getenv("EVENT_SNAPSHOT_TTL", str(6 * 60 * 60)))
+    EVENT_STREAM_KEEPALIVE = float(os.getenv("EVENT_STREAM_KEEPALIVE", "15"))
+    EVENT_STREAM_RECONCILE = float(os.getenv("EVENT_STREAM_RECONCILE", "300"))
+    EVENT_LOG_BYTES = int(os.getenv("EVENT_LOG_BYTES", str(16 * 1024 * 1024)))
+    USER_CACHE_MAX_USERS = int(os.getenv("USER_CACHE_MAX_USERS", "10000"))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+    RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL", "")
+    RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "100/60")
+    RATE_LIMIT_ROUTES = os.getenv("RATE_LIMIT_ROUTES", "")
+    RATE_LIMIT_USER_DEFAULT = os.getenv("RATE_LIMIT_USER_DEFAULT", "300/60")
+    RATE_LIMIT_USER_ROUTES = os.getenv("RATE_LIMIT_USER_ROUTES", "/scrape=20/60,/discover-pages=30/60")
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
 
 settings = Settings()
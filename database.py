@@ -1,4 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 from config import settings
 import logging
 import certifi
@@ -14,25 +16,81 @@ class Database:
 
 db = Database()
 
+INDEXES = {
+    "scrape_jobs": [
+        IndexModel([("job_id", ASCENDING)], unique=True, name="job_id_unique"),
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING), ("status", ASCENDING),
+             ("job_id", ASCENDING), ("url", ASCENDING), ("site_type", ASCENDING), ("scrape_mode", ASCENDING),
+             ("completed_at", ASCENDING), ("pages_scraped", ASCENDING)],
+            name="user_jobs_listing"
+        ),
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING), ("virtual_finish", DESCENDING)], name="user_status_finish"),
+        IndexModel(
+            [("status", ASCENDING), ("lane", ASCENDING), ("virtual_start", ASCENDING), ("created_at", ASCENDING)],
+            name="dispatch_order"
+        ),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease"),
+        IndexModel([("status", ASCENDING), ("lane", ASCENDING), ("completed_at", DESCENDING)], name="status_lane_completed"),
+    ],
+    "asset_urls": [
+        IndexModel([("digest", ASCENDING)], name="digest"),
+        IndexModel([("purge_at", ASCENDING)], expireAfterSeconds=0, name="purge_at_ttl"),
+    ],
+    "asset_blobs": [
+        IndexModel([("used_at", ASCENDING)], name="used_at"),
+    ],
+    "users": [
+        IndexModel([("clerk_id", ASCENDING)], unique=True, name="clerk_id_unique"),
+    ],
+    "waitlist": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "contact_submissions": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    ],
+    "feedback_submissions": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    ],
+}
+
+async def ensure_indexes(database):
+    """Create the declared indexes, logging rather than failing on conflicts with existing data or indexes"""
+    created = 0
+    for collection_name, indexes in INDEXES.items():
+        for index in indexes:
+            try:
+                await database[collection_name].create_indexes([index])
+                created += 1
+            except OperationFailure as e:
+                logger.error(
+                    f"Could not create index {index.document['name']} on {collection_name}: "
+                    f"{e.details.get('errmsg') if e.details else e}"
+                )
+    logger.info(f"Ensured {created} MongoDB indexes")
+
 async def get_database():
     return db.database
 
 async def connect_to_mongo():
     try:
         logger.info("Connecting to MongoDB...")
+        tls_options = {"tls": True, "tlsCAFile": certifi.where()} if settings.MONGO_TLS else {}
         db.client = AsyncIOMotorClient(
             settings.MONGODB_URL,
             serverSelectionTimeoutMS=5000,
             connectTimeoutMS=10000,
             socketTimeoutMS=20000,
-            tls=True,
-            tlsCAFile=certifi.where()
+            **tls_options
         )
         
         await db.client.admin.command('ping')
         db.database = db.client[settings.DATABASE_NAME]
         logger.info("Successfully connected to MongoDB")
         
+        if settings.MONGO_ENSURE_INDEXES:
+            await ensure_indexes(db.database)
+        
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
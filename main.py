@@ -1,5 +1,5 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request, Header
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Depends, Request, Header, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -21,8 +21,18 @@ from models import (
 )
 from services.scraper_service import ScraperService
 from services.usage_service import usage_service
+from services.download_service import download_service
+from services.job_queue import job_queue
+from services.job_events import event_bus
+from services.job_listing import job_listing_service
+from services.user_state import user_state
+from services.rate_limiter import rate_limiter, limit_headers
+from scraper.asset_store import asset_store
+from scraper.blocking import blocking_executor, loop_monitor
 from auth import get_current_user, get_or_create_user, clerk_auth
 from database import connect_to_mongo, close_mongo_connection, get_database
+from query_diagnostics import check_hot_queries
+from config import settings
 from services.reactify_service import ReactifyService
 from models import ReactifyRequest, ReactifyDiscoverRequest
 from services.communication_service import communication_service
@@ -53,32 +63,23 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         return response
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, calls: int = 100, period: int = 60):
+    def __init__(self, app, limiter=None):
         super().__init__(app)
-        self.calls = calls
-        self.period = period
-        self.cache = {}
+        self.limiter = limiter or rate_limiter
     
     async def dispatch(self, request: Request, call_next):
         client_ip = request.client.host if request.client else "unknown"
-        current_time = datetime.utcnow().timestamp()
+        decision = await self.limiter.check_client(client_ip, request.url.path)
         
-        if client_ip not in self.cache:
-            self.cache[client_ip] = []
-        
-        self.cache[client_ip] = [
-            timestamp for timestamp in self.cache[client_ip]
-            if current_time - timestamp < self.period
-        ]
-        
-        if len(self.cache[client_ip]) >= self.calls:
+        if not decision.allowed:
             return JSONResponse(
                 status_code=429,
-                content={"detail": "Rate limit exceeded. Please try again later."}
+                content={"detail": "Rate limit exceeded. Please try again later."},
+                headers=limit_headers(decision)
             )
         
-        self.cache[client_ip].append(current_time)
         response = await call_next(request)
+        response.headers.update(limit_headers(decision))
         return response
 
 def serialize_doc(doc):
@@ -124,7 +125,7 @@ app = FastAPI(
 )
 
 app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RateLimitMiddleware, calls=100, period=60)
+app.add_middleware(RateLimitMiddleware)
 
 if PRODUCTION:
     app.add_middleware(
@@ -148,7 +149,8 @@ scraper_service = ScraperService()
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": "An error occurred", "type": "http_exception"}
+        content={"detail": "An error occurred", "type": "http_exception"},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(RequestValidationError)
@@ -182,6 +184,12 @@ async def check_request_size(request: Request, call_next):
 async def startup_event():
     try:
         await connect_to_mongo()
+        if settings.MONGO_CHECK_QUERIES:
+            await check_hot_queries()
+        await asset_store.open()
+        event_bus.listen("usage", usage_service.usage_changed)
+        await event_bus.start()
+        loop_monitor.start()
         logger.info("API started successfully")
     except Exception as e:
         logger.error(f"Failed to start API: {e}")
@@ -190,7 +198,12 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     try:
+        await event_bus.stop()
+        await asset_store.close()
         await close_mongo_connection()
+        await rate_limiter.close()
+        await loop_monitor.stop()
+        blocking_executor.shutdown()
         logger.info("API shutdown completed")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
@@ -207,7 +220,13 @@ async def health_check():
         
         return {
             "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow().isoformat(),
+            "asset_store": asset_store.stats(),
+            "event_loop": loop_monitor.stats(),
+            "blocking_io": blocking_executor.stats(),
+            "event_bus": event_bus.stats(),
+            "user_cache": user_state.stats(),
+            "rate_limiter": rate_limiter.stats()
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -242,33 +261,16 @@ async def get_user_profile(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Failed to retrieve profile")
 
 @app.get("/my-jobs")
-async def get_user_jobs(current_user: User = Depends(get_current_user)):
+async def get_user_jobs(
+    limit: int = Query(50, ge=1, le=job_listing_service.MAX_LIMIT),
+    cursor: Optional[str] = Query(None, max_length=200),
+    status: Optional[str] = Query(None, max_length=100),
+    current_user: User = Depends(get_current_user)
+):
     try:
-        database = await get_database()
-        collection = database["scrape_jobs"]
-        
-        cursor = collection.find(
-            {"user_id": current_user.clerk_id}
-        ).sort("created_at", -1).limit(50)
-        
-        jobs = []
-        async for job_data in cursor:
-            serialized_job = serialize_doc(job_data)
-            if serialized_job:
-                safe_job = {
-                    "id": serialized_job.get("id"),
-                    "job_id": serialized_job.get("job_id"),
-                    "url": serialized_job.get("url"),
-                    "site_type": serialized_job.get("site_type"),
-                    "scrape_mode": serialized_job.get("scrape_mode"),
-                    "status": serialized_job.get("status"),
-                    "created_at": serialized_job.get("created_at"),
-                    "completed_at": serialized_job.get("completed_at"),
-                    "pages_scraped": serialized_job.get("pages_scraped", 0)
-                }
-                jobs.append(safe_job)
-        
-        return {"jobs": jobs}
+        return await job_listing_service.list_jobs(current_user.clerk_id, limit, cursor, status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting user jobs: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve jobs")
@@ -299,82 +301,23 @@ async def discover_pages(
             pages=[]
         )
 
-async def perform_scraping(job_id: str, user_id: str, request: ScrapeRequest):
-    database = await get_database()
-    collection = database["scrape_jobs"]
-    
-    try:
-        logger.info(f"Starting scraping for job")
-        
-        await collection.update_one(
-            {"job_id": job_id},
-            {"$set": {"status": "processing"}}
-        )
-        
-        result = await scraper_service.scrape_site(
-            str(request.url), 
-            request.site_type.value,
-            request.scrape_mode.value,
-            request.selected_pages,
-            job_id=job_id
-        )
-        
-        if result and result.get("success"):
-            logger.info(f"Scraping completed")
-            
-            await collection.update_one(
-                {"job_id": job_id},
-                {"$set": {
-                    "status": "completed",
-                    "file_path": result.get("file_path"),
-                    "download_url": f"/download/{job_id}",
-                    "completed_at": datetime.utcnow(),
-                    "pages_scraped": len(request.selected_pages) if request.selected_pages else 1
-                }}
-            )
-        else:
-            logger.error(f"Scraping failed")
-            await collection.update_one(
-                {"job_id": job_id},
-                {"$set": {
-                    "status": "failed",
-                    "error_message": "Scraping failed",
-                    "completed_at": datetime.utcnow()
-                }}
-            )
-            await usage_service.decrement_usage(user_id, request.scrape_mode.value)
-            
-    except Exception as e:
-        logger.error(f"Scraping error: {e}")
-        await collection.update_one(
-            {"job_id": job_id},
-            {"$set": {
-                "status": "failed",
-                "error_message": "Processing error",
-                "completed_at": datetime.utcnow()
-            }}
-        )
-        await usage_service.decrement_usage(user_id, request.scrape_mode.value)
-        
 @app.post("/scrape", response_model=ScrapeResponse)
 async def scrape_site(
     request: ScrapeRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
     try:
         url = sanitize_url(str(request.url))
         request.url = url
         
-        can_scrape = await usage_service.can_user_scrape(
+        usage = await usage_service.reserve_usage(
             current_user.clerk_id, 
             request.scrape_mode.value
         )
         
-        if not can_scrape:
-            usage = await usage_service.get_user_usage(current_user.clerk_id)
+        if not usage:
             limit_type = "single-page" if request.scrape_mode.value == "single_page" else "multi-page"
-            limit_value = usage.single_page_limit if request.scrape_mode.value == "single_page" else usage.multi_page_limit
+            _, limit_value = usage_service.counter_for(request.scrape_mode.value)
             return ScrapeResponse(
                 success=False,
                 message=f"You have reached your {limit_type} limit ({limit_value})"
@@ -382,13 +325,8 @@ async def scrape_site(
         
         logger.info(f"Starting scrape")
         
-        await usage_service.increment_usage(current_user.clerk_id, request.scrape_mode.value)
-        
         job_id = generate_secure_job_id()
         
-        database = await get_database()
-        collection = database["scrape_jobs"]
-        
         scrape_job_data = {
             "user_id": current_user.clerk_id,
             "job_id": job_id,
@@ -396,19 +334,19 @@ async def scrape_site(
             "site_type": request.site_type.value,
             "scrape_mode": request.scrape_mode.value,
             "selected_pages": request.selected_pages[:25] if request.selected_pages else [],
-            "status": "pending",
             "created_at": datetime.utcnow(),
             "pages_scraped": 0
         }
         
-        await collection.insert_one(scrape_job_data)
-        
-        background_tasks.add_task(
-            perform_scraping,
-            job_id,
-            current_user.clerk_id,
-            request
-        )
+        try:
+            await job_queue.enqueue(scrape_job_data, current_user.scheduler_weight)
+        except Exception:
+            await usage_service.decrement_usage(current_user.clerk_id, request.scrape_mode.value, job_id)
+            raise
+        event_bus.publish(job_id, "queued", {
+            "user_id": current_user.clerk_id,
+            "scrape_mode": request.scrape_mode.value
+        })
         
         return ScrapeResponse(
             success=True,
@@ -448,9 +386,15 @@ async def get_job_status(
             "created_at": job.get("created_at").isoformat() if job.get("created_at") else None,
             "completed_at": job.get("completed_at").isoformat() if job.get("completed_at") else None,
             "error_message": job.get("error_message"),
-            "pages_scraped": job.get("pages_scraped", 0)
+            "pages_scraped": job.get("pages_scraped", 0),
+            "skipped_assets": job.get("skipped_assets", []),
+            "asset_timings": job.get("asset_timings", [])
         }
         
+        queue_info = await job_queue.queue_position(job)
+        if queue_info:
+            safe_job.update(queue_info)
+        
         return safe_job
     except HTTPException:
         raise
@@ -458,9 +402,52 @@ async def get_job_status(
         logger.error(f"Error getting job status: {e}")
         raise HTTPException(status_code=500, detail="Failed to get status")
 
+@app.get("/job-events/{job_id}")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    if not re.match(r'^job_[A-Za-z0-9_-]+$', job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+    
+    snapshot = event_bus.snapshot(job_id)
+    if snapshot is None or "user_id" not in snapshot:
+        try:
+            database = await get_database()
+            job = await database["scrape_jobs"].find_one(
+                {"job_id": job_id, "user_id": current_user.clerk_id},
+                projection={"user_id": 1, "status": 1, "pages_scraped": 1, "error_message": 1, "download_url": 1}
+            )
+        except Exception as e:
+            logger.error(f"Error opening job event stream: {e}")
+            raise HTTPException(status_code=500, detail="Failed to open event stream")
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        job.pop("_id", None)
+        event_bus.remember(job_id, {key: value for key, value in job.items() if value is not None})
+        snapshot = event_bus.snapshot(job_id)
+    
+    if snapshot.get("user_id") != current_user.clerk_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def refresh(job_id):
+        database = await get_database()
+        return await database["scrape_jobs"].find_one(
+            {"job_id": job_id, "user_id": current_user.clerk_id},
+            projection={"status": 1, "pages_scraped": 1, "error_message": 1, "download_url": 1}
+        )
+    
+    return StreamingResponse(
+        event_bus.sse(job_id, request.is_disconnected, refresh),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/download/{job_id}")
 async def download_file(
     job_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     try:
@@ -493,10 +480,12 @@ async def download_file(
         if not real_path.startswith(allowed_dir) and not real_path.startswith(os.path.realpath("static")):
             raise HTTPException(status_code=403, detail="Access denied")
         
-        return FileResponse(
-            file_path, 
-            filename=f"export_{safe_filename}.zip", 
-            media_type="application/zip"
+        return await download_service.archive_response(
+            request,
+            collection,
+            job,
+            real_path,
+            f"export_{safe_filename}.zip"
         )
     except HTTPException:
         raise
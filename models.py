@@ -93,6 +93,7 @@ class User(BaseModel):
     single_page_count: int = 0
     multi_page_count: int = 0
     reactify_count: int = 0
+    scheduler_weight: float = 1.0
     created_at: datetime
     updated_at: datetime
 
@@ -127,6 +128,10 @@ class ScrapeJob(BaseModel):
     file_path: Optional[str] = None
     download_url: Optional[str] = None
     pages_scraped: int = 0
+    skipped_assets: List[Dict[str, Any]] = []
+    asset_timings: List[Dict[str, Any]] = []
+    compression: Optional[Dict[str, Any]] = None
+    archive: Optional[Dict[str, Any]] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
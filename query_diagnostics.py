@@ -0,0 +1,334 @@
+import asyncio
+import argparse
+import json
+import logging
+from datetime import datetime
+from bson import ObjectId
+from services.job_listing import LISTING_PROJECTION, job_listing_service
+from services.job_queue import job_queue
+from services.job_scheduler import job_scheduler, PRIORITY_LANE, BULK_LANE
+from database import INDEXES, connect_to_mongo, close_mongo_connection, get_database
+
+logger = logging.getLogger(__name__)
+
+NOW = datetime(2024, 1, 1)
+
+# The queries the API and workers run on every request or dispatch, with
+# representative values. Filters come from the code that issues them where it
+# builds them in one place, so the two cannot drift apart.
+HOT_QUERIES = [
+    {
+        "name": "job by id and owner",
+        "collection": "scrape_jobs",
+        "filter": {"job_id": "job", "user_id": "user"}
+    },
+    {
+        "name": "my jobs",
+        "collection": "scrape_jobs",
+        "filter": job_listing_service.listing_query("user"),
+        "projection": LISTING_PROJECTION,
+        "sort": [("created_at", -1), ("_id", -1)],
+        "limit": 51
+    },
+    {
+        "name": "my jobs, later page by status",
+        "collection": "scrape_jobs",
+        "filter": job_listing_service.listing_query("user", ["completed"], (NOW, ObjectId("0" * 24))),
+        "projection": LISTING_PROJECTION,
+        "sort": [("created_at", -1), ("_id", -1)],
+        "limit": 51
+    },
+    {
+        "name": "user's latest queued job",
+        "collection": "scrape_jobs",
+        "filter": job_scheduler.user_queued_filter("user"),
+        "projection": {"virtual_finish": 1},
+        "sort": job_scheduler.USER_QUEUED_SORT,
+        "limit": 1
+    },
+    {
+        "name": "next job to dispatch",
+        "collection": "scrape_jobs",
+        "filter": job_scheduler.dispatch_filter(job_queue.claimable_filter(NOW)),
+        "projection": job_scheduler.DISPATCH_PROJECTION,
+        "sort": job_scheduler.DISPATCH_SORT,
+        "limit": job_scheduler.SCAN_LIMIT
+    },
+    {
+        "name": "next bulk job to dispatch",
+        "collection": "scrape_jobs",
+        "filter": job_scheduler.dispatch_filter(job_queue.claimable_filter(NOW), BULK_LANE),
+        "projection": job_scheduler.DISPATCH_PROJECTION,
+        "sort": job_scheduler.DISPATCH_SORT,
+        "limit": job_scheduler.SCAN_LIMIT
+    },
+    {
+        "name": "queue snapshot",
+        "collection": "scrape_jobs",
+        "filter": job_scheduler.dispatch_filter(job_queue.claimable_filter(NOW)),
+        "projection": job_scheduler.QUEUE_PROJECTION,
+        "sort": job_scheduler.DISPATCH_SORT
+    },
+    {
+        "name": "running jobs",
+        "collection": "scrape_jobs",
+        "filter": job_scheduler.running_filter(NOW),
+        "projection": job_scheduler.RUNNING_PROJECTION
+    },
+    {
+        "name": "recent job durations",
+        "collection": "scrape_jobs",
+        "filter": job_scheduler.durations_filter(PRIORITY_LANE),
+        "sort": [("completed_at", -1)],
+        "limit": job_scheduler.DURATION_SAMPLES
+    },
+    {
+        "name": "user by clerk id",
+        "collection": "users",
+        "filter": {"clerk_id": "user"}
+    },
+    {
+        "name": "waitlist by email",
+        "collection": "waitlist",
+        "filter": {"email": "someone@example.com"}
+    },
+    {
+        "name": "user's contact submissions",
+        "collection": "contact_submissions",
+        "filter": {"user_id": "user"},
+        "sort": [("created_at", -1)],
+        "limit": 10
+    },
+    {
+        "name": "user's feedback submissions",
+        "collection": "feedback_submissions",
+        "filter": {"user_id": "user"},
+        "sort": [("created_at", -1)],
+        "limit": 10
+    },
+]
+
+
+def plan_stages(plan):
+    """All stage names in an explain plan tree, from either the classic or the SBE layout"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("queryPlan", "inputStage", "inputStages", "shards", "winningPlan"):
+            child = plan.get(key)
+            if isinstance(child, list):
+                for item in child:
+                    stages.extend(plan_stages(item))
+            elif child is not None:
+                stages.extend(plan_stages(child))
+    return stages
+
+
+def plan_indexes(plan):
+    names = []
+    if isinstance(plan, dict):
+        if plan.get("indexName"):
+            names.append(plan["indexName"])
+        for value in plan.values():
+            if isinstance(value, (dict, list)):
+                names.extend(plan_indexes(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            names.extend(plan_indexes(item))
+    return names
+
+
+def from_explain(explain: dict) -> dict:
+    planner = explain.get("queryPlanner", {})
+    stats = explain.get("executionStats", {})
+    stages = plan_stages(planner.get("winningPlan", {}))
+    return {
+        "source": "explain",
+        "stages": stages,
+        "indexes": sorted(set(plan_indexes(planner.get("winningPlan", {})))),
+        "collection_scan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+        "covered": "IXSCAN" in stages and "FETCH" not in stages and "COLLSCAN" not in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined")
+    }
+
+
+def split_filter(query: dict) -> list:
+    """The (equality fields, range fields) of each branch the planner would scan for a filter"""
+    equality, ranges, branches = set(), set(), [(set(), set())]
+    for field, value in query.items():
+        if field == "$or":
+            branches = [
+                (outer[0] | inner[0], outer[1] | inner[1])
+                for outer in branches
+                for branch in value
+                for inner in split_filter(branch)
+            ]
+        elif field == "$and":
+            for part in value:
+                branches = [
+                    (outer[0] | inner[0], outer[1] | inner[1])
+                    for outer in branches
+                    for inner in split_filter(part)
+                ]
+        elif isinstance(value, dict) and any(key.startswith("$") for key in value):
+            if set(value) == {"$in"}:
+                equality.add(field)
+            else:
+                ranges.add(field)
+        else:
+            equality.add(field)
+    return [(equality | branch[0], ranges | branch[1]) for branch in branches]
+
+
+def index_plan(keys, equality, ranges, sort):
+    """How well an index with these keys serves the query: (usable, sorts_in_index, fields_bounded)"""
+    fields = [field for field, _ in keys]
+    if not fields or fields[0] not in equality | ranges | {field for field, _ in sort[:1]}:
+        return False, False, 0
+
+    position = 0
+    while position < len(fields) and fields[position] in equality:
+        position += 1
+    bounded = position + (position < len(fields) and fields[position] in ranges)
+    if not sort:
+        return True, True, bounded
+
+    wanted = [(field, direction) for field, direction in sort if field not in equality]
+    have = list(keys[position:position + len(wanted)])
+    forward = [(field, int(direction)) for field, direction in have] == [(f, int(d)) for f, d in wanted]
+    backward = [(field, -int(direction)) for field, direction in have] == [(f, int(d)) for f, d in wanted]
+    return True, forward or backward, bounded
+
+
+def from_indexes(query: dict, indexes: dict) -> dict:
+    """Approximate the planner's choice from the index definitions when explain is unavailable"""
+    branches = split_filter(query["filter"])
+    sort = query.get("sort") or []
+
+    projection = query.get("projection") or {}
+    projected = {field for field, include in projection.items() if include}
+    if projection.get("_id", 1):
+        # _id is returned unless the projection excludes it explicitly
+        projected.add("_id")
+    used, collection_scan, in_memory_sort = set(), False, False
+    covered = bool(projection)
+    for equality, ranges in branches:
+        best = None
+        for name, keys in indexes.items():
+            usable, sorted_by_index, bounded = index_plan(keys, equality, ranges, sort)
+            if usable and (best is None or (sorted_by_index, bounded) > best[1:]):
+                best = (name, sorted_by_index, bounded)
+        if best is None:
+            collection_scan = True
+            in_memory_sort = in_memory_sort or bool(sort)
+        else:
+            used.add(best[0])
+            in_memory_sort = in_memory_sort or not best[1]
+            keys = {field for field, _ in indexes[best[0]]}
+            covered = covered and (equality | ranges | projected) <= keys
+
+    covered = covered and not collection_scan
+    stages = (
+        (["SORT"] if in_memory_sort else []) + ([] if covered or not used else ["FETCH"]) +
+        (["COLLSCAN"] if collection_scan else []) + (["IXSCAN"] if used else [])
+    )
+    return {
+        "source": "indexes",
+        "stages": stages,
+        "indexes": sorted(used),
+        "collection_scan": collection_scan,
+        "in_memory_sort": in_memory_sort,
+        "covered": covered,
+        "docs_examined": None,
+        "keys_examined": None
+    }
+
+
+def declared_indexes(collection_name) -> dict:
+    """Index keys by name as database.INDEXES declares them, plus the implicit _id index"""
+    indexes = {"_id_": [("_id", 1)]}
+    for index in INDEXES.get(collection_name, []):
+        indexes[index.document["name"]] = list(index.document["key"].items())
+    return indexes
+
+
+async def collection_indexes(collection, collection_name) -> dict:
+    try:
+        info = await collection.index_information()
+        return {name: [(field, direction) for field, direction in spec["key"]] for name, spec in info.items()}
+    except (AttributeError, NotImplementedError):
+        return declared_indexes(collection_name)
+
+
+async def explain_query(database, query: dict) -> dict:
+    collection = database[query["collection"]]
+    cursor = collection.find(query["filter"], query.get("projection"))
+    if query.get("sort"):
+        cursor = cursor.sort(query["sort"])
+    if query.get("limit"):
+        cursor = cursor.limit(query["limit"])
+
+    try:
+        plan = from_explain(await cursor.explain())
+    except (AttributeError, NotImplementedError):
+        plan = from_indexes(query, await collection_indexes(collection, query["collection"]))
+    return {"name": query["name"], "collection": query["collection"], **plan}
+
+
+async def explain_hot_queries(database=None, queries=None) -> list:
+    """Explain every hot query and flag the ones that scan a whole collection or sort in memory"""
+    database = database if database is not None else await get_database()
+    report = []
+    for query in queries or HOT_QUERIES:
+        result = await explain_query(database, query)
+        if result["collection_scan"]:
+            logger.warning(f"Query '{result['name']}' on {result['collection']} scans the whole collection")
+        elif result["in_memory_sort"]:
+            logger.warning(f"Query '{result['name']}' on {result['collection']} sorts in memory")
+        report.append(result)
+    return report
+
+
+async def check_hot_queries():
+    """Startup check: log hot queries that would scan a collection or sort in memory, never failing startup"""
+    try:
+        report = await explain_hot_queries()
+    except Exception as e:
+        logger.warning(f"Could not explain hot queries: {e}")
+        return
+    flagged = sum(1 for result in report if result["collection_scan"] or result["in_memory_sort"])
+    logger.info(f"Explained {len(report)} hot queries, {flagged} flagged")
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Explain the hot MongoDB queries and flag collection scans",
+        epilog="Connects with MONGODB_URL; set MONGO_TLS=false for a local mongod without TLS."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    try:
+        report = await explain_hot_queries()
+    finally:
+        await close_mongo_connection()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        for result in report:
+            flag = (
+                "COLLSCAN" if result["collection_scan"] else "SORT" if result["in_memory_sort"]
+                else "covered" if result["covered"] else "ok"
+            )
+            print(f"{flag:9} {result['collection']:22} {result['name']:30} {', '.join(result['indexes']) or '-'}")
+    return 1 if any(result["collection_scan"] for result in report) else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import os
+import posixpath
+import time
+import uuid
+import zipfile
+import logging
+from config import settings
+from scraper.blocking import blocking_executor
+
+logger = logging.getLogger(__name__)
+
+STORED_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif',
+    '.woff', '.woff2',
+    '.mp4', '.webm', '.mov', '.m4v', '.mp3', '.m4a', '.ogg', '.aac',
+    '.zip', '.gz', '.tgz', '.br', '.bz2', '.xz', '.7z', '.rar', '.pdf'
+})
+
+
+def file_digest(path):
+    """sha256 hexdigest and size of a file, read in chunks"""
+    with open(path, 'rb') as f:
+        digest = hashlib.file_digest(f, 'sha256')
+        return digest.hexdigest(), f.tell()
+
+
+class CompressionPolicy:
+    """Per-entry ZIP compression: already-compressed formats are stored, everything else is deflated"""
+
+    def __init__(self, level=None):
+        self.level = settings.ARCHIVE_COMPRESSION_LEVEL if level is None else level
+        self.stored_entries = 0
+        self.deflated_entries = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    @staticmethod
+    def compress_type(arcname):
+        extension = os.path.splitext(arcname.split('?', 1)[0])[1].lower()
+        return zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+    def write_file(self, zipf, source_path, arcname):
+        compress_type = self.compress_type(arcname)
+        started = time.perf_counter()
+        zipf.write(source_path, arcname, compress_type=compress_type, compresslevel=self.level)
+        self.record(zipf.infolist()[-1], compress_type, started)
+
+    def write_bytes(self, zipf, arcname, data):
+        compress_type = self.compress_type(arcname)
+        started = time.perf_counter()
+        zipf.writestr(arcname, data, compress_type=compress_type, compresslevel=self.level)
+        self.record(zipf.infolist()[-1], compress_type, started)
+
+    def record(self, info, compress_type, started):
+        self.seconds += time.perf_counter() - started
+        self.bytes_in += info.file_size
+        self.bytes_out += info.compress_size
+        if compress_type == zipfile.ZIP_STORED:
+            self.stored_entries += 1
+        else:
+            self.deflated_entries += 1
+
+    def summary(self):
+        return {
+            "stored_entries": self.stored_entries,
+            "deflated_entries": self.deflated_entries,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else 1.0,
+            "level": self.level,
+            "seconds": round(self.seconds, 3)
+        }
+
+
+class ArchiveWriter:
+    """ZIP sink that scrape output is streamed into as entries finish.
+
+    Entries are written to a partial file next to zip_path one at a time and
+    the archive only appears at zip_path once finalize() succeeds; abort()
+    removes the partial file. Every writer gets its own partial file, so two
+    attempts at the same job never write into or delete each other's. The
+    first entry written for a path wins, later ones are skipped. The finished
+    archive's sha256 and size are kept for download validators.
+    """
+
+    STALE_PART_SECONDS = 6 * 60 * 60
+
+    def __init__(self, zip_path, compression=None):
+        self.zip_path = str(zip_path)
+        self.part_path = f"{self.zip_path}.{uuid.uuid4().hex[:12]}.part"
+        self.compression = compression or CompressionPolicy()
+        self.entries = set()
+        self.lock = asyncio.Lock()
+        self.closed = False
+        self.sha256 = None
+        self.size = None
+
+        os.makedirs(os.path.dirname(self.zip_path) or '.', exist_ok=True)
+        self.zipf = zipfile.ZipFile(self.part_path, 'w', zipfile.ZIP_DEFLATED)
+
+    @staticmethod
+    def normalize(arcname):
+        arcname = posixpath.normpath('/' + str(arcname).replace('\\', '/')).lstrip('/')
+        if not arcname:
+            raise ValueError("Archive entry path is empty")
+        return arcname
+
+    def __contains__(self, arcname):
+        return self.normalize(arcname) in self.entries
+
+    def claim(self, arcname):
+        """Reserve an entry path, returning the normalized name or None if it is already taken"""
+        if self.closed:
+            raise RuntimeError("Archive is already closed")
+        arcname = self.normalize(arcname)
+        if arcname in self.entries:
+            logger.debug(f"Skipping duplicate archive entry {arcname}")
+            return None
+        self.entries.add(arcname)
+        return arcname
+
+    async def write_bytes(self, arcname, data):
+        arcname = self.claim(arcname)
+        if arcname is None:
+            return False
+        try:
+            await self._run(self._write_bytes, arcname, data)
+        except OSError:
+            self.entries.discard(arcname)
+            raise
+        return True
+
+    async def write_text(self, arcname, text):
+        return await self.write_bytes(arcname, text.encode('utf-8'))
+
+    async def write_file(self, arcname, source_path):
+        arcname = self.claim(arcname)
+        if arcname is None:
+            return False
+        try:
+            await self._run(self._write_file, arcname, source_path)
+        except OSError:
+            self.entries.discard(arcname)
+            raise
+        return True
+
+    async def finalize(self):
+        async with self.lock:
+            if self.closed:
+                return self.zip_path
+            self.closed = True
+            await blocking_executor.run(self._finalize)
+        stats = self.compression.summary()
+        logger.info(
+            f"Archive {self.zip_path}: {len(self.entries)} entries, "
+            f"{stats['bytes_in']} -> {stats['bytes_out']} bytes in {stats['seconds']}s"
+        )
+        return self.zip_path
+
+    def metadata(self):
+        return {"sha256": self.sha256, "size": self.size}
+
+    async def abort(self):
+        async with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            await blocking_executor.run(self._abort)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            await self.abort()
+        else:
+            await self.finalize()
+
+    async def _run(self, func, *args):
+        async with self.lock:
+            if self.closed:
+                raise RuntimeError("Archive is already closed")
+            await blocking_executor.run(func, *args)
+
+    def _write_bytes(self, arcname, data):
+        self.compression.write_bytes(self.zipf, arcname, data)
+
+    def _write_file(self, arcname, source_path):
+        self.compression.write_file(self.zipf, source_path, arcname)
+
+    def _finalize(self):
+        try:
+            self.zipf.close()
+            self.sha256, self.size = file_digest(self.part_path)
+            os.replace(self.part_path, self.zip_path)
+        except BaseException:
+            self._remove_part()
+            raise
+
+    def _abort(self):
+        try:
+            self.zipf.close()
+        finally:
+            self._remove_part()
+
+    @classmethod
+    def remove_stale_parts(cls, directory, max_age=None):
+        """Delete partial archives left behind by writers that died; returns how many were removed"""
+        cutoff = time.time() - (max_age or cls.STALE_PART_SECONDS)
+        removed = 0
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.name.endswith('.part') and entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _remove_part(self):
+        try:
+            os.remove(self.part_path)
+        except FileNotFoundError:
+            pass
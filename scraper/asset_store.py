@@ -0,0 +1,427 @@
+import hashlib
+import os
+import time
+import uuid
+import logging
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime
+from typing import Optional
+from cachetools import TTLCache
+from pymongo import ReturnDocument
+from config import settings
+from database import get_database
+from scraper.blocking import blocking_executor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredAsset:
+    digest: str
+    size: int
+    content_type: str
+    fetched_at: float
+    expires_at: float = 0.0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    @property
+    def revalidatable(self):
+        return bool(self.etag or self.last_modified)
+
+
+class AssetStore:
+    """Content-addressed blob store shared across jobs and processes, with a URL index of freshness and validators.
+
+    Blobs are files under root; the URL index and the blob accounting live in
+    MongoDB, so every API and worker process using the same directory sees the
+    same entries and the byte budget holds for the store as a whole. Entries are
+    served without a request until expires_at, then kept for revalidation until
+    the retention period runs out. Downloads are streamed to a staging file and
+    adopted as blobs once their digest is known; archives read blobs in place,
+    so blob files must never be modified.
+
+    Eviction removes the least recently used blobs, skipping any used in the
+    last min_idle seconds because another process may be about to archive it.
+    A blob can still vanish under a slow reader; callers treat that as a miss
+    and fetch the asset again. Without a database connection, as in offline
+    tools and benchmarks, nothing is indexed and every lookup misses.
+
+    To keep cache hits cheap, a process writes a blob's used_at at most once
+    per min_idle / TOUCH_FRACTION, and adds its byte and blob count changes to
+    the shared usage totals in batches. Usage changes not yet flushed when a
+    process dies are lost, so the totals can drift by a batch per crash. URL
+    entries carry purge_at, the moment they stop being usable, and a TTL index
+    removes them.
+    """
+
+    STAGING_MAX_AGE = 24 * 60 * 60
+    EVICT_BATCH = 100
+    TOUCH_FRACTION = 4
+    TOUCHED_MAX = 100000
+    USAGE_FLUSH_INTERVAL = 5
+    USAGE_FLUSH_BLOBS = 50
+    URLS = "asset_urls"
+    BLOBS = "asset_blobs"
+    USAGE = "asset_store"
+
+    def __init__(self, root=None, max_bytes=None, retention=None, min_idle=None):
+        self.root = root or settings.ASSET_STORE_DIR
+        self.max_bytes = max_bytes or settings.ASSET_STORE_MAX_BYTES
+        self.retention = retention or settings.HTTP_CACHE_RETENTION
+        self.min_idle = settings.ASSET_STORE_MIN_IDLE if min_idle is None else min_idle
+        self.blob_dir = os.path.join(self.root, "blobs")
+        self.staging_dir = os.path.join(self.root, "staging")
+        self.usage = {"bytes": 0, "blobs": 0}
+        self.pending = {"bytes": 0, "blobs": 0}
+        self.flushed_at = time.monotonic()
+        self.touched = TTLCache(maxsize=self.TOUCHED_MAX, ttl=max(self.min_idle / self.TOUCH_FRACTION, 1))
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self.loaded = False
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def staging_path(self):
+        self.load()
+        return os.path.join(self.staging_dir, f"{uuid.uuid4().hex}.part")
+
+    async def collections(self):
+        """The index collections, or None without a database connection, when the store only holds blobs"""
+        database = await get_database()
+        if database is None:
+            return None
+        return database[self.URLS], database[self.BLOBS], database[self.USAGE]
+
+    async def open(self):
+        """Clear stale staging files and, the first time a database sees this store, account for blobs already on disk"""
+        if self.loaded:
+            return
+        await blocking_executor.run(self.load)
+
+        collections = await self.collections()
+        if collections is None:
+            return
+        _, _, usage = collections
+        if await usage.find_one({"_id": "usage"}) is None:
+            existing = await blocking_executor.run(self._scan_blobs)
+            for digest, size, used_at in existing:
+                await self._use_blob(digest, size, used_at)
+            await usage.update_one({"_id": "usage"}, {"$setOnInsert": {"bytes": 0, "blobs": 0}}, upsert=True)
+            logger.info(f"Asset store adopted {len(existing)} blobs found on disk")
+
+        await self.refresh_usage()
+        logger.info(f"Asset store opened: {self.usage['blobs']} blobs, {self.usage['bytes']} bytes")
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+
+        os.makedirs(self.staging_dir, exist_ok=True)
+        stale_before = time.time() - self.STAGING_MAX_AGE
+        for entry in os.scandir(self.staging_dir):
+            if entry.stat().st_mtime < stale_before:
+                self._remove_blobs([entry.path])
+
+    async def refresh_usage(self):
+        """Flush this process's pending usage changes and read the shared totals"""
+        collections = await self.collections()
+        if collections is None:
+            return self.usage
+        _, _, usage = collections
+
+        pending, self.pending = self.pending, {"bytes": 0, "blobs": 0}
+        self.flushed_at = time.monotonic()
+        if not pending["bytes"] and not pending["blobs"]:
+            document = await usage.find_one({"_id": "usage"})
+        else:
+            try:
+                document = await usage.find_one_and_update(
+                    {"_id": "usage"},
+                    {"$inc": pending},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            except Exception:
+                self.pending = {key: self.pending[key] + pending[key] for key in pending}
+                raise
+        if document:
+            self.usage = {
+                "bytes": document.get("bytes", 0) + self.pending["bytes"],
+                "blobs": document.get("blobs", 0) + self.pending["blobs"]
+            }
+        return self.usage
+
+    async def close(self):
+        await self.refresh_usage()
+
+    async def lookup(self, url) -> Optional[StoredAsset]:
+        collections = await self.collections()
+        if collections is None:
+            self.misses += 1
+            return None
+        urls, _, _ = collections
+        document = await urls.find_one({"_id": url})
+        if document is None:
+            self.misses += 1
+            return None
+
+        entry = StoredAsset(**{field.name: document[field.name] for field in fields(StoredAsset) if field.name in document})
+        if not self.usable(entry):
+            await urls.delete_one({"_id": url, "fetched_at": entry.fetched_at})
+            self.misses += 1
+            return None
+        return entry
+
+    def usable(self, entry: StoredAsset):
+        if entry.fresh:
+            return True
+        return entry.revalidatable and time.time() - entry.fetched_at <= self.retention
+
+    async def revalidated(self, url, entry: StoredAsset, max_age):
+        now = time.time()
+        entry.fetched_at = now
+        entry.expires_at = now + max_age
+        self.revalidations += 1
+
+        collections = await self.collections()
+        if collections is None:
+            return
+        urls, _, _ = collections
+        await urls.update_one(
+            {"_id": url},
+            {"$set": {"fetched_at": entry.fetched_at, "expires_at": entry.expires_at, "purge_at": self.purge_at(entry)}}
+        )
+
+    def purge_at(self, entry: StoredAsset) -> datetime:
+        """When lookup would stop returning the entry, for the asset_urls TTL index"""
+        until = entry.expires_at
+        if entry.revalidatable:
+            until = max(until, entry.fetched_at + self.retention)
+        return datetime.utcfromtimestamp(until)
+
+    async def locate(self, entry: StoredAsset) -> Optional[str]:
+        """Path of a looked-up asset's blob, or None if it has since gone away"""
+        path = self.blob_path(entry.digest)
+        if not os.path.exists(path):
+            await self.forget_blob(entry.digest)
+            return None
+
+        await self._use_blob(entry.digest, entry.size)
+        self.hits += 1
+        self.bytes_saved += entry.size
+        return path
+
+    async def read(self, entry: StoredAsset) -> Optional[bytes]:
+        try:
+            body = await blocking_executor.run(self._read_blob, self.blob_path(entry.digest))
+        except FileNotFoundError:
+            await self.forget_blob(entry.digest)
+            return None
+
+        await self._use_blob(entry.digest, entry.size)
+        self.hits += 1
+        self.bytes_saved += entry.size
+        return body
+
+    async def put(self, url, staging_path, digest, content_type="", max_age=0, etag=None, last_modified=None):
+        """Adopt a staged download as a blob and return the blob path.
+
+        A max_age of None stores the blob without indexing the URL, for responses
+        that must not be reused.
+        """
+        self.load()
+        blob_path = self.blob_path(digest)
+        size = await blocking_executor.run(self._adopt, staging_path, blob_path)
+
+        await self.record(url if max_age is not None else None, digest, size, content_type, max_age, etag, last_modified)
+        return blob_path
+
+    async def put_bytes(self, url, body, content_type="", max_age=0, etag=None, last_modified=None):
+        self.load()
+        digest = hashlib.sha256(body).hexdigest()
+        try:
+            await blocking_executor.run(self._write_blob, self.blob_path(digest), body)
+        except OSError as e:
+            logger.warning(f"Could not store {url} in asset store: {e}")
+            return
+
+        await self.record(url, digest, len(body), content_type, max_age, etag, last_modified)
+
+    async def record(self, url, digest, size, content_type, max_age, etag, last_modified):
+        added = await self._use_blob(digest, size)
+
+        if url is not None:
+            now = time.time()
+            entry = StoredAsset(digest, size, content_type, now, now + max_age, etag, last_modified)
+            collections = await self.collections()
+            if collections is None:
+                return
+            urls, _, _ = collections
+            await urls.replace_one({"_id": url}, {**asdict(entry), "purge_at": self.purge_at(entry)}, upsert=True)
+
+        if added and self.usage["bytes"] > self.max_bytes:
+            await self.evict()
+
+    async def evict(self):
+        """Delete least recently used blobs until the store is back under budget.
+
+        Processes may evict at the same time: each blob document is deleted by
+        exactly one of them, and only that one subtracts its bytes and removes
+        the file.
+        """
+        collections = await self.collections()
+        if collections is None:
+            return
+        urls, blobs, _ = collections
+        cutoff = time.time() - self.min_idle
+
+        while True:
+            excess = (await self.refresh_usage())["bytes"] - self.max_bytes
+            if excess <= 0:
+                break
+            candidates = await blobs.find({"used_at": {"$lt": cutoff}}).sort("used_at", 1).limit(
+                self.EVICT_BATCH
+            ).to_list(length=self.EVICT_BATCH)
+            if not candidates:
+                logger.warning(f"Asset store is {excess} bytes over budget but every blob was used recently")
+                break
+
+            victims = []
+            for candidate in candidates:
+                if excess <= 0:
+                    break
+                result = await blobs.delete_one({"_id": candidate["_id"], "used_at": candidate["used_at"]})
+                if result.deleted_count:
+                    victims.append(candidate)
+                    excess -= candidate["size"]
+            if not victims:
+                continue
+
+            await self._account(-sum(victim["size"] for victim in victims), -len(victims))
+            await urls.delete_many({"digest": {"$in": [victim["_id"] for victim in victims]}})
+            await blocking_executor.run(self._remove_blobs, [self.blob_path(victim["_id"]) for victim in victims])
+            self.evictions += len(victims)
+
+    async def forget_blob(self, digest):
+        """Drop a blob whose file has gone, along with the URLs that point at it"""
+        collections = await self.collections()
+        if collections is None:
+            return
+        urls, blobs, _ = collections
+        self.touched.pop(digest, None)
+        document = await blobs.find_one_and_delete({"_id": digest})
+        if document:
+            await self._account(-document["size"], -1)
+        await urls.delete_many({"digest": digest})
+
+    async def forget_path(self, blob_path):
+        await self.forget_blob(os.path.basename(blob_path))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "revalidations": self.revalidations,
+            "bytes_saved": self.bytes_saved,
+            "blobs": self.usage["blobs"],
+            "bytes_stored": self.usage["bytes"],
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions
+        }
+
+    async def _use_blob(self, digest, size, used_at=None):
+        """Mark a blob as just used, registering it if no process has yet; returns True if it was new.
+
+        A blob this process touched recently is not written again.
+        """
+        if used_at is None and digest in self.touched:
+            return False
+        collections = await self.collections()
+        if collections is None:
+            return False
+        _, blobs, _ = collections
+        result = await blobs.update_one(
+            {"_id": digest},
+            {"$set": {"used_at": used_at or time.time()}, "$setOnInsert": {"size": size}},
+            upsert=True
+        )
+        if used_at is None:
+            self.touched[digest] = True
+        if result.upserted_id is None:
+            return False
+        await self._account(size, 1)
+        return True
+
+    async def _account(self, size, count):
+        """Queue a usage change, flushing the batch when it is due or the store looks over budget"""
+        self.pending["bytes"] += size
+        self.pending["blobs"] += count
+        self.usage = {"bytes": self.usage["bytes"] + size, "blobs": self.usage["blobs"] + count}
+        if (
+            time.monotonic() - self.flushed_at >= self.USAGE_FLUSH_INTERVAL
+            or abs(self.pending["blobs"]) >= self.USAGE_FLUSH_BLOBS
+            or self.usage["bytes"] > self.max_bytes
+        ):
+            await self.refresh_usage()
+
+    def _scan_blobs(self):
+        blobs = []
+        if os.path.isdir(self.blob_dir):
+            for prefix in os.scandir(self.blob_dir):
+                if not prefix.is_dir():
+                    continue
+                for entry in os.scandir(prefix.path):
+                    if '.' in entry.name:
+                        continue
+                    stat = entry.stat()
+                    blobs.append((entry.name, stat.st_size, stat.st_mtime))
+        return blobs
+
+    @staticmethod
+    def _remove_blobs(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _read_blob(blob_path):
+        with open(blob_path, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _write_blob(blob_path, body):
+        if os.path.exists(blob_path):
+            os.utime(blob_path)
+            return
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, blob_path)
+
+    @staticmethod
+    def _adopt(staging_path, blob_path):
+        if os.path.exists(blob_path):
+            os.remove(staging_path)
+            os.utime(blob_path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(staging_path, blob_path)
+        return os.path.getsize(blob_path)
+
+
+asset_store = AssetStore()
@@ -0,0 +1,410 @@
+# Each platform declares its badge rules as data:
+#   css        - stylesheet injected into every page as a fallback
+#   selectors  - elements removed by id, class, exact attribute or attribute substring
+#   links      - <a> tags whose href contains one of `href` and whose text contains a keyword
+#   texts      - elements whose stripped text contains every phrase (optionally under max_length,
+#                and optionally only inside an ancestor of `inside.tags` whose class contains
+#                `inside.class_contains`)
+#   generators - substrings of <meta name="generator"> content to strip
+BADGE_RULES = {
+    "framer": {
+        "css": """
+    #__framer-badge-container { display: none !important; }
+    [data-framer-name="Made with Framer"] { display: none !important; }
+    .framer-badge { display: none !important; }
+    a[href*="framer.com"][target="_blank"] { display: none !important; }
+    /* Target the "Edit template" badge specifically */
+    a[href*="framer.com/templates"] { display: none !important; }
+    [data-framer-name*="Edit template"] { display: none !important; }
+    [class*="edit-template"] { display: none !important; }
+    [class*="template-badge"] { display: none !important; }
+    button:contains("Edit template") { display: none !important; }
+    div:has(a[href*="templates"]) { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "id": "__framer-badge-container"},
+            {"tags": ["div"], "attrs": {"data-framer-name": "Made with Framer"}},
+            {"tags": ["div"], "class": "framer-badge"},
+            {"tags": ["div"], "class": "edit-template"},
+            {"tags": ["div"], "class": "template-badge"},
+        ],
+        "links": [
+            {"href": ["framer.com"], "keywords": ["made", "framer", "built", "edit", "template", "free"]},
+        ],
+        "texts": [
+            {"tags": ["a", "button", "div", "span"], "contains": ["edit template"], "max_length": 50},
+        ],
+    },
+    "webflow": {
+        "css": """
+    .w-webflow-badge { display: none !important; }
+    .webflow-badge { display: none !important; }
+    .w-badge { display: none !important; }
+    .buy-badge.w-inline-block { display: none !important; }
+    a[href*="webflow.com"] { display: none !important; }
+    a[href*="webflow.io"] { display: none !important; }
+    a[href*="webflow.com/template/"] { display: none !important; }
+    a[href*="webflow.io/template/"] { display: none !important; }
+    [data-w-id*="badge"] { display: none !important; }
+    [data-w-id*="webflow"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "w-webflow-badge"},
+            {"tags": ["div"], "class": "webflow-badge"},
+            {"tags": ["div"], "class": ["buy-badge", "w-inline-block"]},
+            {"tags": ["div"], "class": "w-badge"},
+        ],
+        "links": [
+            {"href": ["webflow.com", "webflow.io"], "keywords": ["made", "webflow", "built", "template", "free"]},
+        ],
+    },
+    "wordpress": {
+        "css": """
+    .wp-badge { display: none !important; }
+    .wordpress-badge { display: none !important; }
+    .powered-by { display: none !important; }
+    a[href*="wordpress.org"] { display: none !important; }
+    a[href*="wordpress.com"] { display: none !important; }
+    .site-info a[href*="wordpress"] { display: none !important; }
+    .footer-credits a[href*="wordpress"] { display: none !important; }
+    [class*="wp-badge"] { display: none !important; }
+    [id*="wp-badge"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "wp-badge"},
+            {"tags": ["div"], "class": "wordpress-badge"},
+            {"tags": ["div"], "class": "powered-by"},
+        ],
+        "links": [
+            {"href": ["wordpress.org", "wordpress.com"], "keywords": ["powered", "wordpress", "built", "made"]},
+        ],
+        "generators": ["wordpress"],
+    },
+    "wix": {
+        "css": """
+    .wix-badge { display: none !important; }
+    .wix-banner { display: none !important; }
+    a[href*="wix.com"] { display: none !important; }
+    [data-wix-id*="badge"] { display: none !important; }
+    [class*="wix-badge"] { display: none !important; }
+    [id*="wix-badge"] { display: none !important; }
+    div[style*="position: fixed"][style*="top"] { display: none !important; }
+    body { margin-top: 0 !important; padding-top: 0 !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "wix-badge"},
+            {"tags": ["div"], "class": "wix-banner"},
+        ],
+        "links": [
+            {"href": ["wix.com"], "keywords": ["created", "designed", "website", "free", "build"]},
+        ],
+    },
+    "shopify": {
+        "css": """
+    .shopify-badge { display: none !important; }
+    .powered-by-shopify { display: none !important; }
+    .shopify-credits { display: none !important; }
+    a[href*="shopify.com"] { display: none !important; }
+    .site-footer a[href*="shopify"] { display: none !important; }
+    .footer a[href*="shopify"] { display: none !important; }
+    [class*="shopify-badge"] { display: none !important; }
+    [id*="shopify-badge"] { display: none !important; }
+    [class*="powered-by"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "shopify-badge"},
+            {"tags": ["div"], "class": "powered-by-shopify"},
+            {"tags": ["div"], "class": "shopify-credits"},
+        ],
+        "links": [
+            {"href": ["shopify.com"], "keywords": ["powered", "shopify", "built", "made"]},
+        ],
+        "texts": [
+            {"tags": ["a"], "contains": ["powered by", "shopify"],
+             "inside": {"tags": ["footer", "div"], "class_contains": "footer"}},
+        ],
+    },
+    "bolt": {
+        "css": """
+    .bolt-badge { display: none !important; }
+    .made-in-bolt { display: none !important; }
+    a[href*="bolt.new"] { display: none !important; }
+    [data-bolt-badge] { display: none !important; }
+    [class*="bolt-badge"] { display: none !important; }
+    [id*="bolt-badge"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div", "span", "a"], "class": "bolt-badge"},
+            {"tags": ["div", "span", "a"], "class": "made-in-bolt"},
+            {"tags": ["div", "span", "a"], "attrs": {"data-bolt-badge": True}},
+        ],
+        "links": [
+            {"href": ["bolt.new", "bolt.host"], "keywords": ["made", "bolt", "built", "powered", "created"]},
+        ],
+        "texts": [
+            {"tags": ["div", "a", "span", "p"], "contains": ["made in bolt"], "max_length": 50},
+        ],
+    },
+    "lovable": {
+        "css": """
+    .lovable-badge { display: none !important; }
+    .edit-with-lovable { display: none !important; }
+    a[href*="lovable.dev"] { display: none !important; }
+    [data-lovable-badge] { display: none !important; }
+    [class*="lovable-badge"] { display: none !important; }
+    [id*="lovable-badge"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "lovable-badge"},
+            {"tags": ["div"], "class": "edit-with-lovable"},
+            {"tags": ["div"], "attrs": {"data-lovable-badge": True}},
+        ],
+        "links": [
+            {"href": ["lovable.dev"], "keywords": ["edit", "lovable", "made"]},
+        ],
+    },
+    "gumroad": {
+        "css": """
+    .gumroad-badge { display: none !important; }
+    .powered-by-gumroad { display: none !important; }
+    a[href*="gumroad.com"] { display: none !important; }
+    [data-gumroad-badge] { display: none !important; }
+    [class*="gumroad-badge"] { display: none !important; }
+    [id*="gumroad-badge"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "gumroad-badge"},
+            {"tags": ["div"], "class": "powered-by-gumroad"},
+        ],
+        "links": [
+            {"href": ["gumroad.com"], "keywords": ["powered", "gumroad", "made"]},
+        ],
+    },
+    "replit": {
+        "css": """
+    .replit-badge { display: none !important; }
+    [data-replit-badge] { display: none !important; }
+    [class*="replit-badge"] { display: none !important; }
+    [id*="replit-badge"] { display: none !important; }
+    a[href*="replit.com"] { display: none !important; }
+    script[src*="replit-badge"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["script"], "attr_contains": {"src": "replit-badge"}},
+            {"tags": ["div"], "class": "replit-badge"},
+            {"tags": ["div"], "attrs": {"data-replit-badge": True}},
+        ],
+        "links": [
+            {"href": ["replit.com"], "keywords": ["replit", "made", "run"]},
+        ],
+    },
+    "squarespace": {
+        "css": """
+    .squarespace-badge { display: none !important; }
+    .powered-by-link { display: none !important; }
+    .sqs-svg-logo--wordmark { display: none !important; }
+    .sqs-svg-logo--glyph { display: none !important; }
+    a[href*="squarespace.com"] { display: none !important; }
+    [data-squarespace-badge] { display: none !important; }
+    [class*="squarespace-badge"] { display: none !important; }
+    [id*="squarespace-badge"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "squarespace-badge"},
+            {"tags": ["div"], "class": "powered-by-link"},
+        ],
+        "links": [
+            {"href": ["squarespace.com"], "keywords": ["powered", "squarespace", "made"]},
+        ],
+    },
+    "notion": {
+        "css": """
+    .notion-badge { display: none !important; }
+    .made-with-notion { display: none !important; }
+    a[href*="notion.so"] { display: none !important; }
+    a[href*="notion.site"] { display: none !important; }
+    [data-notion-badge] { display: none !important; }
+    [class*="notion-badge"] { display: none !important; }
+    [id*="notion-badge"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "notion-badge"},
+            {"tags": ["div"], "class": "made-with-notion"},
+        ],
+        "links": [
+            {"href": ["notion.so", "notion.site"], "keywords": ["notion", "made", "powered"]},
+        ],
+    },
+    "rocket": {
+        "css": """
+    .rocket-badge { display: none !important; }
+    .made-in-rocket { display: none !important; }
+    a[href*="rocket.new"] { display: none !important; }
+    [data-rocket-badge] { display: none !important; }
+    [class*="rocket-badge"] { display: none !important; }
+    [id*="rocket-badge"] { display: none !important; }
+    """,
+        "selectors": [
+            {"tags": ["div"], "class": "rocket-badge"},
+            {"tags": ["div"], "class": "made-in-rocket"},
+        ],
+        "links": [
+            {"href": ["rocket.new"], "keywords": ["rocket", "made", "built"]},
+        ],
+    },
+}
+
+
+def _squash(text):
+    return ''.join(text.split()).lower()
+
+
+def _short_text(tag, max_length):
+    """Stripped, lower-cased text of tag, or None as soon as it reaches max_length"""
+    parts = []
+    length = 0
+    for string in tag.stripped_strings:
+        length += len(string)
+        if max_length is not None and length >= max_length:
+            return None
+        parts.append(string)
+    return ''.join(parts).lower()
+
+
+class BadgeMatcher:
+    def __init__(self, rules):
+        self.css = rules.get("css", "")
+        self.checks = {}
+        self.text_rules = []
+        self.generators = [value.lower() for value in rules.get("generators", [])]
+
+        for selector in rules.get("selectors", []):
+            check = self._compile_selector(selector)
+            for tag_name in selector["tags"]:
+                self.checks.setdefault(tag_name, []).append(check)
+
+        for link in rules.get("links", []):
+            self.checks.setdefault("a", []).append(self._compile_link(link))
+
+        for text in rules.get("texts", []):
+            phrases = [phrase.lower() for phrase in text["contains"]]
+            inside = self._compile_inside(text["inside"]) if "inside" in text else None
+            self.text_rules.append((frozenset(text["tags"]), phrases, text.get("max_length"), inside))
+
+        if self.generators:
+            self.checks.setdefault("meta", []).append(self._match_generator)
+
+        tag_names = set(self.checks)
+        for tags, _, _, _ in self.text_rules:
+            tag_names.update(tags)
+        self.tag_names = frozenset(tag_names)
+
+    def _compile_selector(self, selector):
+        if "id" in selector:
+            element_id = selector["id"]
+            return lambda tag: tag.get("id") == element_id
+
+        if "class" in selector:
+            required = selector["class"]
+            required = [required] if isinstance(required, str) else list(required)
+            return lambda tag: all(name in (tag.get("class") or ()) for name in required)
+
+        if "attrs" in selector:
+            attrs = selector["attrs"]
+
+            def match_attrs(tag):
+                for name, expected in attrs.items():
+                    value = tag.get(name)
+                    if value is None or (expected is not True and value != expected):
+                        return False
+                return True
+            return match_attrs
+
+        if "attr_contains" in selector:
+            contains = selector["attr_contains"]
+            return lambda tag: all(
+                isinstance(tag.get(name), str) and needle in tag.get(name)
+                for name, needle in contains.items()
+            )
+
+        raise ValueError(f"Unsupported badge selector: {selector}")
+
+    def _compile_inside(self, inside):
+        tag_names = frozenset(inside["tags"])
+        needle = inside["class_contains"].lower()
+
+        def match_inside(tag):
+            return any(
+                parent.name in tag_names and needle in ' '.join(parent.get("class") or ()).lower()
+                for parent in tag.parents
+            )
+        return match_inside
+
+    def _compile_link(self, link):
+        hrefs = link["href"]
+        keywords = [keyword.lower() for keyword in link["keywords"]]
+
+        def match_link(tag):
+            href = tag.get("href")
+            if not href or not any(needle in href for needle in hrefs):
+                return False
+            text = tag.get_text().lower()
+            return any(keyword in text for keyword in keywords)
+        return match_link
+
+    def _match_generator(self, tag):
+        if tag.get("name") != "generator":
+            return False
+        content = (tag.get("content") or "").lower()
+        return any(value in content for value in self.generators)
+
+    def remove_badges(self, soup):
+        text_rules = []
+        if self.text_rules:
+            document_text = _squash(soup.get_text())
+            text_rules = [
+                rule for rule in self.text_rules
+                if all(_squash(phrase) in document_text for phrase in rule[1])
+            ]
+
+        # Pre-order walk that skips the subtree of anything it removes, so every
+        # element is visited at most once and outer badge containers win.
+        matched = []
+        stack = [soup]
+        while stack:
+            node = stack.pop()
+            for child in reversed(node.contents):
+                if child.name is None:
+                    continue
+                if child.name in self.tag_names and self._matches(child, text_rules):
+                    matched.append(child)
+                else:
+                    stack.append(child)
+
+        for tag in matched:
+            tag.decompose()
+        return len(matched)
+
+    def _matches(self, tag, text_rules):
+        for check in self.checks.get(tag.name, ()):
+            if check(tag):
+                return True
+
+        for tags, phrases, max_length, inside in text_rules:
+            if tag.name not in tags:
+                continue
+            text = _short_text(tag, max_length)
+            if text and all(phrase in text for phrase in phrases) and (inside is None or inside(tag)):
+                return True
+        return False
+
+
+_matchers = {}
+
+
+def get_badge_matcher(platform):
+    if platform not in _matchers:
+        if platform not in BADGE_RULES:
+            raise ValueError(f"No badge rules for platform: {platform}")
+        _matchers[platform] = BadgeMatcher(BADGE_RULES[platform])
+    return _matchers[platform]
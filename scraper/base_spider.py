@@ -1,17 +1,31 @@
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
+from scraper.html_parser import make_soup
 from urllib.parse import urljoin, urlparse
 import os
 import re
+import time
 import logging
+from scraper.badge_rules import get_badge_matcher
+from scraper.sitemap import SitemapDiscoverer, order_page_urls, fetch_titles
+from scraper.downloads import DownloadBudget
+from scraper.http_cache import fetch_page, fetch_asset, use_blob
+from scraper.progress import JobProgress
 
 logger = logging.getLogger(__name__)
 
 class BaseSiteSpider:
-    def __init__(self, url, output_dir, scrape_mode="multi_page", selected_pages=None):
+    MAX_PAGES = 150
+    DISCOVERY_MAX_DEPTH = 3
+    DISCOVERY_LINKS_PER_PAGE = 10
+    DISCOVERY_PAGE_BUDGET = 100
+    DISCOVERY_TIME_BUDGET = 20
+    platform = None
+
+    def __init__(self, url, archive=None, scrape_mode="multi_page", selected_pages=None,
+                 max_concurrency=8, per_host_concurrency=4, max_asset_concurrency=16):
         self.start_url = url
-        self.output_dir = output_dir
+        self.archive = archive
         self.scrape_mode = scrape_mode
         self.selected_pages = set(selected_pages) if selected_pages else None
         self.visited_pages = set()
@@ -19,56 +33,108 @@ class BaseSiteSpider:
         self.base_domain = urlparse(url).netloc
         self.page_mapping = {}
         self.discovered_pages = []
+        self.discovered_depths = {}
+        self.queued_pages = set()
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.host_semaphores = {}
+        self.asset_semaphore = asyncio.Semaphore(max(1, max_asset_concurrency))
+        self.asset_tasks = {}
+        self.asset_timings = []
+        self.download_budget = DownloadBudget()
+        self.progress = JobProgress()
     
-    async def discover_pages(self):
+    async def discover_pages(self, page_budget=None, time_budget=None):
+        page_budget = page_budget or self.DISCOVERY_PAGE_BUDGET
+        time_budget = time_budget or self.DISCOVERY_TIME_BUDGET
+        
         try:
             async with aiohttp.ClientSession() as session:
-                await self.discover_page_links(session, self.start_url)
+                sitemap_pages = await self.discover_from_sitemaps(session, page_budget, time_budget)
+                if sitemap_pages:
+                    self.discovered_pages = sitemap_pages
+                    return self.discovered_pages
+                
+                self.visited_pages.add(self.start_url)
+                try:
+                    await asyncio.wait_for(
+                        self.run_frontier(
+                            [(self.start_url, 0)],
+                            lambda item, enqueue: self.discover_page_links(session, item, enqueue, page_budget),
+                            self.max_concurrency
+                        ),
+                        timeout=time_budget
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        f"Page discovery hit its {time_budget}s budget, "
+                        f"returning {len(self.discovered_pages)} pages found so far"
+                    )
+            
+            self.discovered_pages.sort(key=lambda page: self.discovered_depths.get(page['url'], 0))
             return self.discovered_pages
         except Exception as e:
             logger.error(f"Failed to discover pages: {e}", exc_info=True)
             raise
     
-    async def discover_page_links(self, session, url, depth=0):
-        if url in self.visited_pages or depth > 3:
-            return
+    async def discover_from_sitemaps(self, session, page_budget, time_budget):
+        urls = await SitemapDiscoverer(session, self.start_url, max_urls=page_budget).discover()
+        if not urls:
+            return []
         
-        self.visited_pages.add(url)
+        urls = order_page_urls(self.start_url, urls, page_budget)
+        titles = await fetch_titles(
+            session, urls,
+            concurrency=self.per_host_concurrency,
+            time_budget=time_budget,
+            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+        )
+        return [{
+            'url': url,
+            'title': titles.get(url) or self.get_page_name_from_url(url),
+            'path': self.get_clean_path(url)
+        } for url in urls]
+    
+    async def discover_page_links(self, session, item, enqueue, page_budget):
+        url, depth = item
         
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             }
             
-            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status != 200:
-                    logger.warning(f"Non-200 status for {url}: {response.status}")
-                    return
-                
-                html_content = await response.text()
-                soup = BeautifulSoup(html_content, 'html.parser')
+            async with self.get_host_semaphore(url):
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    if response.status != 200:
+                        logger.warning(f"Non-200 status for {url}: {response.status}")
+                        return
+                    
+                    html_content = await response.text()
+            
+            soup = make_soup(html_content)
 
-                title_tag = soup.find('title')
-                page_title = title_tag.get_text().strip() if title_tag else self.get_page_name_from_url(url)
+            title_tag = soup.find('title')
+            page_title = title_tag.get_text().strip() if title_tag else self.get_page_name_from_url(url)
 
-                self.discovered_pages.append({
-                    'url': url,
-                    'title': page_title,
-                    'path': self.get_clean_path(url)
-                })
+            self.discovered_pages.append({
+                'url': url,
+                'title': page_title,
+                'path': self.get_clean_path(url)
+            })
+            self.discovered_depths[url] = depth
+            
+            if depth >= self.DISCOVERY_MAX_DEPTH:
+                return
 
-                internal_links = []
-                for a in soup.find_all('a', href=True):
-                    href = a.get('href')
-                    if self.is_internal_link(href, url):
-                        full_url = urljoin(url, href)
-                        clean_url = full_url.split('#')[0].split('?')[0]
-                        if clean_url not in internal_links and clean_url != url:
-                            internal_links.append(clean_url)
+            internal_links = [link for link in self.extract_internal_links(soup, url) if link != url]
 
-                for link_url in internal_links[:10]:
-                    if link_url not in self.visited_pages:
-                        await self.discover_page_links(session, link_url, depth + 1)
+            for link_url in internal_links[:self.DISCOVERY_LINKS_PER_PAGE]:
+                if link_url in self.visited_pages:
+                    continue
+                if len(self.visited_pages) >= page_budget:
+                    break
+                self.visited_pages.add(link_url)
+                enqueue((link_url, depth + 1))
         
         except asyncio.TimeoutError:
             logger.error(f"Timeout while discovering links on {url}")
@@ -81,18 +147,56 @@ class BaseSiteSpider:
         try:
             async with aiohttp.ClientSession() as session:
                 if self.scrape_mode == "single_page":
-                    await self.scrape_page(session, self.start_url)
+                    seeds = [self.start_url]
+                elif self.selected_pages:
+                    seeds = list(self.selected_pages)
                 else:
-                    if self.selected_pages:
-                        for page_url in self.selected_pages:
-                            await self.scrape_page(session, page_url)
-                    else:
-                        await self.scrape_page(session, self.start_url)
+                    seeds = [self.start_url]
+                
+                self.progress.discovered(len(seeds))
+                await self.run_frontier(
+                    seeds,
+                    lambda url, enqueue: self.scrape_page(session, url, enqueue),
+                    self.max_concurrency
+                )
         except Exception as e:
             logger.error(f"Scraping failed: {e}", exc_info=True)
             raise
     
-    async def scrape_page(self, session, url):
+    async def run_frontier(self, seeds, handler, concurrency):
+        frontier = asyncio.Queue()
+        
+        def enqueue(item):
+            frontier.put_nowait(item)
+        
+        for seed in seeds:
+            enqueue(seed)
+        
+        async def worker():
+            while True:
+                item = await frontier.get()
+                try:
+                    await handler(item, enqueue)
+                except Exception as e:
+                    logger.error(f"Frontier worker failed on {item}: {e}", exc_info=True)
+                finally:
+                    frontier.task_done()
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+        try:
+            await frontier.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    def get_host_semaphore(self, url):
+        host = urlparse(url).netloc
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self.host_semaphores[host]
+    
+    async def scrape_page(self, session, url, enqueue=None):
         if url in self.visited_pages:
             return
 
@@ -102,45 +206,47 @@ class BaseSiteSpider:
         if self.selected_pages and url not in self.selected_pages:
             return
 
-        if len(self.visited_pages) >= 150:
-            logger.warning(f"Reached page limit (150), stopping scrape")
+        if len(self.visited_pages) >= self.MAX_PAGES:
+            logger.warning(f"Reached page limit ({self.MAX_PAGES}), stopping scrape")
             return
         
         self.visited_pages.add(url)
-        logger.info(f"Scraping page: {url} ({len(self.visited_pages)}/150)")
+        logger.info(f"Scraping page: {url} ({len(self.visited_pages)}/{self.MAX_PAGES})")
         
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             }
             
-            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status != 200:
-                    logger.warning(f"Failed to load {url}: Status {response.status}")
-                    return
-                
-                html_content = await response.text()
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                relative_path = self.get_clean_path(url)
-                full_file_path = os.path.join(self.output_dir, relative_path)
-                
-                os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
-                
-                self.page_mapping[url] = relative_path
-                
-                processed_html = self.process_html_content(html_content, url)
-                processed_html = self.remove_platform_badge(processed_html)
-                
-                with open(full_file_path, 'w', encoding='utf-8') as f:
-                    f.write(processed_html)
-                
-                logger.info(f"Saved HTML: {relative_path} ({self.get_platform_name()} processing)")
+            async with self.get_host_semaphore(url):
+                status, html_content = await fetch_page(
+                    session, url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)
+                )
+            if status != 200:
+                logger.warning(f"Failed to load {url}: Status {status}")
+                return
+            
+            soup = make_soup(html_content)
+            
+            relative_path = self.get_clean_path(url)
+            self.page_mapping[url] = relative_path
+            
+            asset_urls = self.extract_asset_urls(soup)
+            internal_links = []
+            if self.scrape_mode == "multi_page" and not self.selected_pages and enqueue:
+                internal_links = self.extract_internal_links(soup, url)
+            
+            processed_html = self.transform_page(soup, url)
+            
+            await self.archive.write_text(relative_path, processed_html)
+            self.progress.page_scraped()
+            
+            logger.info(f"Saved HTML: {relative_path} ({self.get_platform_name()} processing)")
 
-                await self.download_assets(session, soup, url)
-                
-                if self.scrape_mode == "multi_page" and not self.selected_pages:
-                    await self.scrape_internal_links(session, soup, url)
+            await self.download_assets(session, asset_urls, url)
+            
+            if internal_links:
+                self.scrape_internal_links(internal_links, url, enqueue)
         
         except asyncio.TimeoutError:
             logger.error(f"Timeout while scraping {url}")
@@ -196,80 +302,122 @@ class BaseSiteSpider:
             logger.error(f"Error getting clean path for {url}: {e}")
             return 'index.html'
     
-    async def download_assets(self, session, soup, base_url):
+    def extract_asset_urls(self, soup):
+        css_links = [link.get('href') for link in soup.find_all('link', rel='stylesheet') if link.get('href')]
+        js_links = [script.get('src') for script in soup.find_all('script', src=True)]
+        img_links = [img.get('src') for img in soup.find_all('img', src=True)]
+        
+        style_tags = soup.find_all('style')
+        font_urls = []
+        for style in style_tags:
+            if style.string:
+                font_urls.extend(re.findall(r'url\(["\']?([^"\']+\.(?:woff2?|ttf|eot|otf))["\']?\)', style.string))
+        
+        return css_links + js_links + img_links + font_urls
+    
+    async def download_assets(self, session, all_assets, base_url):
         try:
-            css_links = [link.get('href') for link in soup.find_all('link', rel='stylesheet') if link.get('href')]
-            js_links = [script.get('src') for script in soup.find_all('script', src=True)]
-            img_links = [img.get('src') for img in soup.find_all('img', src=True)]
-            
-            style_tags = soup.find_all('style')
-            font_urls = []
-            for style in style_tags:
-                if style.string:
-                    font_urls.extend(re.findall(r'url\(["\']?([^"\']+\.(?:woff2?|ttf|eot|otf))["\']?\)', style.string))
-            
-            all_assets = css_links + js_links + img_links + font_urls
+            started = time.perf_counter()
+            page_tasks = {}
+            shared = 0
             
             for asset_url in all_assets:
-                if asset_url and asset_url not in self.assets:
+                if not asset_url:
+                    continue
+                
+                full_url = self.resolve_asset_url(asset_url, base_url)
+                if full_url in page_tasks:
+                    continue
+                
+                if full_url in self.asset_tasks:
+                    shared += 1
+                else:
                     self.assets.add(asset_url)
-                    await self.download_asset(session, asset_url, base_url)
+                    self.asset_tasks[full_url] = asyncio.ensure_future(
+                        self.download_asset(session, asset_url, base_url)
+                    )
+                page_tasks[full_url] = self.asset_tasks[full_url]
+            
+            results = await asyncio.gather(*page_tasks.values(), return_exceptions=True)
+            
+            elapsed = time.perf_counter() - started
+            self.asset_timings.append({
+                'url': base_url,
+                'assets': len(page_tasks),
+                'shared': shared,
+                'downloaded': sum(1 for result in results if result is True),
+                'seconds': round(elapsed, 3)
+            })
+            logger.info(
+                f"Assets for {base_url}: {len(page_tasks)} unique ({shared} shared with other pages) "
+                f"in {elapsed:.2f}s"
+            )
         except Exception as e:
             logger.error(f"Error downloading assets from {base_url}: {e}", exc_info=True)
     
-    async def scrape_internal_links(self, session, soup, base_url):
+    def extract_internal_links(self, soup, base_url):
+        internal_links = []
+        for a in soup.find_all('a', href=True):
+            href = a.get('href')
+            if self.is_internal_link(href, base_url):
+                full_url = urljoin(base_url, href)
+                clean_url = full_url.split('#')[0].split('?')[0]
+                if clean_url not in internal_links:
+                    internal_links.append(clean_url)
+        return internal_links
+    
+    def scrape_internal_links(self, internal_links, base_url, enqueue):
         try:
-            internal_links = []
-            for a in soup.find_all('a', href=True):
-                href = a.get('href')
-                if self.is_internal_link(href, base_url):
-                    full_url = urljoin(base_url, href)
-                    clean_url = full_url.split('#')[0].split('?')[0]
-                    if clean_url not in internal_links:
-                        internal_links.append(clean_url)
-            
             logger.info(f"Found {len(internal_links)} internal links to scrape")
             
             for link_url in internal_links:
-                if link_url not in self.visited_pages:
-                    await self.scrape_page(session, link_url)
+                if link_url in self.visited_pages or link_url in self.queued_pages:
+                    continue
+                if len(self.queued_pages) >= self.MAX_PAGES:
+                    break
+                self.queued_pages.add(link_url)
+                enqueue(link_url)
+            self.progress.discovered(len(self.visited_pages | self.queued_pages))
         except Exception as e:
             logger.error(f"Error scraping internal links from {base_url}: {e}", exc_info=True)
     
+    def resolve_asset_url(self, asset_url, base_url):
+        if asset_url.startswith('//'):
+            return 'https:' + asset_url
+        elif asset_url.startswith('/'):
+            return f"https://{self.base_domain}{asset_url}"
+        elif asset_url.startswith('http'):
+            return asset_url
+        return urljoin(base_url, asset_url)
+    
     async def download_asset(self, session, asset_url, base_url):
         try:
+            full_url = self.resolve_asset_url(asset_url, base_url)
+            
             if asset_url.startswith('//'):
-                full_url = 'https:' + asset_url
+                local_path = asset_url[2:]
             elif asset_url.startswith('/'):
-                full_url = f"https://{self.base_domain}{asset_url}"
+                local_path = asset_url[1:]
             elif asset_url.startswith('http'):
-                full_url = asset_url
+                parsed = urlparse(asset_url)
+                local_path = f"{parsed.netloc}{parsed.path}"
             else:
-                full_url = urljoin(base_url, asset_url)
+                local_path = asset_url
             
-            async with session.get(full_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status == 200:
-                    content = await response.read()
-                    
-                    if asset_url.startswith('//'):
-                        local_path = asset_url[2:]
-                    elif asset_url.startswith('/'):
-                        local_path = asset_url[1:]
-                    elif asset_url.startswith('http'):
-                        parsed = urlparse(asset_url)
-                        local_path = f"{parsed.netloc}{parsed.path}"
-                    else:
-                        local_path = asset_url
-                    
-                    full_local_path = os.path.join(self.output_dir, local_path)
-                    os.makedirs(os.path.dirname(full_local_path), exist_ok=True)
-                    
-                    with open(full_local_path, 'wb') as f:
-                        f.write(content)
-                    
-                    logger.debug(f"Saved asset: {local_path}")
-                else:
-                    logger.warning(f"Failed to download asset {asset_url}: Status {response.status}")
+            timeout = aiohttp.ClientTimeout(total=30)
+            async with self.asset_semaphore:
+                fetched = await fetch_asset(session, full_url, self.download_budget, timeout=timeout)
+            if not fetched:
+                return False
+            
+            blob_path, _ = fetched
+            await use_blob(
+                lambda path: self.archive.write_file(local_path, path),
+                blob_path, session, full_url, self.download_budget, timeout=timeout
+            )
+            self.progress.asset_fetched(self.download_budget.bytes_downloaded)
+            logger.debug(f"Saved asset: {local_path}")
+            return True
         
         except asyncio.TimeoutError:
             logger.error(f"Timeout downloading asset {asset_url}")
@@ -279,6 +427,7 @@ class BaseSiteSpider:
             logger.error(f"File IO error saving asset {asset_url}: {e}")
         except Exception as e:
             logger.error(f"Unexpected error downloading asset {asset_url}: {e}", exc_info=True)
+        return False
     
     def is_internal_link(self, link, current_url):
         try:
@@ -332,47 +481,67 @@ class BaseSiteSpider:
             logger.error(f"Error calculating relative path from {from_path} to {to_path}: {e}")
             return to_path
     
-    def process_html_content(self, html, base_url):
+    def transform_page(self, soup, base_url):
+        self.process_html_content(soup, base_url)
+        self.remove_platform_badge(soup)
+        self.inject_badge_css(soup)
+        return str(soup)
+    
+    def process_html_content(self, soup, base_url):
         try:
             domain = urlparse(base_url).netloc
-            html = re.sub(rf'https?://{re.escape(domain)}/', './', html)
-            html = re.sub(rf'https?://{re.escape(domain)}', '.', html)
-            
-            soup = BeautifulSoup(html, 'html.parser')
+            domain_pattern = re.compile(rf'https?://{re.escape(domain)}(/?)')
+            replace_domain = lambda match: './' if match.group(1) else '.'
             current_page_path = self.get_clean_path(base_url)
             
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                
-                if href.startswith(('mailto:', 'tel:', 'javascript:')):
-                    continue
-                
-                if href.startswith('#'):
-                    continue
-
-                if href.startswith('/'):
-                    if href == '/' or href == '':
-                        link['href'] = self.get_relative_path(current_page_path, 'index.html')
-                    else:
-                        target_url = urljoin(base_url, href)
-                        target_path = self.get_clean_path(target_url)
-                        link['href'] = self.get_relative_path(current_page_path, target_path)
+            for tag in soup.find_all(True):
+                for attr, value in tag.attrs.items():
+                    if attr == 'href' and tag.name == 'a':
+                        tag[attr] = self.rewrite_page_link(value, base_url, current_page_path)
+                    elif isinstance(value, str) and domain in value:
+                        tag[attr] = domain_pattern.sub(replace_domain, value)
                 
-                elif href.startswith(('http://', 'https://')):
-                    link_domain = urlparse(href).netloc
-                    base_domain = urlparse(base_url).netloc
-                    
-                    if link_domain == base_domain:
-                        target_path = self.get_clean_path(href)
-                        link['href'] = self.get_relative_path(current_page_path, target_path)
-            
-            return str(soup)
+                if tag.name in ('script', 'style') and tag.string and domain in tag.string:
+                    tag.string = domain_pattern.sub(replace_domain, tag.string)
         except Exception as e:
             logger.error(f"Error processing HTML content for {base_url}: {e}", exc_info=True)
-            return html
     
-    def remove_platform_badge(self, html_content):
-        raise NotImplementedError("Subclasses must implement remove_platform_badge")
+    def rewrite_page_link(self, href, base_url, current_page_path):
+        if href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            return href
+        
+        if href.startswith('/'):
+            if href == '/':
+                return self.get_relative_path(current_page_path, 'index.html')
+            target_path = self.get_clean_path(urljoin(base_url, href))
+            return self.get_relative_path(current_page_path, target_path)
+        
+        if href.startswith(('http://', 'https://')):
+            if urlparse(href).netloc == urlparse(base_url).netloc:
+                target_path = self.get_clean_path(href)
+                return self.get_relative_path(current_page_path, target_path)
+        
+        return href
+    
+    def inject_badge_css(self, soup):
+        badge_css = get_badge_matcher(self.platform).css
+        if not badge_css:
+            return
+        
+        style = soup.new_tag('style')
+        style.string = badge_css
+        
+        if soup.head:
+            soup.head.append(style)
+        elif soup.body:
+            soup.body.insert(0, style)
+        else:
+            soup.insert(0, style)
+    
+    def remove_platform_badge(self, soup):
+        removed = get_badge_matcher(self.platform).remove_badges(soup)
+        if removed:
+            logger.debug(f"Removed {removed} {self.get_platform_name()} badge element(s)")
     
     def get_platform_name(self):
         raise NotImplementedError("Subclasses must implement get_platform_name")
\ No newline at end of file
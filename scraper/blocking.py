@@ -0,0 +1,167 @@
+import asyncio
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BlockingExecutor:
+    """Dedicated thread pool for blocking filesystem and compression work.
+
+    At most max_workers + max_queue calls are outstanding at once; further
+    callers wait for a slot on the event loop instead of piling work onto the
+    pool. A slot is held until the call has actually finished in its thread, so
+    cancelled callers do not let the queue grow past its bound.
+    """
+
+    def __init__(self, max_workers=None, max_queue=None):
+        self.max_workers = max_workers or settings.BLOCKING_IO_WORKERS
+        self.max_queue = max_queue or settings.BLOCKING_IO_QUEUE_DEPTH
+        self.pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="blocking-io")
+        self.slots = None
+        self.loop = None
+        self.waiting = 0
+        self.outstanding = 0
+        self.max_outstanding = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+
+    def _slots(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        return self.slots
+
+    async def run(self, func, *args):
+        slots = self._slots()
+        loop = self.loop
+        queued_at = time.perf_counter()
+
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.outstanding += 1
+        self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        timing = []
+        try:
+            future = self.pool.submit(self._timed, func, args, timing)
+        except BaseException:
+            self.outstanding -= 1
+            slots.release()
+            raise
+
+        def on_done(done):
+            try:
+                loop.call_soon_threadsafe(self._finished, slots, done, queued_at, timing)
+            except RuntimeError:
+                pass
+
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def _timed(func, args, timing):
+        timing.append(time.perf_counter())
+        try:
+            return func(*args)
+        finally:
+            timing.append(time.perf_counter())
+
+    def _finished(self, slots, future, queued_at, timing):
+        self.outstanding -= 1
+        slots.release()
+
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        if len(timing) == 2:
+            started, finished = timing
+            self.queue_seconds += started - queued_at
+            self.max_queue_seconds = max(self.max_queue_seconds, started - queued_at)
+            self.busy_seconds += finished - started
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+    def stats(self):
+        calls = self.completed + self.failed
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "outstanding": self.outstanding,
+            "waiting": self.waiting,
+            "max_outstanding": self.max_outstanding,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "avg_queue_ms": round(self.queue_seconds / calls * 1000, 2) if calls else 0.0,
+            "max_queue_ms": round(self.max_queue_seconds * 1000, 2)
+        }
+
+
+class LoopMonitor:
+    """Measures how long the event loop is kept busy by sampling how late a periodic timer fires"""
+
+    def __init__(self, interval=None, stall_threshold=None):
+        self.interval = interval or settings.LOOP_MONITOR_INTERVAL
+        self.stall_threshold = stall_threshold or settings.LOOP_STALL_THRESHOLD
+        self.task = None
+        self.samples = 0
+        self.lag_seconds = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+
+            self.samples += 1
+            self.lag_seconds += lag
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.stall_threshold:
+                self.stalls += 1
+                logger.warning(f"Event loop was blocked for {lag:.3f}s")
+
+    def stats(self):
+        return {
+            "running": self.task is not None and not self.task.done(),
+            "samples": self.samples,
+            "busy_seconds": round(self.lag_seconds, 3),
+            "avg_lag_ms": round(self.lag_seconds / self.samples * 1000, 2) if self.samples else 0.0,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "stalls": self.stalls
+        }
+
+
+blocking_executor = BlockingExecutor()
+loop_monitor = LoopMonitor()
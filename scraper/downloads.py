@@ -0,0 +1,89 @@
+import os
+import hashlib
+import logging
+from config import settings
+from scraper.blocking import blocking_executor
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadBudget:
+    """Streams response bodies to disk while enforcing per-asset and per-job byte caps"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, max_asset_bytes=None, max_job_bytes=None):
+        self.max_asset_bytes = max_asset_bytes or settings.MAX_ASSET_BYTES
+        self.max_job_bytes = max_job_bytes or settings.MAX_JOB_BYTES
+        self.bytes_downloaded = 0
+        self.skipped = []
+
+    def skip(self, url, reason, size):
+        self.skipped.append({"url": url, "reason": reason, "bytes": size})
+        logger.warning(f"Skipping {url}: {reason} ({size} bytes)")
+
+    def check_declared_size(self, url, content_length):
+        if content_length is None:
+            return True
+        if content_length > self.max_asset_bytes:
+            self.skip(url, "asset_too_large", content_length)
+            return False
+        if self.bytes_downloaded + content_length > self.max_job_bytes:
+            self.skip(url, "job_budget_exceeded", content_length)
+            return False
+        return True
+
+    def reserve(self, url, size):
+        """Account for bytes that arrive without a download, such as assets restored from the asset store"""
+        if not self.check_declared_size(url, size):
+            return False
+        self.bytes_downloaded += size
+        return True
+
+    def release(self, size):
+        self.bytes_downloaded -= size
+
+    async def stream_to_file(self, url, response, path):
+        """Write the response body to path in chunks, returning its sha256 digest or None if a cap was hit"""
+        if not self.check_declared_size(url, response.content_length):
+            return None
+
+        written = 0
+        digest = hashlib.sha256()
+        try:
+            f = await blocking_executor.run(open, path, 'wb')
+            try:
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    written += len(chunk)
+                    self.bytes_downloaded += len(chunk)
+
+                    if written > self.max_asset_bytes:
+                        reason = "asset_too_large"
+                    elif self.bytes_downloaded > self.max_job_bytes:
+                        reason = "job_budget_exceeded"
+                    else:
+                        digest.update(chunk)
+                        await blocking_executor.run(f.write, chunk)
+                        continue
+
+                    self.bytes_downloaded -= written
+                    self.skip(url, reason, written)
+                    break
+                else:
+                    return digest.hexdigest()
+            finally:
+                await blocking_executor.run(f.close)
+        except BaseException:
+            self.bytes_downloaded -= written
+            self.discard(path)
+            raise
+
+        self.discard(path)
+        return None
+
+    @staticmethod
+    def discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
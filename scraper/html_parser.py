@@ -0,0 +1,60 @@
+import logging
+from bs4 import BeautifulSoup
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_PARSER = 'html.parser'
+
+
+def _resolve_default_parser():
+    parser = settings.HTML_PARSER
+    if parser == 'lxml':
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            logger.warning("lxml is not installed, falling back to html.parser")
+            return FALLBACK_PARSER
+    return parser
+
+
+DEFAULT_PARSER = _resolve_default_parser()
+
+
+def _is_mangled(markup, soup):
+    if isinstance(markup, bytes):
+        has_tags = b'<' in markup
+        has_body = b'<body' in markup[:200000].lower()
+    else:
+        has_tags = '<' in markup
+        has_body = '<body' in markup[:200000].lower()
+
+    if has_tags and soup.find() is None:
+        return True
+    if has_body and soup.body is None:
+        return True
+    return False
+
+
+def make_soup(markup, parser=None, fragment=False):
+    """Parse markup with the configured backend, retrying with html.parser if lxml mangles it.
+
+    Fragments always use html.parser because lxml wraps them in <html><body>.
+    """
+    if fragment:
+        return BeautifulSoup(markup, FALLBACK_PARSER)
+
+    parser = parser or DEFAULT_PARSER
+    if parser == FALLBACK_PARSER:
+        return BeautifulSoup(markup, FALLBACK_PARSER)
+
+    # Bytes are left to lxml: a stray NUL makes bs4's encoding sniffing read
+    # them as UTF-16 under html.parser.
+    if isinstance(markup, str) and '\x00' in markup:
+        return BeautifulSoup(markup, FALLBACK_PARSER)
+
+    soup = BeautifulSoup(markup, parser)
+    if _is_mangled(markup, soup):
+        logger.debug(f"{parser} mangled a {len(markup)} byte document, reparsing with {FALLBACK_PARSER}")
+        return BeautifulSoup(markup, FALLBACK_PARSER)
+    return soup
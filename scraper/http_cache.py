@@ -0,0 +1,161 @@
+import re
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from config import settings
+from scraper.asset_store import asset_store
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE_PATTERN = re.compile(r'max-age\s*=\s*"?(\d+)')
+CHARSET_PATTERN = re.compile(r'charset\s*=\s*"?([\w.:-]+)', re.IGNORECASE)
+
+
+def freshness_lifetime(headers, default):
+    """Seconds a response may be reused without revalidation, or None if it must not be stored"""
+    cache_control = headers.get('Cache-Control', '').lower()
+    if 'no-store' in cache_control:
+        return None
+    if 'no-cache' in cache_control:
+        return 0
+
+    match = MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        return int(match.group(1))
+
+    expires = headers.get('Expires')
+    if expires:
+        try:
+            return max(0, int(parsedate_to_datetime(expires).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return 0
+
+    return default
+
+
+def conditional_headers(entry):
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.etag:
+        headers['If-None-Match'] = entry.etag
+    if entry.last_modified:
+        headers['If-Modified-Since'] = entry.last_modified
+    return headers
+
+
+def decode_body(body, content_type):
+    match = CHARSET_PATTERN.search(content_type or '')
+    encoding = match.group(1) if match else 'utf-8'
+    try:
+        return body.decode(encoding, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+async def fetch_page(session, url, headers=None, **kwargs):
+    """GET an HTML page, revalidating any stored copy; returns (status, text).
+
+    Pages are always revalidated. A 304 is answered from the stored body and
+    reported as a 200 so callers do not need to know about the cache.
+    """
+    cached = await asset_store.lookup(url)
+    request_headers = dict(headers or {})
+    request_headers.update(conditional_headers(cached))
+
+    async with session.get(url, headers=request_headers, **kwargs) as response:
+        if response.status == 304 and cached:
+            body = await asset_store.read(cached)
+            if body is not None:
+                await asset_store.revalidated(url, cached, freshness_lifetime(response.headers, 0) or 0)
+                return 200, decode_body(body, cached.content_type)
+        elif response.status != 200:
+            return response.status, None
+        else:
+            body = await response.read()
+            text = await response.text(errors='replace')
+
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if freshness_lifetime(response.headers, 0) is not None and (etag or last_modified):
+                await asset_store.put_bytes(
+                    url, body, response.headers.get('content-type', ''), 0, etag, last_modified
+                )
+            return 200, text
+
+    logger.debug(f"Stored copy of {url} disappeared during revalidation, refetching")
+    return await fetch_page(session, url, headers, **kwargs)
+
+
+async def _cached_blob(url, entry, budget):
+    """Blob path for a stored entry, None if the job budget refuses it, or False if the blob is gone"""
+    if not budget.reserve(url, entry.size):
+        return None
+    path = await asset_store.locate(entry)
+    if path:
+        return path, entry.content_type
+    budget.release(entry.size)
+    return False
+
+
+async def fetch_asset(session, url, budget, headers=None, **kwargs):
+    """Fetch an asset into the shared asset store and return (blob_path, content_type).
+
+    Fresh entries are served without a request, stale ones are revalidated with
+    their validators and a 304 is served from the stored blob. Returns None if
+    the asset was unavailable or over budget. Blob files must not be modified.
+    """
+    cached = await asset_store.lookup(url)
+    if cached and cached.fresh:
+        found = await _cached_blob(url, cached, budget)
+        if found is not False:
+            return found
+        cached = None
+
+    request_headers = dict(headers or {})
+    request_headers.update(conditional_headers(cached))
+
+    async with session.get(url, headers=request_headers, **kwargs) as response:
+        if response.status == 304 and cached:
+            await asset_store.revalidated(url, cached, freshness_lifetime(response.headers, settings.ASSET_STORE_TTL) or 0)
+            found = await _cached_blob(url, cached, budget)
+            if found is not False:
+                return found
+        elif response.status != 200:
+            logger.warning(f"Failed to download {url}: HTTP {response.status}")
+            return None
+        else:
+            content_type = response.headers.get('content-type', '')
+            staging_path = asset_store.staging_path()
+
+            digest = await budget.stream_to_file(url, response, staging_path)
+            if not digest:
+                return None
+
+            max_age = freshness_lifetime(response.headers, settings.ASSET_STORE_TTL)
+            blob_path = await asset_store.put(
+                url, staging_path, digest, content_type, max_age,
+                response.headers.get('ETag'), response.headers.get('Last-Modified')
+            )
+            return blob_path, content_type
+
+    logger.debug(f"Stored copy of {url} disappeared during revalidation, refetching")
+    return await fetch_asset(session, url, budget, headers, **kwargs)
+
+
+async def use_blob(use, blob_path, session, url, budget, **kwargs):
+    """Await use(blob_path), fetching the asset again and retrying once if its blob was evicted meanwhile.
+
+    Blobs returned by fetch_asset stay on disk for at least the store's min_idle,
+    but a job that holds one longer than that can find it gone.
+    """
+    try:
+        return await use(blob_path)
+    except FileNotFoundError:
+        await asset_store.forget_path(blob_path)
+
+    logger.debug(f"Stored copy of {url} was evicted before it was used, refetching")
+    fetched = await fetch_asset(session, url, budget, **kwargs)
+    if not fetched:
+        raise FileNotFoundError(f"{url} was evicted from the asset store and could not be fetched again")
+    return await use(fetched[0])
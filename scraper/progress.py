@@ -0,0 +1,70 @@
+import time
+
+
+class JobProgress:
+    """Reports a scrape job's progress as typed events through a publish callable.
+
+    Page and asset counters change far more often than anyone needs to see, so
+    their events are throttled to one per MIN_INTERVAL; stage changes flush the
+    latest counters first. Without a job_id or publisher nothing is reported.
+    """
+
+    MIN_INTERVAL = 0.25
+
+    def __init__(self, job_id=None, publish=None):
+        self.job_id = job_id
+        self.publish = publish if job_id else None
+        self.pages_discovered = 0
+        self.pages_scraped = 0
+        self.assets_fetched = 0
+        self.bytes_downloaded = 0
+        self.last_sent = {}
+        self.dirty = set()
+
+    def emit(self, event_type, **data):
+        if self.publish:
+            self.publish(self.job_id, event_type, data)
+
+    def counters(self, event_type):
+        if event_type == "pages":
+            return {
+                "pages_discovered": self.pages_discovered,
+                "pages_scraped": self.pages_scraped
+            }
+        return {
+            "assets_fetched": self.assets_fetched,
+            "bytes_downloaded": self.bytes_downloaded
+        }
+
+    def throttled(self, event_type):
+        now = time.monotonic()
+        if now - self.last_sent.get(event_type, 0.0) < self.MIN_INTERVAL:
+            self.dirty.add(event_type)
+            return
+        self.last_sent[event_type] = now
+        self.dirty.discard(event_type)
+        self.emit(event_type, **self.counters(event_type))
+
+    def flush(self):
+        for event_type in sorted(self.dirty):
+            self.emit(event_type, **self.counters(event_type))
+        self.dirty.clear()
+
+    def discovered(self, count):
+        if count > self.pages_discovered:
+            self.pages_discovered = count
+            self.throttled("pages")
+
+    def page_scraped(self):
+        self.pages_scraped += 1
+        self.pages_discovered = max(self.pages_discovered, self.pages_scraped)
+        self.throttled("pages")
+
+    def asset_fetched(self, bytes_downloaded):
+        self.assets_fetched += 1
+        self.bytes_downloaded = bytes_downloaded
+        self.throttled("assets")
+
+    def stage(self, event_type, **data):
+        self.flush()
+        self.emit(event_type, **data)
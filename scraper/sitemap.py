@@ -0,0 +1,208 @@
+import asyncio
+import aiohttp
+import logging
+import re
+import zlib
+import xml.etree.ElementTree as ET
+from collections import deque
+from html import unescape
+from urllib.parse import urljoin, urlparse
+
+logger = logging.getLogger(__name__)
+
+TITLE_PATTERN = re.compile(rb'<title[^>]*>(.*?)</title', re.IGNORECASE | re.DOTALL)
+
+
+def page_key(url):
+    """Identify a page regardless of scheme, host case, a www. prefix, a trailing slash or a fragment"""
+    parsed = urlparse(url.split('#')[0])
+    return SitemapDiscoverer._bare_host(parsed.netloc), parsed.path.rstrip('/'), parsed.query
+
+
+def path_depth(url):
+    return len([segment for segment in urlparse(url).path.split('/') if segment])
+
+
+def order_page_urls(start_url, urls, limit):
+    """The start URL first, then the other pages shallowest first, each page once.
+
+    The first page is archived as index.html, so it must be the page the
+    scrape was started from, whatever order the sitemap lists pages in.
+    """
+    seen = {page_key(start_url)}
+    others = []
+    for url in urls:
+        key = page_key(url)
+        if key not in seen:
+            seen.add(key)
+            others.append(url)
+    others.sort(key=path_depth)
+    return [start_url] + others[:max(0, limit - 1)]
+
+
+async def fetch_titles(session, urls, concurrency=8, timeout=5, time_budget=10, headers=None, head_bytes=64 * 1024):
+    """Page titles for URLs found in sitemaps, which list pages without them.
+
+    Each page is read only until its </title>, at most head_bytes. Pages that
+    fail, have no title or are still loading when time_budget runs out are
+    left out, and callers fall back to a name derived from the URL.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def fetch_title(url):
+        async with semaphore:
+            try:
+                async with session.get(url, headers=headers, timeout=client_timeout) as response:
+                    if response.status != 200:
+                        return None
+                    head = b''
+                    async for chunk in response.content.iter_chunked(16 * 1024):
+                        head += chunk
+                        match = TITLE_PATTERN.search(head)
+                        if match:
+                            text = match.group(1).decode(response.charset or 'utf-8', errors='replace')
+                            return ' '.join(unescape(text).split()) or None
+                        if len(head) >= head_bytes:
+                            return None
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                logger.debug(f"Could not fetch title for {url}: {e}")
+            return None
+
+    tasks = {asyncio.ensure_future(fetch_title(url)): url for url in urls}
+    if not tasks:
+        return {}
+    done, pending = await asyncio.wait(tasks, timeout=time_budget)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.info(f"Fetched titles for {len(done)} of {len(tasks)} sitemap pages within {time_budget}s")
+    return {tasks[task]: task.result() for task in done if not task.cancelled() and task.result()}
+
+
+class SitemapDiscoverer:
+    """Collect page URLs from robots.txt sitemaps, streaming and parsing each sitemap incrementally"""
+
+    MAX_SITEMAPS = 10
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, session, start_url, max_urls=500, timeout=15):
+        self.session = session
+        self.start_url = start_url
+        self.max_urls = max_urls
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+        parsed = urlparse(start_url)
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        self.host = self._bare_host(parsed.netloc)
+
+    @staticmethod
+    def _bare_host(netloc):
+        netloc = netloc.lower()
+        return netloc[4:] if netloc.startswith('www.') else netloc
+
+    def is_same_site(self, url):
+        return self._bare_host(urlparse(url).netloc) == self.host
+
+    async def discover(self):
+        robots_sitemaps = await self.fetch_robots_sitemaps()
+        if robots_sitemaps:
+            return await self.walk_sitemaps(robots_sitemaps)
+
+        for fallback in ('/sitemap.xml', '/sitemap_index.xml'):
+            page_urls = await self.walk_sitemaps([f"{self.origin}{fallback}"])
+            if page_urls:
+                return page_urls
+        return []
+
+    async def walk_sitemaps(self, sitemap_urls):
+        pending = deque(sitemap_urls)
+        seen_sitemaps = set()
+        page_urls = []
+        seen_pages = set()
+
+        while pending and len(seen_sitemaps) < self.MAX_SITEMAPS and len(page_urls) < self.max_urls:
+            sitemap_url = pending.popleft()
+            if sitemap_url in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sitemap_url)
+
+            child_sitemaps, urls = await self.parse_sitemap(sitemap_url, self.max_urls - len(page_urls))
+            pending.extend(child_sitemaps)
+
+            for url in urls:
+                url = url.split('#')[0]
+                if url not in seen_pages and self.is_same_site(url):
+                    seen_pages.add(url)
+                    page_urls.append(url)
+
+        if page_urls:
+            logger.info(f"Sitemaps for {self.origin}: {len(page_urls)} pages from {len(seen_sitemaps)} sitemap(s)")
+        return page_urls[:self.max_urls]
+
+    async def fetch_robots_sitemaps(self):
+        try:
+            async with self.session.get(f"{self.origin}/robots.txt", timeout=self.timeout) as response:
+                if response.status != 200:
+                    return []
+                robots = await response.text(errors='ignore')
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            logger.debug(f"Could not fetch robots.txt for {self.origin}: {e}")
+            return []
+
+        sitemaps = []
+        for line in robots.splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() == 'sitemap' and value.strip():
+                sitemaps.append(urljoin(self.origin, value.strip()))
+        return sitemaps
+
+    async def parse_sitemap(self, sitemap_url, limit):
+        child_sitemaps = []
+        page_urls = []
+
+        try:
+            async with self.session.get(sitemap_url, timeout=self.timeout) as response:
+                if response.status != 200:
+                    return [], []
+
+                parser = ET.XMLPullParser(events=('start', 'end'))
+                decompressor = None
+                path = []
+                first_chunk = True
+
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    if first_chunk:
+                        first_chunk = False
+                        if chunk[:2] == b'\x1f\x8b':
+                            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    if decompressor:
+                        chunk = decompressor.decompress(chunk)
+
+                    parser.feed(chunk)
+                    for event, element in parser.read_events():
+                        tag = element.tag.rsplit('}', 1)[-1]
+                        if event == 'start':
+                            path.append(tag)
+                            continue
+
+                        path.pop()
+                        if tag == 'loc' and element.text and path:
+                            loc = element.text.strip()
+                            if path[-1] == 'sitemap':
+                                child_sitemaps.append(loc)
+                            elif path[-1] == 'url':
+                                page_urls.append(loc)
+                        elif tag in ('url', 'sitemap'):
+                            element.clear()
+
+                    if len(page_urls) >= limit:
+                        break
+        except ET.ParseError:
+            logger.debug(f"{sitemap_url} is not a valid sitemap")
+            return [], []
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            logger.debug(f"Could not fetch sitemap {sitemap_url}: {e}")
+            return [], []
+
+        return child_sitemaps, page_urls[:limit]
@@ -1,4 +1,4 @@
-from bs4 import BeautifulSoup
+from scraper.html_parser import make_soup
 import re
 from typing import Dict, List
 import hashlib
@@ -9,7 +9,7 @@ class ContentAbstractor:
         self.placeholder_counter = 0
 
     def abstract_content(self, html_content: str) -> Dict:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         
         text_abstractions = self._abstract_text_content(soup)
         image_abstractions = self._abstract_images(soup)
@@ -1,4 +1,5 @@
-from bs4 import BeautifulSoup, NavigableString
+from bs4 import NavigableString
+from scraper.html_parser import make_soup
 from typing import Dict, List, Set
 import json
 
@@ -21,7 +22,7 @@ class DOMSimplifier:
         }
 
     def simplify_dom(self, html_content: str) -> Dict:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         
         structure = self._create_semantic_tree(soup)
         components = self._identify_components(soup)
@@ -113,7 +114,7 @@ class DOMSimplifier:
         return patterns
 
     def _create_simplified_html(self, soup, structure: Dict, components: List[Dict]) -> str:
-        simplified = BeautifulSoup('<html><body></body></html>', 'html.parser')
+        simplified = make_soup('<html><body></body></html>')
         body = simplified.body
         
         for section in structure['sections']:
@@ -126,10 +127,10 @@ class DOMSimplifier:
                 section_elem.append(nav_elem)
             elif section['type'] == 'hero':
                 hero_content = self._create_hero_template(section)
-                section_elem.append(BeautifulSoup(hero_content, 'html.parser'))
+                section_elem.append(make_soup(hero_content, fragment=True))
             elif section['type'] == 'content_grid':
                 grid_content = self._create_grid_template(section)
-                section_elem.append(BeautifulSoup(grid_content, 'html.parser'))
+                section_elem.append(make_soup(grid_content, fragment=True))
             elif section['type'] == 'footer':
                 footer_elem = simplified.new_tag('footer')
                 footer_elem.string = '{{FOOTER_COMPONENT}}'
@@ -0,0 +1,157 @@
+import os
+import re
+import logging
+from typing import Optional, Tuple
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from scraper.archive import file_digest
+from scraper.blocking import blocking_executor
+
+logger = logging.getLogger(__name__)
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class ArchiveResponse(FileResponse):
+    """FileResponse for a whole archive or a single byte range of it.
+
+    The body is handed to the server as a zero-copy send when it advertises the
+    ASGI `http.response.zerocopysend` extension, otherwise it is read in chunks
+    on the blocking executor.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, path, stat_result, etag, filename, byte_range: Optional[Tuple[int, int]] = None):
+        headers = {
+            "etag": etag,
+            "accept-ranges": "bytes",
+            "cache-control": "private, no-cache"
+        }
+        super().__init__(
+            path,
+            status_code=206 if byte_range else 200,
+            headers=headers,
+            media_type="application/zip",
+            filename=filename,
+            stat_result=stat_result
+        )
+
+        size = stat_result.st_size
+        self.offset, end = byte_range or (0, size - 1)
+        self.count = end - self.offset + 1 if size else 0
+        self.headers["content-length"] = str(self.count)
+        if byte_range:
+            self.headers["content-range"] = f"bytes {self.offset}-{end}/{size}"
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+
+        f = await blocking_executor.run(open, self.path, 'rb')
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False
+                })
+            else:
+                await self._send_chunks(f, send)
+        finally:
+            await blocking_executor.run(f.close)
+
+    async def _send_chunks(self, f, send):
+        await blocking_executor.run(f.seek, self.offset)
+        remaining = self.count
+        while remaining > 0:
+            chunk = await blocking_executor.run(f.read, min(self.chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining != 0 or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class DownloadService:
+    """Conditional and ranged responses for finished job archives"""
+
+    async def archive_etag(self, collection, job: dict, path: str, stat_result) -> str:
+        """Strong ETag from the archive's sha256, hashing and recording it for jobs that predate it"""
+        archive = job.get("archive") or {}
+        if not archive.get("sha256") or archive.get("size") != stat_result.st_size:
+            sha256, size = await blocking_executor.run(file_digest, path)
+            archive = {"sha256": sha256, "size": size}
+            await collection.update_one({"job_id": job["job_id"]}, {"$set": {"archive": archive}})
+        return f'"{archive["sha256"]}"'
+
+    @staticmethod
+    def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+        if not header:
+            return False
+        if header.strip() == '*':
+            return True
+        for candidate in header.split(','):
+            candidate = candidate.strip()
+            if weak and candidate.startswith('W/'):
+                candidate = candidate[2:]
+            if candidate == etag:
+                return True
+        return False
+
+    @staticmethod
+    def parse_range(header: Optional[str], size: int):
+        """(start, end) for a single satisfiable range, None to send the whole file, or False if unsatisfiable.
+
+        Multi-range requests are answered with the whole file, which RFC 9110 allows.
+        """
+        if not header:
+            return None
+        match = RANGE_PATTERN.match(header.strip())
+        if not match:
+            return None
+
+        first, last = match.groups()
+        if not first and not last:
+            return None
+        if not first:
+            length = int(last)
+            if length == 0:
+                return False
+            return max(0, size - length), size - 1
+
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            return False
+        return start, end
+
+    async def archive_response(self, request: Request, collection, job: dict, path: str, filename: str) -> Response:
+        stat_result = await blocking_executor.run(os.stat, path)
+        etag = await self.archive_etag(collection, job, path, stat_result)
+        validators = {"etag": etag, "cache-control": "private, no-cache"}
+
+        if self.etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=validators)
+
+        byte_range = None
+        if_range = request.headers.get("if-range")
+        if not if_range or self.etag_matches(if_range, etag, weak=False):
+            byte_range = self.parse_range(request.headers.get("range"), stat_result.st_size)
+
+        if byte_range is False:
+            return Response(
+                status_code=416,
+                headers={**validators, "content-range": f"bytes */{stat_result.st_size}"}
+            )
+
+        return ArchiveResponse(path, stat_result, etag, filename, byte_range)
+
+
+download_service = DownloadService()
@@ -2,18 +2,20 @@ import os
 import zipfile
 import shutil
 from typing import Optional
+from scraper.archive import CompressionPolicy
 
 class FileService:
     
     @staticmethod
-    def create_zip(source_dir: str, zip_path: str) -> bool:
+    def create_zip(source_dir: str, zip_path: str, compression: Optional[CompressionPolicy] = None) -> bool:
+        compression = compression or CompressionPolicy()
         try:
             with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 for root, dirs, files in os.walk(source_dir):
                     for file in files:
                         file_path = os.path.join(root, file)
                         arcname = os.path.relpath(file_path, source_dir)
-                        zipf.write(file_path, arcname)
+                        compression.write_file(zipf, file_path, arcname)
             return True
         except Exception as e:
             print(f"Error creating zip: {e}")
@@ -1,29 +1,59 @@
 import asyncio
 import aiohttp
-import aiofiles
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse, quote
+from scraper.html_parser import make_soup
+from scraper.sitemap import SitemapDiscoverer, order_page_urls, fetch_titles
+from scraper.downloads import DownloadBudget
+from scraper.http_cache import fetch_page, fetch_asset, use_blob
+from scraper.archive import ArchiveWriter
+from scraper.blocking import blocking_executor
+from scraper.progress import JobProgress
+from urllib.parse import urljoin, urlparse, urlunparse, urldefrag, quote
+from collections import deque
 from pathlib import Path
 import os
-import zipfile
 from datetime import datetime
 import re
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import hashlib
 
 logger = logging.getLogger(__name__)
 
+NON_HTML_EXTENSIONS = frozenset({
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.zip', '.rar', '.gz', '.exe', '.dmg',
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.avif', '.ico', '.bmp',
+    '.css', '.js', '.mjs', '.json', '.xml', '.txt', '.csv',
+    '.woff', '.woff2', '.ttf', '.eot', '.otf',
+    '.mp3', '.mp4', '.webm', '.mov', '.avi', '.wav', '.ogg'
+})
+
 class GeneralScraper:
+    MAX_DISCOVERED_PAGES = 100
+    DISCOVERY_CONCURRENCY = 8
+    PAGE_CONCURRENCY = 4
+    MAX_CONNECTIONS = 32
+    MAX_CONNECTIONS_PER_HOST = 8
+
     def __init__(self):
         self.visited_urls = set()
         self.downloaded_files = {}  
+        self.processed_stylesheets = set()
+        self.stylesheet_blobs = {}
+        self.failed_downloads = set()
+        self.pending_downloads = {}
+        self.download_budget = DownloadBudget()
+        self.progress = JobProgress()
         self.base_domain = None
         self.session = None
+        self.archive = None
         
     async def __aenter__(self):
         self.session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=60),
+            connector=aiohttp.TCPConnector(
+                limit=self.MAX_CONNECTIONS,
+                limit_per_host=self.MAX_CONNECTIONS_PER_HOST
+            ),
             headers={
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 'Accept': '*/*',
@@ -115,56 +145,72 @@ class GeneralScraper:
         
         return ''
 
-    async def download_resource(self, url: str, base_path: Path, subfolder: str = "assets") -> str:
-        """Download any resource (CSS, JS, images, fonts, etc.)"""
+    async def download_resource(self, url: str, subfolder: str = "assets") -> str:
+        """Download any resource (CSS, JS, images, fonts, etc.)
+
+        Concurrent callers for the same URL share one fetch, and failed URLs are
+        remembered for the rest of the job so they are not retried on every page.
+        """
+        if url.startswith('data:'):
+            return url
+        
+        if url in self.downloaded_files:
+            return self.downloaded_files[url]
+        
+        if url in self.failed_downloads:
+            return url
+        
+        task = self.pending_downloads.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self.fetch_resource(url, subfolder))
+            self.pending_downloads[url] = task
+            task.add_done_callback(lambda _: self.pending_downloads.pop(url, None))
+        
+        return await asyncio.shield(task)
+
+    def resource_path(self, url: str, content_type: str, subfolder: str) -> str:
+        ext = self.get_file_extension(url, content_type)
+        filename = self.url_to_filename(url)
+        
+        if not any(filename.endswith(e) for e in ['.css', '.js', '.mjs', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.woff', '.woff2', '.ttf', '.eot', '.otf', '.webp']):
+            if ext:
+                filename += ext
+        
+        if filename.endswith(('.woff', '.woff2', '.ttf', '.eot', '.otf')):
+            return f"fonts/{filename}"
+        elif filename.endswith(('.css',)):
+            return f"css/{filename}"
+        elif filename.endswith(('.js', '.mjs')):
+            return f"js/{filename}"
+        elif filename.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.avif')):
+            return f"images/{filename}"
+        return f"{subfolder}/{filename}"
+
+    async def fetch_resource(self, url: str, subfolder: str) -> str:
         try:
-            if url in self.downloaded_files:
-                return self.downloaded_files[url]
-            
-            if url.startswith('data:'):
+            fetched = await fetch_asset(self.session, url, self.download_budget, allow_redirects=True)
+            if not fetched:
+                self.failed_downloads.add(url)
                 return url
-                
-            async with self.session.get(url, allow_redirects=True) as response:
-                if response.status != 200:
-                    logger.warning(f"Failed to download {url}: HTTP {response.status}")
-                    return url
-                
-                content = await response.read()
-                content_type = response.headers.get('content-type', '')
-                
-                ext = self.get_file_extension(url, content_type)
-                filename = self.url_to_filename(url)
-                
-                if not any(filename.endswith(e) for e in ['.css', '.js', '.mjs', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.woff', '.woff2', '.ttf', '.eot', '.otf', '.webp']):
-                    if ext:
-                        filename += ext
-                
-                if filename.endswith(('.woff', '.woff2', '.ttf', '.eot', '.otf')):
-                    relative_path = f"fonts/{filename}"
-                elif filename.endswith(('.css',)):
-                    relative_path = f"css/{filename}"
-                elif filename.endswith(('.js', '.mjs')):
-                    relative_path = f"js/{filename}"
-                elif filename.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.avif')):
-                    relative_path = f"images/{filename}"
-                else:
-                    relative_path = f"{subfolder}/{filename}"
-                
-                file_path = base_path / relative_path
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                async with aiofiles.open(file_path, 'wb') as f:
-                    await f.write(content)
-                
-                self.downloaded_files[url] = relative_path
-                logger.info(f"Downloaded: {url} -> {relative_path}")
-                return relative_path
+            
+            blob_path, content_type = fetched
+            relative_path = self.resource_path(url, content_type, subfolder)
+            if relative_path.endswith('.css'):
+                self.stylesheet_blobs[relative_path] = (url, blob_path)
+            else:
+                await self.archive_blob(relative_path, url, blob_path)
+            
+            self.downloaded_files[url] = relative_path
+            self.progress.asset_fetched(self.download_budget.bytes_downloaded)
+            logger.info(f"Downloaded: {url} -> {relative_path}")
+            return relative_path
                 
         except Exception as e:
             logger.error(f"Failed to download {url}: {e}")
+            self.failed_downloads.add(url)
             return url
 
-    async def process_css(self, css_content: str, css_url: str, base_path: Path) -> str:
+    async def process_css(self, css_content: str, css_url: str) -> str:
         """Process CSS and download referenced resources"""
         url_pattern = r'url\(["\']?([^"\')]+)["\']?\)'
         
@@ -174,7 +220,7 @@ class GeneralScraper:
             
             absolute_url = urljoin(css_url, url)
             
-            local_path = await self.download_resource(absolute_url, base_path)
+            local_path = await self.download_resource(absolute_url)
             return local_path
         
         urls = re.findall(url_pattern, css_content)
@@ -197,159 +243,212 @@ class GeneralScraper:
         parsed_start = urlparse(start_url)
         self.base_domain = parsed_start.netloc
         
+        sitemap_urls = await SitemapDiscoverer(self.session, start_url, max_urls=100).discover()
+        if sitemap_urls:
+            sitemap_urls = order_page_urls(start_url, sitemap_urls, 100)
+            titles = await fetch_titles(self.session, sitemap_urls, concurrency=self.DISCOVERY_CONCURRENCY)
+            return [{
+                'url': url,
+                'title': titles.get(url) or urlparse(url).path or '/',
+                'path': urlparse(url).path or '/'
+            } for url in sitemap_urls]
+        
+        start_key = self.canonical_url(start_url) or start_url
+        frontier = deque([start_key])
+        seen = {start_key}
         pages = []
-        to_visit = [start_url]
-        visited = set()
+        in_flight = set()
         
-        while to_visit and len(pages) < 100:
-            url = to_visit.pop(0)
-            if url in visited:
-                continue
-                
-            visited.add(url)
+        while (frontier or in_flight) and len(pages) < self.MAX_DISCOVERED_PAGES:
+            while (frontier and len(in_flight) < self.DISCOVERY_CONCURRENCY and
+                   len(pages) + len(in_flight) < self.MAX_DISCOVERED_PAGES):
+                in_flight.add(asyncio.ensure_future(self.fetch_discovery_page(frontier.popleft())))
             
-            try:
-                async with self.session.get(url) as response:
-                    if response.status != 200:
-                        continue
-                        
-                    if 'text/html' not in response.headers.get('content-type', ''):
-                        continue
-                    
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    title = soup.find('title')
-                    title_text = title.get_text().strip() if title else urlparse(url).path
-                    
-                    pages.append({
-                        'url': url,
-                        'title': title_text,
-                        'path': urlparse(url).path or '/'
-                    })
-                    
-                    for link in soup.find_all('a', href=True):
-                        href = link['href']
-                        absolute_url = urljoin(url, href)
-                        
-                        if (self.is_same_domain(absolute_url) and 
-                            absolute_url not in visited and 
-                            absolute_url not in to_visit and
-                            not any(ext in absolute_url.lower() for ext in ['.pdf', '.doc', '.zip', '.exe']) and
-                            '#' not in absolute_url):
-                            to_visit.append(absolute_url)
-                            
-            except Exception as e:
-                logger.error(f"Error discovering pages from {url}: {e}")
+            if not in_flight:
+                break
+            
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if not result:
+                    continue
                 
+                page, links = result
+                if len(pages) < self.MAX_DISCOVERED_PAGES:
+                    pages.append(page)
+                
+                for link in links:
+                    key = self.canonical_url(link)
+                    if key and key not in seen and self.is_same_domain(key):
+                        seen.add(key)
+                        frontier.append(key)
+        
+        for task in in_flight:
+            task.cancel()
+        
         return pages
 
-    async def scrape_page(self, url: str, base_path: Path, page_name: str) -> str:
+    def canonical_url(self, url: str) -> Optional[str]:
+        """Normalise a URL into a frontier key, or None if it can't be an HTML page"""
+        url, _ = urldefrag(url)
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return None
+        
+        if os.path.splitext(parsed.path)[1].lower() in NON_HTML_EXTENSIONS:
+            return None
+        
+        netloc = parsed.netloc.lower()
+        if (parsed.scheme == 'http' and netloc.endswith(':80')) or (parsed.scheme == 'https' and netloc.endswith(':443')):
+            netloc = netloc.rsplit(':', 1)[0]
+        
+        return urlunparse((parsed.scheme, netloc, parsed.path or '/', '', parsed.query, ''))
+
+    async def fetch_discovery_page(self, url: str) -> Optional[Tuple[Dict[str, str], List[str]]]:
         try:
             async with self.session.get(url) as response:
                 if response.status != 200:
-                    raise Exception(f"HTTP {response.status}")
+                    return None
+                
+                if 'text/html' not in response.headers.get('content-type', ''):
+                    return None
                 
                 content = await response.text()
-                soup = BeautifulSoup(content, 'html.parser')
+            
+            soup = make_soup(content)
+            
+            title = soup.find('title')
+            title_text = title.get_text().strip() if title else urlparse(url).path
+            
+            page = {
+                'url': url,
+                'title': title_text,
+                'path': urlparse(url).path or '/'
+            }
+            links = [urljoin(url, link['href']) for link in soup.find_all('a', href=True)]
+            return page, links
+        
+        except Exception as e:
+            logger.error(f"Error discovering pages from {url}: {e}")
+            return None
 
-                for link in soup.find_all('link', rel='stylesheet'):
-                    if link.get('href'):
-                        css_url = urljoin(url, link['href'])
-                        css_filename = await self.download_resource(css_url, base_path)
+    async def scrape_page(self, url: str, page_name: str) -> str:
+        try:
+            status, content = await fetch_page(self.session, url)
+            if status != 200:
+                raise Exception(f"HTTP {status}")
+            
+            soup = make_soup(content)
 
-                        if not css_filename.startswith('http'):
-                            try:
-                                css_path = base_path / css_filename
-                                if css_path.exists():
-                                    async with aiofiles.open(css_path, 'r', encoding='utf-8') as f:
-                                        css_content = await f.read()
-                                    
-                                    processed_css = await self.process_css(css_content, css_url, base_path)
-                                    
-                                    async with aiofiles.open(css_path, 'w', encoding='utf-8') as f:
-                                        await f.write(processed_css)
-                            except Exception as e:
-                                logger.error(f"Failed to process CSS {css_url}: {e}")
-                        
-                        link['href'] = css_filename
-                
-                for style in soup.find_all('style'):
-                    if style.string:
-                        processed_style = await self.process_css(style.string, url, base_path)
-                        style.string = processed_style
-                
-                for script in soup.find_all('script', src=True):
-                    js_url = urljoin(url, script['src'])
-                    js_filename = await self.download_resource(js_url, base_path)
-                    script['src'] = js_filename
-                
-                for img in soup.find_all('img'):
-                    if img.get('src'):
-                        img_url = urljoin(url, img['src'])
-                        img_filename = await self.download_resource(img_url, base_path)
-                        img['src'] = img_filename
-                    
-                    if img.get('srcset'):
-                        srcset_parts = []
-                        for part in img['srcset'].split(','):
-                            part = part.strip()
-                            if ' ' in part:
-                                img_part, descriptor = part.rsplit(' ', 1)
-                                img_url = urljoin(url, img_part)
-                                img_filename = await self.download_resource(img_url, base_path)
-                                srcset_parts.append(f"{img_filename} {descriptor}")
-                            else:
-                                img_url = urljoin(url, part)
-                                img_filename = await self.download_resource(img_url, base_path)
-                                srcset_parts.append(img_filename)
-                        img['srcset'] = ', '.join(srcset_parts)
-                
-                for source in soup.find_all('source'):
-                    if source.get('srcset'):
-                        src_url = urljoin(url, source['srcset'])
-                        src_filename = await self.download_resource(src_url, base_path)
-                        source['srcset'] = src_filename
-                
-                for media in soup.find_all(['video', 'audio', 'source']):
-                    for attr in ['src', 'poster']:
-                        if media.get(attr):
-                            media_url = urljoin(url, media[attr])
-                            media_filename = await self.download_resource(media_url, base_path)
-                            media[attr] = media_filename
-                
-                for iframe in soup.find_all('iframe', src=True):
-                    iframe_url = urljoin(url, iframe['src'])
-                    if self.is_same_domain(iframe_url):
-                        iframe_filename = await self.download_resource(iframe_url, base_path)
-                        iframe['src'] = iframe_filename
+            tasks = []
+            
+            for link in soup.find_all('link', rel='stylesheet'):
+                if link.get('href'):
+                    tasks.append(self.localize_stylesheet(link, urljoin(url, link['href'])))
+            
+            for style in soup.find_all('style'):
+                if style.string:
+                    tasks.append(self.localize_style_tag(style, url))
+            
+            for script in soup.find_all('script', src=True):
+                tasks.append(self.localize_attribute(script, 'src', urljoin(url, script['src'])))
+            
+            for img in soup.find_all('img'):
+                if img.get('src'):
+                    tasks.append(self.localize_attribute(img, 'src', urljoin(url, img['src'])))
                 
-                for tag in soup.find_all(style=True):
-                    style_content = tag['style']
-                    if 'url(' in style_content:
-                        processed_style = await self.process_css(style_content, url, base_path)
-                        tag['style'] = processed_style
+                if img.get('srcset'):
+                    tasks.append(self.localize_srcset(img, url))
+            
+            for source in soup.find_all('source'):
+                if source.get('srcset'):
+                    tasks.append(self.localize_attribute(source, 'srcset', urljoin(url, source['srcset'])))
+            
+            for media in soup.find_all(['video', 'audio', 'source']):
+                for attr in ['src', 'poster']:
+                    if media.get(attr):
+                        tasks.append(self.localize_attribute(media, attr, urljoin(url, media[attr])))
+            
+            for iframe in soup.find_all('iframe', src=True):
+                iframe_url = urljoin(url, iframe['src'])
+                if self.is_same_domain(iframe_url):
+                    tasks.append(self.localize_attribute(iframe, 'src', iframe_url))
+            
+            for tag in soup.find_all(style=True):
+                if 'url(' in tag['style']:
+                    tasks.append(self.localize_style_attribute(tag, url))
+            
+            await asyncio.gather(*tasks)
 
-                html_filename = f"{page_name}.html"
-                html_path = base_path / html_filename
-                
-                async with aiofiles.open(html_path, 'w', encoding='utf-8') as f:
-                    await f.write(str(soup.prettify()))
-                
-                return html_filename
+            html_filename = f"{page_name}.html"
+            await self.archive.write_text(html_filename, str(soup.prettify()))
+            
+            return html_filename
                 
         except Exception as e:
             logger.error(f"Failed to scrape {url}: {e}")
             raise
 
+    async def localize_attribute(self, tag, attr: str, resource_url: str):
+        tag[attr] = await self.download_resource(resource_url)
+
+    async def localize_stylesheet(self, link, css_url: str):
+        css_filename = await self.download_resource(css_url)
+
+        if css_filename in self.stylesheet_blobs and css_filename not in self.processed_stylesheets:
+            # Taken up front so pages sharing a stylesheet process it once, and
+            # given back on failure so the original is still archived at the end.
+            self.processed_stylesheets.add(css_filename)
+            try:
+                source_url, blob_path = self.stylesheet_blobs[css_filename]
+                css_content = await use_blob(
+                    lambda path: blocking_executor.run(self.read_text, path),
+                    blob_path, self.session, source_url, self.download_budget, allow_redirects=True
+                )
+                
+                processed_css = await self.process_css(css_content, css_url)
+                await self.archive.write_text(css_filename, processed_css)
+            except Exception as e:
+                self.processed_stylesheets.discard(css_filename)
+                logger.error(f"Failed to process CSS {css_url}: {e}")
+        
+        link['href'] = css_filename
+
+    async def archive_blob(self, arcname: str, url: str, blob_path: str):
+        return await use_blob(
+            lambda path: self.archive.write_file(arcname, path),
+            blob_path, self.session, url, self.download_budget, allow_redirects=True
+        )
+
+    @staticmethod
+    def read_text(path):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+    async def localize_style_tag(self, style, page_url: str):
+        style.string = await self.process_css(style.string, page_url)
+
+    async def localize_style_attribute(self, tag, page_url: str):
+        tag['style'] = await self.process_css(tag['style'], page_url)
+
+    async def localize_srcset(self, img, page_url: str):
+        parts = [part.strip() for part in img['srcset'].split(',')]
+        
+        async def localize_part(part):
+            if ' ' in part:
+                img_part, descriptor = part.rsplit(' ', 1)
+                img_filename = await self.download_resource(urljoin(page_url, img_part))
+                return f"{img_filename} {descriptor}"
+            return await self.download_resource(urljoin(page_url, part))
+        
+        srcset_parts = await asyncio.gather(*(localize_part(part) for part in parts))
+        img['srcset'] = ', '.join(srcset_parts)
+
     async def scrape_site(self, url: str, scrape_mode: str, selected_pages: List[str] = None, job_id: str = None) -> Dict:
         try:
             if job_id is None:
                 job_id = f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(url) % 10000}"
             
-            output_dir = Path(f"app/static/{job_id}")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
             parsed_url = urlparse(url)
             self.base_domain = parsed_url.netloc
             
@@ -368,37 +467,43 @@ class GeneralScraper:
                     discovered = await self.discover_pages(url)
                     pages_to_scrape = discovered[:25]
             
-            scraped_files = []
+            self.progress.discovered(len(pages_to_scrape))
+            page_semaphore = asyncio.Semaphore(self.PAGE_CONCURRENCY)
             
-            for i, page in enumerate(pages_to_scrape):
+            async def scrape_one(i, page):
                 page_name = f"page_{i+1}" if len(pages_to_scrape) > 1 else "index"
                 if i == 0:
                     page_name = "index"
                 
-                try:
-                    html_file = await self.scrape_page(page['url'], output_dir, page_name)
-                    scraped_files.append(html_file)
-                    logger.info(f"Scraped page {i+1}/{len(pages_to_scrape)}: {page['url']}")
-                except Exception as e:
-                    logger.error(f"Failed to scrape page {page['url']}: {e}")
-
+                async with page_semaphore:
+                    try:
+                        html_file = await self.scrape_page(page['url'], page_name)
+                        self.progress.page_scraped()
+                        logger.info(f"Scraped page {i+1}/{len(pages_to_scrape)}: {page['url']}")
+                        return html_file
+                    except Exception as e:
+                        logger.error(f"Failed to scrape page {page['url']}: {e}")
+                        return None
+            
             zip_path = Path(f"app/static/{job_id}.zip")
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, dirs, files in os.walk(output_dir):
-                    for file in files:
-                        file_path = Path(root) / file
-                        arcname = file_path.relative_to(output_dir)
-                        zipf.write(file_path, arcname)
-
-            import shutil
-            shutil.rmtree(output_dir, ignore_errors=True)
+            async with ArchiveWriter(zip_path) as self.archive:
+                results = await asyncio.gather(*(scrape_one(i, page) for i, page in enumerate(pages_to_scrape)))
+                scraped_files = [html_file for html_file in results if html_file]
+                
+                self.progress.stage("archiving", entries=len(self.archive.entries))
+                for css_filename, (css_url, blob_path) in self.stylesheet_blobs.items():
+                    if css_filename not in self.processed_stylesheets:
+                        await self.archive_blob(css_filename, css_url, blob_path)
             
             return {
                 'success': True,
                 'message': f'Successfully scraped {len(scraped_files)} page(s)',
                 'job_id': job_id,
                 'file_path': str(zip_path),
-                'download_url': f'/download/{job_id}'
+                'download_url': f'/download/{job_id}',
+                'skipped_assets': self.download_budget.skipped,
+                'compression': self.archive.compression.summary(),
+                'archive': self.archive.metadata()
             }
             
         except Exception as e:
@@ -1,4 +1,5 @@
-from bs4 import BeautifulSoup, Comment
+from bs4 import Comment
+from scraper.html_parser import make_soup
 import re
 from typing import Dict, List
 import json
@@ -30,7 +31,7 @@ class HTMLCleaner:
             return ""
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             self._remove_comments(soup)
             self._remove_noise_elements(soup)
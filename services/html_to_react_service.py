@@ -13,6 +13,7 @@ from services.pattern_recognizer import PatternRecognizer
 from services.gemini_ai_service import GeminiAIService
 from services.react_code_generator import ReactCodeGenerator
 from services.react_optimizer import ReactOptimizer
+from scraper.blocking import blocking_executor
 
 class HTMLToReactService:
     def __init__(self, gemini_api_key: str):
@@ -140,7 +141,9 @@ class HTMLToReactService:
             component_analysis, design_tokens
         )
         
-        project_result = self.react_generator.generate_react_project(react_components, job_id)
+        project_result = await blocking_executor.run(
+            self.react_generator.generate_react_project, react_components, job_id
+        )
         
         return {
             'react_components': react_components,
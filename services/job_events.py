@@ -0,0 +1,412 @@
+import asyncio
+import json
+import time
+import uuid
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+from cachetools import TTLCache
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from config import settings
+from database import get_database
+from scraper.progress import JobProgress
+from services.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = frozenset({
+    "queued", "started", "pages", "assets", "archiving", "completed", "failed"
+})
+TERMINAL_EVENTS = frozenset({"completed", "failed"})
+# Notices ride the same backend but are not about a job: they go to listeners
+# rather than into snapshots and job streams.
+NOTICE_TYPES = frozenset({"usage"})
+
+
+@dataclass
+class JobEvent:
+    job_id: str
+    type: str
+    data: dict = field(default_factory=dict)
+    ts: float = field(default_factory=time.time)
+    origin: Optional[str] = None
+
+    def to_json(self):
+        return json.dumps(asdict(self), default=str)
+
+    @classmethod
+    def from_json(cls, raw):
+        return cls(**json.loads(raw))
+
+    @property
+    def terminal(self):
+        return self.type in TERMINAL_EVENTS
+
+
+class LocalBackend:
+    """Delivers events only within this process"""
+
+    remote = False
+
+    async def start(self, deliver):
+        pass
+
+    async def publish(self, event: JobEvent):
+        pass
+
+    async def close(self):
+        pass
+
+
+class MongoBackend:
+    """Shares events between the API and worker processes through a capped collection.
+
+    Only used when EVENT_BUS_URL is "mongodb", for deployments without Redis:
+    every event becomes a database write. Each process inserts the events it
+    publishes and tails the collection with an awaitable cursor. When the
+    cursor dies (an empty collection, or the collection wrapping past it)
+    tailing resumes a few seconds back by event timestamp, waiting longer each
+    time nothing arrived, and recently seen events are skipped.
+    """
+
+    remote = True
+    COLLECTION = "job_events"
+    RESUME_OVERLAP = 5.0
+    RETRY_DELAY = 0.5
+    MAX_RETRY_DELAY = 10.0
+
+    def __init__(self, size=None):
+        self.size = size or settings.EVENT_LOG_BYTES
+        self.collection = None
+        self.task = None
+        self.seen = TTLCache(maxsize=50000, ttl=self.RESUME_OVERLAP * 4)
+
+    async def start(self, deliver):
+        database = await get_database()
+        if self.COLLECTION not in await database.list_collection_names():
+            try:
+                await database.create_collection(self.COLLECTION, capped=True, size=self.size)
+            except CollectionInvalid:
+                pass
+        self.collection = database[self.COLLECTION]
+        self.task = asyncio.create_task(self._tail(deliver, time.time()))
+
+    async def _tail(self, deliver, since):
+        delay = self.RETRY_DELAY
+        while True:
+            received = False
+            try:
+                cursor = self.collection.find(
+                    {"ts": {"$gte": since - self.RESUME_OVERLAP}},
+                    cursor_type=CursorType.TAILABLE_AWAIT
+                )
+                while cursor.alive:
+                    async for doc in cursor:
+                        received = True
+                        since = max(since, doc.get("ts", since))
+                        if doc["_id"] in self.seen:
+                            continue
+                        self.seen[doc["_id"]] = True
+                        doc.pop("_id")
+                        deliver(JobEvent(**doc))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job event tailing failed, retrying: {e}")
+            delay = self.RETRY_DELAY if received else min(delay * 2, self.MAX_RETRY_DELAY)
+            await asyncio.sleep(delay)
+
+    async def publish(self, event: JobEvent):
+        await self.collection.insert_one(asdict(event))
+
+    async def close(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+
+class RedisBackend:
+    """Shares events between the API and worker processes over Redis pub/sub"""
+
+    remote = True
+    CHANNEL = "webunpack:job-events"
+
+    def __init__(self, client):
+        self.client = client
+        self.pubsub = None
+        self.task = None
+
+    async def start(self, deliver):
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(self.CHANNEL)
+        self.task = asyncio.create_task(self._listen(deliver))
+
+    async def _listen(self, deliver):
+        while True:
+            try:
+                async for message in self.pubsub.listen():
+                    if message.get("type") == "message":
+                        deliver(JobEvent.from_json(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job event subscription failed, retrying: {e}")
+                await asyncio.sleep(1)
+                try:
+                    await self.pubsub.subscribe(self.CHANNEL)
+                except Exception:
+                    pass
+
+    async def publish(self, event: JobEvent):
+        await self.client.publish(self.CHANNEL, event.to_json())
+
+    async def close(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        if self.pubsub:
+            await self.pubsub.close()
+        await self.client.close()
+
+
+def make_backend(url=None):
+    """Redis by default; "mongodb" shares events through a capped collection, "local" keeps them in this process"""
+    url = settings.EVENT_BUS_URL if url is None else url
+    if url == "mongodb":
+        return MongoBackend()
+    if not url or url == "local":
+        return LocalBackend()
+    client = redis_client(url, "EVENT_BUS_URL", "job events will only reach subscribers in the same process")
+    return RedisBackend(client) if client else LocalBackend()
+
+
+class EventBus:
+    """In-process pub/sub for job progress events with a pluggable cross-process backend.
+
+    Every delivered event is folded into a per-job snapshot, so a new subscriber
+    can be brought up to date without touching the database. Subscriber queues
+    are bounded; a slow client loses intermediate progress events, never the
+    terminal one. Notices are passed to the callbacks registered with listen().
+    """
+
+    SUBSCRIBER_QUEUE_SIZE = 100
+    OUTBOX_SIZE = 10000
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.origin = uuid.uuid4().hex
+        self.subscribers = {}
+        self.listeners = {}
+        self.snapshots = TTLCache(maxsize=settings.EVENT_SNAPSHOT_MAX_JOBS, ttl=settings.EVENT_SNAPSHOT_TTL)
+        self.outbox = None
+        self.sender = None
+        self.published = 0
+        self.dropped = 0
+
+    async def start(self):
+        if self.backend is None:
+            self.backend = make_backend()
+        try:
+            await self.backend.start(self._receive)
+        except Exception as e:
+            logger.error(
+                f"Could not start {type(self.backend).__name__} for job events, "
+                f"they will only reach subscribers in the same process: {e}"
+            )
+            await self.backend.close()
+            self.backend = LocalBackend()
+        if self.backend.remote:
+            self.outbox = asyncio.Queue(self.OUTBOX_SIZE)
+            self.sender = asyncio.create_task(self._send())
+
+    async def stop(self):
+        if self.sender:
+            while not self.outbox.empty():
+                await self._send_one(self.outbox.get_nowait())
+            self.sender.cancel()
+            try:
+                await self.sender
+            except asyncio.CancelledError:
+                pass
+            self.sender = None
+        if self.backend:
+            await self.backend.close()
+
+    def publish(self, job_id: str, event_type: str, data: Optional[dict] = None):
+        if event_type not in EVENT_TYPES and event_type not in NOTICE_TYPES:
+            raise ValueError(f"Unknown job event type: {event_type}")
+        event = JobEvent(job_id, event_type, data or {}, origin=self.origin)
+        self.published += 1
+        self.deliver(event)
+
+        if self.outbox is not None:
+            try:
+                self.outbox.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def notify(self, notice_type: str, data: dict):
+        """Publish a notice to the listeners in every process"""
+        self.publish("", notice_type, data)
+
+    def listen(self, notice_type: str, callback):
+        if notice_type not in NOTICE_TYPES:
+            raise ValueError(f"Unknown notice type: {notice_type}")
+        self.listeners.setdefault(notice_type, []).append(callback)
+
+    def progress(self, job_id: str) -> JobProgress:
+        return JobProgress(job_id, self.publish)
+
+    def deliver(self, event: JobEvent):
+        if event.type in NOTICE_TYPES:
+            for callback in self.listeners.get(event.type, ()):
+                try:
+                    callback(event.data)
+                except Exception as e:
+                    logger.warning(f"Listener for {event.type} notices failed: {e}")
+            return
+
+        snapshot = self.snapshots.get(event.job_id) or {"job_id": event.job_id}
+        snapshot.update(event.data)
+        snapshot["status"] = self.status_for(event.type, snapshot.get("status"))
+        snapshot["last_event"] = event.type
+        snapshot["updated_at"] = event.ts
+        self.snapshots[event.job_id] = snapshot
+
+        for queue in self.subscribers.get(event.job_id, ()):
+            if queue.full():
+                self.dropped += 1
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def snapshot(self, job_id: str) -> Optional[dict]:
+        snapshot = self.snapshots.get(job_id)
+        return dict(snapshot) if snapshot else None
+
+    def remember(self, job_id: str, fields: dict):
+        """Fill in a job's snapshot, e.g. from the job document when a stream opens after a restart"""
+        snapshot = self.snapshots.get(job_id) or {"job_id": job_id}
+        for key, value in fields.items():
+            snapshot.setdefault(key, value)
+        self.snapshots[job_id] = snapshot
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: str):
+        queue = asyncio.Queue(self.SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self.subscribers.get(job_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[job_id]
+
+    async def sse(self, job_id: str, is_disconnected, refresh=None):
+        """Server-sent events for one job: the current snapshot, then live events until it finishes.
+
+        `refresh` loads the job's stored state. It is only read once the stream
+        has been quiet for EVENT_STREAM_RECONCILE seconds (0 disables it), so a
+        lost event cannot leave the stream waiting forever on a job that has
+        already finished, without a database read per client per keep-alive.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.subscribe(job_id) as queue:
+            snapshot = self.snapshot(job_id) or {"job_id": job_id}
+            yield self.format_sse("snapshot", snapshot)
+            if snapshot.get("status") in TERMINAL_EVENTS:
+                return
+
+            quiet_since = loop.time()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.EVENT_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        return
+                    reconcile_after = settings.EVENT_STREAM_RECONCILE
+                    if refresh and reconcile_after and loop.time() - quiet_since >= reconcile_after:
+                        quiet_since = loop.time()
+                        if await self.reconcile(job_id, refresh):
+                            continue
+                    yield ": keep-alive\n\n"
+                    continue
+
+                quiet_since = loop.time()
+
+                yield self.format_sse(event.type, {**event.data, "job_id": event.job_id, "ts": event.ts})
+                if event.terminal:
+                    return
+
+    async def reconcile(self, job_id: str, refresh) -> bool:
+        """Deliver the job's stored status if the snapshot has fallen behind it; True if it had"""
+        try:
+            job = await refresh(job_id)
+        except Exception as e:
+            logger.warning(f"Could not refresh job {job_id}: {e}")
+            return False
+        if not job:
+            return False
+
+        current = (self.snapshots.get(job_id) or {}).get("status")
+        status = job.get("status")
+        if status == current or current in TERMINAL_EVENTS:
+            return False
+        if status in TERMINAL_EVENTS:
+            data = {key: job.get(key) for key in ("download_url", "error_message", "pages_scraped") if job.get(key) is not None}
+            self.deliver(JobEvent(job_id, status, data, origin=self.origin))
+            return True
+        if status == "processing" and current == "pending":
+            self.deliver(JobEvent(job_id, "started", {}, origin=self.origin))
+            return True
+        return False
+
+    @staticmethod
+    def format_sse(event_type, data):
+        data = {key: value for key, value in data.items() if key != "user_id"}
+        return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "published": self.published,
+            "dropped": self.dropped,
+            "subscribers": sum(len(queues) for queues in self.subscribers.values()),
+            "tracked_jobs": len(self.snapshots)
+        }
+
+    @staticmethod
+    def status_for(event_type, current):
+        if event_type == "queued":
+            return "pending"
+        if event_type in TERMINAL_EVENTS:
+            return event_type
+        return current if current in TERMINAL_EVENTS else "processing"
+
+    def _receive(self, event: JobEvent):
+        if event.origin != self.origin:
+            self.deliver(event)
+
+    async def _send(self):
+        while True:
+            event = await self.outbox.get()
+            await self._send_one(event)
+
+    async def _send_one(self, event):
+        try:
+            await self.backend.publish(event)
+        except Exception as e:
+            self.dropped += 1
+            logger.warning(f"Could not forward job event {event.type} for {event.job_id}: {e}")
+
+
+event_bus = EventBus()
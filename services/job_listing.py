@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, List
+from bson import ObjectId
+from bson.errors import InvalidId
+from database import get_database
+
+JOB_STATUSES = frozenset({"pending", "processing", "completed", "failed"})
+
+# Every field the listing filters, sorts or returns is a key of the
+# user_jobs_listing index, so pages are answered from the index alone.
+LISTING_PROJECTION = {
+    "_id": 1,
+    "job_id": 1,
+    "url": 1,
+    "site_type": 1,
+    "scrape_mode": 1,
+    "status": 1,
+    "created_at": 1,
+    "completed_at": 1,
+    "pages_scraped": 1
+}
+
+
+class JobListingService:
+    """Keyset-paginated listing of a user's scrape jobs, newest first.
+
+    Pages are ordered by (created_at, _id) descending and the next page
+    starts strictly after the last job returned, so fetching page N costs the
+    same as fetching page 1 and jobs created meanwhile never shift a page.
+    """
+
+    MAX_LIMIT = 100
+
+    @staticmethod
+    def encode_cursor(job: dict) -> str:
+        raw = json.dumps({"t": job["created_at"].isoformat(), "id": str(job["_id"])})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(token: str):
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            data = json.loads(raw)
+            return datetime.fromisoformat(data["t"]), ObjectId(data["id"])
+        except (binascii.Error, ValueError, KeyError, TypeError, InvalidId):
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def parse_statuses(status: Optional[str]) -> Optional[List[str]]:
+        if not status:
+            return None
+        statuses = sorted({value.strip() for value in status.split(",") if value.strip()})
+        unknown = [value for value in statuses if value not in JOB_STATUSES]
+        if unknown:
+            raise ValueError(f"Unknown status: {', '.join(unknown)}")
+        return statuses or None
+
+    @staticmethod
+    def listing_query(user_id: str, statuses: Optional[List[str]] = None, after=None) -> dict:
+        query = {"user_id": user_id}
+        if statuses:
+            query["status"] = statuses[0] if len(statuses) == 1 else {"$in": statuses}
+        if after:
+            created_at, last_id = after
+            query["created_at"] = {"$lte": created_at}
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": last_id}}
+            ]
+        return query
+
+    @staticmethod
+    def to_item(job: dict) -> dict:
+        created_at = job.get("created_at")
+        completed_at = job.get("completed_at")
+        return {
+            "id": str(job["_id"]),
+            "job_id": job.get("job_id"),
+            "url": job.get("url"),
+            "site_type": job.get("site_type"),
+            "scrape_mode": job.get("scrape_mode"),
+            "status": job.get("status"),
+            "created_at": created_at.isoformat() if created_at else None,
+            "completed_at": completed_at.isoformat() if completed_at else None,
+            "pages_scraped": job.get("pages_scraped") or 0
+        }
+
+    async def list_jobs(self, user_id: str, limit: int = 50, cursor: Optional[str] = None,
+                        status: Optional[str] = None) -> dict:
+        limit = max(1, min(limit, self.MAX_LIMIT))
+        after = self.decode_cursor(cursor) if cursor else None
+        statuses = self.parse_statuses(status)
+
+        database = await get_database()
+        jobs = await database["scrape_jobs"].find(
+            self.listing_query(user_id, statuses, after),
+            projection=LISTING_PROJECTION
+        ).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+
+        page = jobs[:limit]
+        next_cursor = self.encode_cursor(page[-1]) if len(jobs) > limit else None
+        return {"jobs": [self.to_item(job) for job in page], "next_cursor": next_cursor}
+
+
+job_listing_service = JobListingService()
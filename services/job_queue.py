@@ -0,0 +1,177 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo import ReturnDocument
+from config import settings
+from database import get_database
+from services.job_scheduler import job_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Mongo-backed scrape job queue with leases.
+
+    The scrape_jobs document is the queue entry. Which pending job (or
+    processing job whose lease has expired) is claimed next is up to the job
+    scheduler; the worker atomically sets itself as lease_owner and keeps the
+    lease alive with heartbeats. Completion and
+    failure only apply while the worker still holds the lease, so a reclaimed
+    job cannot be finished twice.
+    """
+
+    def __init__(self, lease_seconds=None, max_attempts=None):
+        self.lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+
+    async def collection(self):
+        database = await get_database()
+        return database["scrape_jobs"]
+
+    def lease_expiry(self):
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def claimable_filter(self, now):
+        return {
+            "$or": [
+                {"status": "pending"},
+                {"status": "processing", "lease_expires_at": {"$lt": now}}
+            ],
+            "attempts": {"$not": {"$gte": self.max_attempts}}
+        }
+
+    async def enqueue(self, job_data: dict, weight: float = 1.0):
+        collection = await self.collection()
+        job_data = {
+            **job_data,
+            **await job_scheduler.tag(collection, job_data, weight),
+            "status": "pending",
+            "attempts": 0,
+            "lease_owner": None,
+            "lease_expires_at": None
+        }
+        await collection.insert_one(job_data)
+
+    async def claim(self, worker_id: str) -> Optional[dict]:
+        collection = await self.collection()
+        async with job_scheduler.dispatch_lock(worker_id) as acquired:
+            if not acquired:
+                return None
+
+            now = datetime.utcnow()
+            candidate = await job_scheduler.pick(collection, self.claimable_filter(now))
+            if candidate is None:
+                return None
+
+            job = await self._claim(collection, worker_id, candidate["_id"], now)
+            if job:
+                await job_scheduler.dispatched(job)
+            return job
+
+    async def queue_position(self, job: dict) -> Optional[dict]:
+        collection = await self.collection()
+        return await job_scheduler.queue_position(collection, self.claimable_filter(datetime.utcnow()), job)
+
+    async def _claim(self, collection, worker_id, _id, now):
+        return await collection.find_one_and_update(
+            {"_id": _id, **self.claimable_filter(now)},
+            {
+                "$set": {
+                    "status": "processing",
+                    "lease_owner": worker_id,
+                    "lease_expires_at": self.lease_expiry(),
+                    "heartbeat_at": now,
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease, returning False if the worker no longer holds it"""
+        collection = await self.collection()
+        result = await collection.update_one(
+            {"job_id": job_id, "status": "processing", "lease_owner": worker_id},
+            {"$set": {"lease_expires_at": self.lease_expiry(), "heartbeat_at": datetime.utcnow()}}
+        )
+        return result.modified_count == 1
+
+    async def complete(self, job_id: str, worker_id: str, fields: dict) -> bool:
+        return await self._finish(job_id, worker_id, {**fields, "status": "completed"})
+
+    async def fail(self, job_id: str, worker_id: str, error_message: str) -> bool:
+        return await self._finish(job_id, worker_id, {"status": "failed", "error_message": error_message})
+
+    async def release(self, job_id: str, worker_id: str) -> bool:
+        """Hand a job back to the queue without counting the attempt, e.g. on worker shutdown"""
+        collection = await self.collection()
+        result = await collection.update_one(
+            {"job_id": job_id, "status": "processing", "lease_owner": worker_id},
+            {
+                "$set": {"status": "pending", "lease_owner": None, "lease_expires_at": None},
+                "$inc": {"attempts": -1}
+            }
+        )
+        return result.modified_count == 1
+
+    async def reclaim_expired(self) -> list:
+        """Requeue orphaned jobs and fail those that have used up their attempts.
+
+        Returns the failed job documents so callers can refund their usage.
+        """
+        collection = await self.collection()
+        now = datetime.utcnow()
+
+        orphaned = await collection.update_many(
+            {"status": "processing", "lease_expires_at": {"$exists": False}},
+            {"$set": {"status": "pending", "attempts": 0, "lease_owner": None, "lease_expires_at": None}}
+        )
+        if orphaned.modified_count:
+            logger.warning(f"Requeued {orphaned.modified_count} job(s) left processing without a lease")
+
+        exhausted = []
+        expired_filter = {
+            "status": "processing",
+            "lease_expires_at": {"$lt": now},
+            "attempts": {"$gte": self.max_attempts}
+        }
+        while True:
+            job = await collection.find_one_and_update(
+                expired_filter,
+                {
+                    "$set": {
+                        "status": "failed",
+                        "error_message": "Processing error",
+                        "completed_at": now,
+                        "lease_owner": None,
+                        "lease_expires_at": None
+                    }
+                }
+            )
+            if job is None:
+                break
+            exhausted.append(job)
+
+        if exhausted:
+            logger.warning(f"Failed {len(exhausted)} job(s) whose lease expired on their last attempt")
+        return exhausted
+
+    async def _finish(self, job_id, worker_id, fields):
+        collection = await self.collection()
+        result = await collection.update_one(
+            {"job_id": job_id, "status": "processing", "lease_owner": worker_id},
+            {"$set": {
+                **fields,
+                "completed_at": datetime.utcnow(),
+                "lease_owner": None,
+                "lease_expires_at": None
+            }}
+        )
+        if result.modified_count != 1:
+            logger.warning(f"Job {job_id} lease was lost before it finished")
+            return False
+        return True
+
+
+job_queue = JobQueue()
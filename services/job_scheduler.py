@@ -0,0 +1,248 @@
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+from config import settings
+from database import get_database
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_LANE = 0
+BULK_LANE = 1
+
+
+class JobScheduler:
+    """Decides which queued scrape job runs next.
+
+    - At most max_running jobs run at once across all workers, and at most
+      max_per_user for any one user.
+    - Single-page jobs go to a priority lane that is served first, except that
+      bulk (multi-page) jobs always get at least min_bulk_slots of the running
+      slots when some are waiting.
+    - Within a lane, users share capacity by start-time fair queuing. Each job
+      gets a virtual start tag when it is enqueued: the later of the system's
+      virtual time and the finish tag of the user's previous queued job. Its
+      finish tag adds cost / weight, so a user with a backlog of large jobs
+      queues behind other users' first jobs.
+
+    Dispatch decisions are made under a short-lived lock document, so the
+    limits hold across worker processes.
+    """
+
+    STATE_ID = "scrape_jobs"
+    LOCK_SECONDS = 10
+    SCAN_LIMIT = 200
+    DURATION_TTL = 60
+    DURATION_SAMPLES = 50
+    QUEUE_SNAPSHOT_TTL = 5
+    DISPATCH_SORT = [("lane", 1), ("virtual_start", 1), ("created_at", 1)]
+    DISPATCH_PROJECTION = {"job_id": 1, "user_id": 1, "virtual_start": 1}
+    RUNNING_PROJECTION = {"user_id": 1, "lane": 1}
+    QUEUE_PROJECTION = {"lane": 1, "virtual_start": 1, "created_at": 1}
+    USER_QUEUED_SORT = [("virtual_finish", -1)]
+
+    def __init__(self, max_running=None, max_per_user=None, min_bulk_slots=None):
+        self.max_running = max_running or settings.SCHEDULER_MAX_RUNNING
+        self.max_per_user = max_per_user or settings.SCHEDULER_MAX_PER_USER
+        self.min_bulk_slots = settings.SCHEDULER_MIN_BULK_SLOTS if min_bulk_slots is None else min_bulk_slots
+        self.durations = {}
+        self.durations_at = 0.0
+        self.queue_snapshot = None
+        self.queue_snapshot_at = 0.0
+        self.queue_snapshot_lock = asyncio.Lock()
+
+    async def state_collection(self):
+        database = await get_database()
+        return database["scheduler_state"]
+
+    # The filters below are also explained by query_diagnostics, so the indexes
+    # are checked against the queries that actually run.
+
+    @staticmethod
+    def user_queued_filter(user_id: str) -> dict:
+        return {"user_id": user_id, "status": {"$in": ["pending", "processing"]}}
+
+    @staticmethod
+    def running_filter(now) -> dict:
+        return {"status": "processing", "lease_expires_at": {"$gte": now}}
+
+    @staticmethod
+    def dispatch_filter(claimable: dict, lane=None) -> dict:
+        if lane is None:
+            return claimable
+        return {"$and": [claimable, {"lane": lane}]}
+
+    @staticmethod
+    def durations_filter(lane) -> dict:
+        return {"status": "completed", "lane": lane, "started_at": {"$ne": None}}
+
+    @staticmethod
+    def job_cost(job_data: dict) -> int:
+        if job_data.get("scrape_mode") == "single_page":
+            return 1
+        return len(job_data.get("selected_pages") or []) or settings.SCHEDULER_FULL_SITE_COST
+
+    async def tag(self, collection, job_data: dict, weight: float = 1.0) -> dict:
+        """Lane and virtual start/finish tags for a job about to be enqueued"""
+        state = await (await self.state_collection()).find_one({"_id": self.STATE_ID}) or {}
+        virtual_time = state.get("virtual_time", 0.0)
+
+        previous = await collection.find_one(
+            self.user_queued_filter(job_data["user_id"]),
+            projection={"virtual_finish": 1},
+            sort=self.USER_QUEUED_SORT
+        )
+        user_finish = (previous or {}).get("virtual_finish") or 0.0
+
+        virtual_start = max(virtual_time, user_finish)
+        cost = self.job_cost(job_data)
+        return {
+            "lane": PRIORITY_LANE if job_data.get("scrape_mode") == "single_page" else BULK_LANE,
+            "cost": cost,
+            "weight": weight,
+            "virtual_start": virtual_start,
+            "virtual_finish": virtual_start + cost / max(weight, 0.01)
+        }
+
+    @asynccontextmanager
+    async def dispatch_lock(self, owner: str):
+        state = await self.state_collection()
+        now = datetime.utcnow()
+        try:
+            await state.find_one_and_update(
+                {"_id": self.STATE_ID, "$or": [{"locked_until": {"$lt": now}}, {"locked_until": None}]},
+                {"$set": {"lock_owner": owner, "locked_until": now + timedelta(seconds=self.LOCK_SECONDS)}},
+                upsert=True
+            )
+            acquired = True
+        except DuplicateKeyError:
+            acquired = False
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await state.update_one(
+                    {"_id": self.STATE_ID, "lock_owner": owner},
+                    {"$set": {"locked_until": None}}
+                )
+
+    async def running_counts(self, collection, now):
+        running = {"total": 0, "bulk": 0, "users": {}}
+        cursor = collection.find(self.running_filter(now), projection=self.RUNNING_PROJECTION)
+        async for job in cursor:
+            running["total"] += 1
+            if job.get("lane") == BULK_LANE:
+                running["bulk"] += 1
+            running["users"][job["user_id"]] = running["users"].get(job["user_id"], 0) + 1
+        return running
+
+    async def pick(self, collection, claimable: dict) -> Optional[dict]:
+        """The next claimable job to dispatch, or None if nothing may start now. Call under dispatch_lock."""
+        now = datetime.utcnow()
+        running = await self.running_counts(collection, now)
+        if running["total"] >= self.max_running:
+            return None
+
+        lanes = [None]
+        if running["bulk"] < self.min_bulk_slots:
+            lanes = [BULK_LANE, None]
+
+        for lane in lanes:
+            cursor = collection.find(
+                self.dispatch_filter(claimable, lane),
+                projection=self.DISPATCH_PROJECTION
+            ).sort(self.DISPATCH_SORT).limit(self.SCAN_LIMIT)
+
+            async for job in cursor:
+                if running["users"].get(job["user_id"], 0) < self.max_per_user:
+                    return job
+        return None
+
+    async def dispatched(self, job: dict):
+        """Advance the system virtual time to the start tag of the job just dispatched"""
+        if job.get("virtual_start") is None:
+            return
+        state = await self.state_collection()
+        await state.update_one(
+            {"_id": self.STATE_ID},
+            {"$max": {"virtual_time": job["virtual_start"]}}
+        )
+
+    async def average_durations(self, collection):
+        """Mean run time in seconds per lane over recent completed jobs, cached briefly"""
+        if time.monotonic() - self.durations_at < self.DURATION_TTL:
+            return self.durations
+
+        durations = {}
+        for lane in (PRIORITY_LANE, BULK_LANE):
+            cursor = collection.find(
+                self.durations_filter(lane),
+                projection={"started_at": 1, "completed_at": 1}
+            ).sort("completed_at", -1).limit(self.DURATION_SAMPLES)
+            samples = [
+                (job["completed_at"] - job["started_at"]).total_seconds()
+                async for job in cursor
+                if job.get("completed_at") and job.get("started_at")
+            ]
+            durations[lane] = sum(samples) / len(samples) if samples else settings.SCHEDULER_DEFAULT_JOB_SECONDS
+
+        self.durations = durations
+        self.durations_at = time.monotonic()
+        return durations
+
+    async def snapshot(self, collection, claimable: dict) -> dict:
+        """Dispatch order keys of the claimable jobs per lane and the running count, cached briefly.
+
+        Status polls read their position from this instead of counting the
+        queue on every request.
+        """
+        async with self.queue_snapshot_lock:
+            if time.monotonic() - self.queue_snapshot_at < self.QUEUE_SNAPSHOT_TTL:
+                return self.queue_snapshot
+
+            lanes = {PRIORITY_LANE: [], BULK_LANE: []}
+            cursor = collection.find(claimable, projection=self.QUEUE_PROJECTION).sort(self.DISPATCH_SORT)
+            async for queued in cursor:
+                lanes.setdefault(queued.get("lane", PRIORITY_LANE), []).append(
+                    (queued.get("virtual_start") or 0.0, queued["created_at"])
+                )
+            running = await self.running_counts(collection, datetime.utcnow())
+
+            self.queue_snapshot = {"lanes": lanes, "running": running["total"]}
+            self.queue_snapshot_at = time.monotonic()
+            return self.queue_snapshot
+
+    async def queue_position(self, collection, claimable: dict, job: dict) -> Optional[dict]:
+        """Position in the queue and an estimated start time for a pending job"""
+        if job.get("status") != "pending":
+            return None
+
+        now = datetime.utcnow()
+        lane = job.get("lane", PRIORITY_LANE)
+        snapshot = await self.snapshot(collection, claimable)
+        ahead = sum(len(keys) for other, keys in snapshot["lanes"].items() if other < lane)
+        ahead += bisect_left(
+            snapshot["lanes"].get(lane, []),
+            (job.get("virtual_start") or 0.0, job["created_at"])
+        )
+
+        free = max(0, self.max_running - snapshot["running"])
+        if ahead < free:
+            wait = 0.0
+        else:
+            durations = await self.average_durations(collection)
+            waves = (ahead - free) // self.max_running + 1
+            wait = waves * durations.get(lane, settings.SCHEDULER_DEFAULT_JOB_SECONDS)
+
+        return {
+            "queue_position": ahead + 1,
+            "estimated_start_at": (now + timedelta(seconds=wait)).isoformat()
+        }
+
+
+job_scheduler = JobScheduler()
@@ -1,5 +1,5 @@
 from typing import Dict, List, Set, Tuple
-from bs4 import BeautifulSoup
+from scraper.html_parser import make_soup
 import re
 from collections import Counter, defaultdict
 
@@ -34,7 +34,7 @@ class PatternRecognizer:
         }
 
     def recognize_patterns(self, html_content: str, css_analysis: Dict = None) -> Dict:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         
         patterns = {
             'ui_components': self._identify_ui_components(soup),
@@ -0,0 +1,222 @@
+import math
+import time
+import logging
+from dataclasses import dataclass
+from cachetools import TTLCache
+from config import settings
+from services.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    calls: int
+    period: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """A limit written as "calls/seconds", e.g. "100/60" """
+        calls, _, period = spec.strip().partition("/")
+        return cls(int(calls), int(period or 60))
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int = 0
+
+
+def parse_rules(spec: str) -> dict:
+    """Per-route limits written as "/path=calls/seconds,/other=calls/seconds" """
+    rules = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        path, _, limit = item.partition("=")
+        rules[path.strip()] = RateLimit.parse(limit)
+    return rules
+
+
+def sliding_estimate(previous: int, current: int, elapsed: float, period: int) -> float:
+    """Requests in the last `period` seconds, assuming the previous window's were spread evenly"""
+    return previous * (period - elapsed) / period + current
+
+
+class LocalBackend:
+    """Sliding-window counters in this process, in an LRU cache whose idle keys expire"""
+
+    shared = False
+
+    def __init__(self, max_keys=None, ttl=60):
+        # A key is only needed for its current and previous window, so it can
+        # expire once it has been idle for two of its periods.
+        self.windows = TTLCache(maxsize=max_keys or settings.RATE_LIMIT_MAX_KEYS, ttl=ttl * 2)
+
+    async def hit(self, key: str, limit: RateLimit, now: float):
+        window = int(now // limit.period)
+        state = self.windows.get(key)
+        if state is None or state[0] < window - 1:
+            previous, current = 0, 0
+        elif state[0] == window - 1:
+            previous, current = state[1], 0
+        else:
+            previous, current = state[2], state[1]
+
+        elapsed = now - window * limit.period
+        estimate = sliding_estimate(previous, current, elapsed, limit.period)
+        if estimate + 1 > limit.calls:
+            return False, estimate, previous, elapsed
+
+        self.windows[key] = (window, current + 1, previous)
+        return True, estimate + 1, previous, elapsed
+
+    async def close(self):
+        pass
+
+    def size(self):
+        return len(self.windows)
+
+
+class RedisBackend:
+    """Sliding-window counters in Redis, so limits hold across uvicorn workers and hosts"""
+
+    shared = True
+    PREFIX = "webunpack:ratelimit"
+    SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local estimate = previous * tonumber(ARGV[1]) + current
+if estimate + 1 > tonumber(ARGV[2]) then
+    return {0, tostring(estimate), previous}
+end
+current = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {1, tostring(previous * tonumber(ARGV[1]) + current), previous}
+"""
+
+    def __init__(self, client):
+        self.client = client
+        self.script = self.client.register_script(self.SCRIPT)
+
+    async def hit(self, key: str, limit: RateLimit, now: float):
+        window = int(now // limit.period)
+        elapsed = now - window * limit.period
+        allowed, estimate, previous = await self.script(
+            keys=[f"{self.PREFIX}:{{{key}}}:{window}", f"{self.PREFIX}:{{{key}}}:{window - 1}"],
+            args=[(limit.period - elapsed) / limit.period, limit.calls, limit.period * 2]
+        )
+        return bool(allowed), float(estimate), int(previous), elapsed
+
+    async def close(self):
+        await self.client.close()
+
+    def size(self):
+        return None
+
+
+def make_backend(url=None, max_period=60):
+    url = settings.RATE_LIMIT_URL if url is None else url
+    if not url:
+        return LocalBackend(ttl=max_period)
+    client = redis_client(url, "RATE_LIMIT_URL", "rate limits will be kept per process")
+    return RedisBackend(client) if client else LocalBackend(ttl=max_period)
+
+
+class RateLimiter:
+    """Per-client and per-user request limits using sliding-window counters.
+
+    Each key costs two counters and O(1) work per request: the estimate weights
+    the previous fixed window's count by how much of it still overlaps the
+    sliding window. Clients are limited per IP in middleware, and authenticated
+    users per clerk_id once their token has been verified. Either can have
+    per-route limits, matched by the longest path prefix. If a shared backend
+    is unreachable, limits fall back to this process.
+    """
+
+    def __init__(self, backend=None, default=None, routes=None, user_default=None, user_routes=None):
+        self.default = default or RateLimit.parse(settings.RATE_LIMIT_DEFAULT)
+        self.routes = parse_rules(settings.RATE_LIMIT_ROUTES) if routes is None else routes
+        self.user_default = user_default or RateLimit.parse(settings.RATE_LIMIT_USER_DEFAULT)
+        self.user_routes = parse_rules(settings.RATE_LIMIT_USER_ROUTES) if user_routes is None else user_routes
+
+        limits = [self.default, self.user_default, *self.routes.values(), *self.user_routes.values()]
+        max_period = max(limit.period for limit in limits)
+        self.backend = backend or make_backend(max_period=max_period)
+        self.fallback = LocalBackend(ttl=max_period) if self.backend.shared else self.backend
+        self.allowed = 0
+        self.rejected = 0
+        self.backend_errors = 0
+
+    @staticmethod
+    def match(path: str, routes: dict, default: RateLimit):
+        best = None
+        for prefix in routes:
+            if (path == prefix or path.startswith(prefix.rstrip("/") + "/")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return (best, routes[best]) if best else ("*", default)
+
+    async def hit(self, key: str, limit: RateLimit) -> Decision:
+        now = time.time()
+        try:
+            allowed, estimate, previous, elapsed = await self.backend.hit(key, limit, now)
+        except Exception as e:
+            self.backend_errors += 1
+            if self.backend_errors == 1 or self.backend_errors % 1000 == 0:
+                logger.warning(f"Rate limit backend failed, limiting per process: {e}")
+            allowed, estimate, previous, elapsed = await self.fallback.hit(key, limit, now)
+
+        if allowed:
+            self.allowed += 1
+            return Decision(True, limit.calls, max(0, math.floor(limit.calls - estimate)))
+
+        self.rejected += 1
+        return Decision(False, limit.calls, 0, self.retry_after(estimate, previous, elapsed, limit))
+
+    @staticmethod
+    def retry_after(estimate: float, previous: int, elapsed: float, limit: RateLimit) -> int:
+        """Seconds until the estimate drops enough to admit one more request"""
+        until_next_window = limit.period - elapsed
+        excess = estimate + 1 - limit.calls
+        if previous and excess <= previous * until_next_window / limit.period:
+            return max(1, math.ceil(excess * limit.period / previous))
+
+        # Past the window boundary this window's count becomes the one that decays
+        current = estimate - previous * until_next_window / limit.period
+        decay = limit.period * (1 - (limit.calls - 1) / current) if current > limit.calls - 1 else 0
+        return max(1, math.ceil(until_next_window + decay))
+
+    async def check_client(self, client_ip: str, path: str) -> Decision:
+        rule, limit = self.match(path, self.routes, self.default)
+        return await self.hit(f"ip:{client_ip}:{rule}", limit)
+
+    async def check_user(self, user_id: str, path: str) -> Decision:
+        rule, limit = self.match(path, self.user_routes, self.user_default)
+        return await self.hit(f"user:{user_id}:{rule}", limit)
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "keys": self.backend.size(),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "backend_errors": self.backend_errors
+        }
+
+
+def limit_headers(decision: Decision) -> dict:
+    headers = {
+        "X-RateLimit-Limit": str(decision.limit),
+        "X-RateLimit-Remaining": str(decision.remaining)
+    }
+    if not decision.allowed:
+        headers["Retry-After"] = str(decision.retry_after)
+    return headers
+
+
+rate_limiter = RateLimiter()
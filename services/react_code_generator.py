@@ -1,10 +1,11 @@
 import os
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import zipfile
 from datetime import datetime
 import re
+from scraper.archive import CompressionPolicy
 
 class ReactCodeGenerator:
     def __init__(self):
@@ -31,12 +32,13 @@ class ReactCodeGenerator:
         self._generate_tailwind_config(project_path)
         self._generate_readme(project_path, components_data)
         
-        zip_path = self._create_project_zip(project_path, job_id)
+        zip_path, compression = self._create_project_zip(project_path, job_id)
         
         return {
             'success': True,
             'project_path': str(project_path),
             'zip_path': zip_path,
+            'compression': compression,
             'files_generated': len(generated_files),
             'components_created': len(components_data.get('components', {})),
             'project_structure': project_structure
@@ -360,17 +362,18 @@ This project uses CSS Modules for component-scoped styling and Tailwind CSS for
         with open(project_path / 'README.md', 'w', encoding='utf-8') as f:
             f.write(readme_content)
 
-    def _create_project_zip(self, project_path: Path, job_id: str) -> str:
+    def _create_project_zip(self, project_path: Path, job_id: str) -> Tuple[str, Dict]:
         zip_path = f"app/static/{job_id}_react.zip"
+        compression = CompressionPolicy()
         
         with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for root, dirs, files in os.walk(project_path):
                 for file in files:
                     file_path = Path(root) / file
-                    arcname = file_path.relative_to(project_path.parent)
-                    zipf.write(file_path, arcname)
+                    arcname = file_path.relative_to(project_path.parent).as_posix()
+                    compression.write_file(zipf, file_path, arcname)
         
-        return zip_path
+        return zip_path, compression.summary()
 
     def _clean_code_block(self, code: str) -> str:
         """Clean code blocks from markdown formatting"""
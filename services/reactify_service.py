@@ -4,7 +4,7 @@ import logging
 from datetime import datetime
 import uuid
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from scraper.html_parser import make_soup
 
 from .general_scraper import GeneralScraper
 from .html_to_react_service import HTMLToReactService
@@ -98,7 +98,7 @@ class ReactifyService:
                 html_content = await response.text()
                 
                 css_content = ""
-                soup = BeautifulSoup(html_content, 'html.parser')
+                soup = make_soup(html_content)
                 
                 for link in soup.find_all('link', rel='stylesheet'):
                     if link.get('href'):
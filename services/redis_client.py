@@ -0,0 +1,21 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+REDIS_SCHEMES = ("redis://", "rediss://")
+
+
+def redis_client(url: str, setting: str, fallback: str):
+    """An asyncio Redis client for url, or None after logging why `fallback` applies instead.
+
+    `setting` names the config value the URL came from, for the warning.
+    """
+    if not url.startswith(REDIS_SCHEMES):
+        logger.warning(f"Unsupported {setting} scheme, {fallback}")
+        return None
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning(f"redis is not installed, {fallback}")
+        return None
+    return redis.from_url(url)
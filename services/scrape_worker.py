@@ -0,0 +1,184 @@
+import asyncio
+import os
+import socket
+import uuid
+import logging
+from config import settings
+from scraper.archive import ArchiveWriter
+from scraper.blocking import blocking_executor
+from services.job_queue import job_queue
+from services.job_events import event_bus
+from services.scraper_service import ScraperService
+from services.usage_service import usage_service
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeWorker:
+    """Claims scrape jobs from the job queue and runs up to `concurrency` of them at once.
+
+    Each running job heartbeats its lease; if the lease is lost the job is
+    cancelled, since another worker has reclaimed it. On shutdown the worker
+    stops claiming, gives running jobs a grace period and then releases their
+    leases so another worker can pick them up.
+    """
+
+    def __init__(self, concurrency=None, poll_interval=None):
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.poll_interval = poll_interval or settings.WORKER_POLL_INTERVAL
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.scraper_service = ScraperService()
+        self.running = {}
+        self.stopping = asyncio.Event()
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+
+    async def run(self):
+        logger.info(f"Scrape worker {self.worker_id} started with concurrency {self.concurrency}")
+        last_reclaim = 0.0
+        loop = asyncio.get_running_loop()
+
+        while not self.stopping.is_set():
+            if loop.time() - last_reclaim >= job_queue.lease_seconds / 2:
+                last_reclaim = loop.time()
+                await self.reclaim()
+
+            claimed = False
+            if len(self.running) < self.concurrency:
+                try:
+                    job = await job_queue.claim(self.worker_id)
+                except Exception as e:
+                    logger.error(f"Failed to claim job: {e}")
+                    job = None
+                if job:
+                    claimed = True
+                    task = asyncio.create_task(self.process(job))
+                    self.running[job["job_id"]] = task
+                    task.add_done_callback(lambda _, job_id=job["job_id"]: self.running.pop(job_id, None))
+
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        await self.drain()
+
+    def stop(self):
+        self.stopping.set()
+
+    async def drain(self):
+        if not self.running:
+            return
+        logger.info(f"Waiting for {len(self.running)} running job(s) before shutdown")
+        running = dict(self.running)
+        done, pending = await asyncio.wait(running.values(), timeout=settings.WORKER_SHUTDOWN_GRACE)
+        if not pending:
+            return
+
+        for task in pending:
+            task.cancel()
+        await asyncio.wait(pending)
+        for job_id, task in running.items():
+            if task in pending and await job_queue.release(job_id, self.worker_id):
+                logger.info(f"Released job {job_id} back to the queue")
+
+    async def reclaim(self):
+        try:
+            for job in await job_queue.reclaim_expired():
+                event_bus.publish(job["job_id"], "failed", {"user_id": job["user_id"], "error_message": "Processing error"})
+                await usage_service.decrement_usage(job["user_id"], job["scrape_mode"], job["job_id"])
+            removed = await blocking_executor.run(ArchiveWriter.remove_stale_parts, settings.STATIC_DIR)
+            if removed:
+                logger.info(f"Removed {removed} stale partial archive(s)")
+        except Exception as e:
+            logger.error(f"Failed to reclaim expired jobs: {e}")
+
+    async def process(self, job: dict):
+        job_id = job["job_id"]
+        scrape = asyncio.create_task(self.scrape(job))
+        heartbeat = asyncio.create_task(self.heartbeat(job_id, scrape))
+        try:
+            await scrape
+        except asyncio.CancelledError:
+            if not scrape.cancelled():
+                scrape.cancel()
+            raise
+        finally:
+            heartbeat.cancel()
+
+    async def heartbeat(self, job_id: str, scrape: asyncio.Task):
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            try:
+                held = await job_queue.heartbeat(job_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+                continue
+            if not held:
+                logger.warning(f"Lost lease on job {job_id}, cancelling it")
+                scrape.cancel()
+                return
+
+    async def scrape(self, job: dict):
+        job_id = job["job_id"]
+        user_id = job["user_id"]
+        selected_pages = job.get("selected_pages") or None
+        progress = event_bus.progress(job_id)
+        progress.stage("started", user_id=user_id, attempt=job.get("attempts", 1))
+
+        try:
+            logger.info(f"Starting scraping for job")
+
+            result = await self.scraper_service.scrape_site(
+                job["url"],
+                job["site_type"],
+                job["scrape_mode"],
+                selected_pages,
+                job_id=job_id,
+                progress=progress
+            )
+
+            if result and result.get("success"):
+                logger.info(f"Scraping completed")
+                pages_scraped = len(selected_pages) if selected_pages else 1
+                if await job_queue.complete(job_id, self.worker_id, {
+                    "file_path": result.get("file_path"),
+                    "download_url": f"/download/{job_id}",
+                    "pages_scraped": pages_scraped,
+                    "skipped_assets": result.get("skipped_assets", []),
+                    "asset_timings": result.get("asset_timings", []),
+                    "compression": result.get("compression"),
+                    "archive": result.get("archive")
+                }):
+                    progress.stage(
+                        "completed",
+                        download_url=f"/download/{job_id}",
+                        archive_bytes=(result.get("archive") or {}).get("size"),
+                        skipped_assets=len(result.get("skipped_assets", []))
+                    )
+                self.jobs_completed += 1
+            else:
+                logger.error(f"Scraping failed")
+                await self.fail(job, progress, "Scraping failed")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scraping error: {e}")
+            await self.fail(job, progress, "Processing error")
+
+    async def fail(self, job: dict, progress, error_message: str):
+        if await job_queue.fail(job["job_id"], self.worker_id, error_message):
+            progress.stage("failed", error_message=error_message)
+            await usage_service.decrement_usage(job["user_id"], job["scrape_mode"], job["job_id"])
+        self.jobs_failed += 1
+
+    def stats(self):
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": len(self.running),
+            "completed": self.jobs_completed,
+            "failed": self.jobs_failed
+        }
@@ -1,5 +1,5 @@
+import asyncio
 import uuid
-import os
 from scraper.framer_spider import FramerSpider
 from scraper.webflow_spider import WebflowSpider
 from scraper.wordpress_spider import WordPressSpider
@@ -14,6 +14,8 @@ from scraper.notion_spider import NotionSpider
 from scraper.rocket_spider import RocketSpider
 from services.general_scraper import GeneralScraper
 from services.file_service import FileService
+from scraper.archive import ArchiveWriter
+from scraper.progress import JobProgress
 
 
 class ScraperService:
@@ -53,7 +55,7 @@ class ScraperService:
                 raise ValueError(f"Unsupported site type: {site_type}")
             
             spider_class = spider_map[site_type]
-            spider = spider_class(url, "", "multi_page")  
+            spider = spider_class(url, None, "multi_page")
             
             discovered_pages = await spider.discover_pages()
 
@@ -70,17 +72,18 @@ class ScraperService:
                 "pages": []
             }
     
-    async def scrape_site(self, url: str, site_type: str, scrape_mode: str = "multi_page", selected_pages: list = None, job_id: str = None) -> dict:
+    async def scrape_site(self, url: str, site_type: str, scrape_mode: str = "multi_page", selected_pages: list = None, job_id: str = None, progress: JobProgress = None) -> dict:
         if job_id is None:
             job_id = str(uuid.uuid4())
         
-        output_dir = f"app/static/{job_id}"
-        os.makedirs(output_dir, exist_ok=True)
+        archive = None
+        progress = progress or JobProgress()
         
         try:
             if site_type == "general":
                 async with GeneralScraper() as scraper:
                     scraper.job_id = job_id
+                    scraper.progress = progress
                     result = await scraper.scrape_site(url, scrape_mode, selected_pages, job_id)
                     if result.get("success"):
                         page_count = len(selected_pages) if selected_pages else "all"
@@ -91,7 +94,10 @@ class ScraperService:
                             "message": f"Successfully scraped {mode_text} from general website",
                             "download_url": f"/download/{job_id}",
                             "file_path": f"app/static/{job_id}.zip",
-                            "job_id": job_id
+                            "job_id": job_id,
+                            "skipped_assets": result.get("skipped_assets", []),
+                            "compression": result.get("compression"),
+                            "archive": result.get("archive")
                         }
                     else:
                         return result
@@ -115,32 +121,46 @@ class ScraperService:
                 raise ValueError(f"Unsupported site type: {site_type}")
             
             spider_class = spider_map[site_type]
-            spider = spider_class(url, output_dir, scrape_mode, selected_pages)
+            zip_path = f"app/static/{job_id}.zip"
+            archive = ArchiveWriter(zip_path)
+            spider = spider_class(url, archive, scrape_mode, selected_pages)
+            spider.progress = progress
             
             await spider.scrape()
             
-            zip_path = f"app/static/{job_id}.zip"
-            if self.file_service.create_zip(output_dir, zip_path):
-                self.file_service.cleanup_directory(output_dir)
-                
-                page_count = len(selected_pages) if selected_pages else "all"
-                mode_text = "single page" if scrape_mode == "single_page" else f"{page_count} pages"
-
-                return {
-                    "success": True,
-                    "message": f"Successfully scraped {mode_text} from {site_type} site",
-                    "download_url": f"/download/{job_id}",
-                    "file_path": zip_path,
-                    "job_id": job_id
-                }
-            else:
+            progress.stage("archiving", entries=len(archive.entries))
+            
+            try:
+                await archive.finalize()
+            except OSError as e:
+                print(f"Error creating zip: {e}")
                 return {
                     "success": False,
                     "message": "Failed to create zip file"
                 }
+            
+            page_count = len(selected_pages) if selected_pages else "all"
+            mode_text = "single page" if scrape_mode == "single_page" else f"{page_count} pages"
+
+            return {
+                "success": True,
+                "message": f"Successfully scraped {mode_text} from {site_type} site",
+                "download_url": f"/download/{job_id}",
+                "file_path": zip_path,
+                "job_id": job_id,
+                "skipped_assets": spider.download_budget.skipped,
+                "asset_timings": spider.asset_timings,
+                "compression": archive.compression.summary(),
+                "archive": archive.metadata()
+            }
+        except asyncio.CancelledError:
+            if archive:
+                await archive.abort()
+            raise
         except Exception as e:
-            self.file_service.cleanup_directory(output_dir)
+            if archive:
+                await archive.abort()
             return {
                 "success": False,
                 "message": f"Scraping failed: {str(e)}"
-            }
\ No newline at end of file
+            }
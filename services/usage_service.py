@@ -1,32 +1,37 @@
 from datetime import datetime
+from typing import Optional
+from pymongo import ReturnDocument
 from database import get_database
 from models import User, UserUsage
+from services.user_state import user_state, COUNTER_FIELDS
+from services.job_events import event_bus
+
+USAGE_PROJECTION = {field: 1 for field in COUNTER_FIELDS}
+
 
 class UsageService:
+    # Job ids already refunded are kept on the user so a refund is applied once
+    # per job; only the most recent ones are needed to catch repeats.
+    REFUND_HISTORY = 100
+
     def __init__(self):
         self.single_page_limit = 25
         self.multi_page_limit = 10
         self.reactify_limit = 1
 
-    async def get_user_usage(self, user_id: str) -> UserUsage:
-        database = await get_database()
-        collection = database["users"]
-        
-        user = await collection.find_one({"clerk_id": user_id})
-        if not user:
-            return UserUsage(
-                single_page_used=0,
-                multi_page_used=0,
-                reactify_used=0,
-                can_scrape_single=True,
-                can_scrape_multi=True,
-                can_reactify=True
-            )
-        
+    def counter_for(self, scrape_mode: str):
+        if scrape_mode == "single_page":
+            return "single_page_count", self.single_page_limit
+        elif scrape_mode == "multi_page":
+            return "multi_page_count", self.multi_page_limit
+        return None, 0
+
+    def usage_from(self, user: Optional[dict]) -> UserUsage:
+        user = user or {}
         single_used = user.get("single_page_count", 0)
         multi_used = user.get("multi_page_count", 0)
         reactify_used = user.get("reactify_count", 0)
-        
+
         return UserUsage(
             single_page_used=single_used,
             multi_page_used=multi_used,
@@ -39,78 +44,115 @@ class UsageService:
             can_reactify=reactify_used < self.reactify_limit
         )
 
+    async def get_user_usage(self, user_id: str) -> UserUsage:
+        cached = user_state.get(user_id)
+        if cached:
+            return self.usage_from(cached.model_dump(include=set(COUNTER_FIELDS)))
+
+        database = await get_database()
+        collection = database["users"]
+
+        user = await collection.find_one({"clerk_id": user_id})
+        user_state.remember(user)
+        return self.usage_from(user)
+
     async def can_user_scrape(self, user_id: str, scrape_mode: str) -> bool:
         usage = await self.get_user_usage(user_id)
-        
+
         if scrape_mode == "single_page":
             return usage.can_scrape_single
         elif scrape_mode == "multi_page":
             return usage.can_scrape_multi
-        
+
         return False
 
     async def can_user_reactify(self, user_id: str) -> bool:
         usage = await self.get_user_usage(user_id)
         return usage.can_reactify
 
-    async def increment_usage(self, user_id: str, scrape_mode: str):
-        database = await get_database()
-        collection = database["users"]
-        
-        if scrape_mode == "single_page":
-            await collection.update_one(
-                {"clerk_id": user_id},
-                {
-                    "$inc": {"single_page_count": 1},
-                    "$set": {"updated_at": datetime.utcnow()}
-                },
-                upsert=True
-            )
-        elif scrape_mode == "multi_page":
-            await collection.update_one(
-                {"clerk_id": user_id},
-                {
-                    "$inc": {"multi_page_count": 1},
-                    "$set": {"updated_at": datetime.utcnow()}
-                },
-                upsert=True
-            )
-
-    async def increment_reactify_usage(self, user_id: str):
+    async def reserve(self, user_id: str, counter: str, limit: int) -> Optional[UserUsage]:
+        """Take one unit of quota if the user is under the limit, in a single conditional update.
+
+        Returns the usage after the increment, or None when the limit has been reached.
+        """
         database = await get_database()
         collection = database["users"]
-        
-        await collection.update_one(
-            {"clerk_id": user_id},
+
+        user = await collection.find_one_and_update(
+            {"clerk_id": user_id, "$or": [{counter: {"$lt": limit}}, {counter: {"$exists": False}}]},
             {
-                "$inc": {"reactify_count": 1},
+                "$inc": {counter: 1},
                 "$set": {"updated_at": datetime.utcnow()}
             },
+            projection=USAGE_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if user:
+            self.changed(user_id, user)
+            return self.usage_from(user)
+
+        if limit < 1 or await collection.find_one({"clerk_id": user_id}, projection={"_id": 1}):
+            return None
+
+        # Users are normally created at sign-in; seed one that isn't there yet.
+        result = await collection.update_one(
+            {"clerk_id": user_id},
+            {"$setOnInsert": {counter: 1, "updated_at": datetime.utcnow()}},
             upsert=True
         )
+        if result.upserted_id is not None:
+            user_state.invalidate(user_id)
+            return self.usage_from({counter: 1})
+        return await self.reserve(user_id, counter, limit)
 
-    async def decrement_usage(self, user_id: str, scrape_mode: str):
-        database = await get_database()
-        collection = database["users"]
-        
-        if scrape_mode == "single_page":
-            await collection.update_one(
-                {"clerk_id": user_id, "single_page_count": {"$gt": 0}},
-                {"$inc": {"single_page_count": -1}}
-            )
-        elif scrape_mode == "multi_page":
-            await collection.update_one(
-                {"clerk_id": user_id, "multi_page_count": {"$gt": 0}},
-                {"$inc": {"multi_page_count": -1}}
-            )
+    async def reserve_usage(self, user_id: str, scrape_mode: str) -> Optional[UserUsage]:
+        counter, limit = self.counter_for(scrape_mode)
+        if not counter:
+            return None
+        return await self.reserve(user_id, counter, limit)
+
+    async def reserve_reactify_usage(self, user_id: str) -> Optional[UserUsage]:
+        return await self.reserve(user_id, "reactify_count", self.reactify_limit)
 
-    async def decrement_reactify_usage(self, user_id: str):
+    async def refund(self, user_id: str, counter: str, job_id: str) -> bool:
+        """Give back one unit of quota for a job, at most once per job_id"""
         database = await get_database()
         collection = database["users"]
-        
-        await collection.update_one(
-            {"clerk_id": user_id, "reactify_count": {"$gt": 0}},
-            {"$inc": {"reactify_count": -1}}
+
+        user = await collection.find_one_and_update(
+            {"clerk_id": user_id, counter: {"$gt": 0}, "refunded_jobs": {"$ne": job_id}},
+            {
+                "$inc": {counter: -1},
+                "$push": {"refunded_jobs": {"$each": [job_id], "$slice": -self.REFUND_HISTORY}}
+            },
+            projection=USAGE_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
+        if user:
+            self.changed(user_id, user)
+        return user is not None
+
+    def changed(self, user_id: str, user: dict):
+        """Apply new counters to the cached user here and announce them to the other processes.
+
+        Refunds happen in workers, so without the notice the API would serve the
+        pre-refund usage until its cache entry expired.
+        """
+        counters = {field: user.get(field, 0) for field in COUNTER_FIELDS}
+        user_state.update(user_id, counters)
+        event_bus.notify("usage", {"user_id": user_id, **counters})
+
+    @staticmethod
+    def usage_changed(notice: dict):
+        user_state.update(notice["user_id"], {field: notice[field] for field in COUNTER_FIELDS if field in notice})
+
+    async def decrement_usage(self, user_id: str, scrape_mode: str, job_id: str) -> bool:
+        counter, _ = self.counter_for(scrape_mode)
+        if not counter:
+            return False
+        return await self.refund(user_id, counter, job_id)
+
+    async def decrement_reactify_usage(self, user_id: str, job_id: str) -> bool:
+        return await self.refund(user_id, "reactify_count", job_id)
 
 usage_service = UsageService()
@@ -0,0 +1,85 @@
+import logging
+from typing import Optional
+from cachetools import TTLCache
+from config import settings
+from models import User
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("single_page_count", "multi_page_count", "reactify_count")
+
+
+class UserStateCache:
+    """One cached User per clerk_id, holding both the profile and the usage counters.
+
+    Authentication loads the user here, and usage reads are served from the same
+    entry, so an authenticated request costs no extra database read. Writes that
+    change a user go to the database first and are then applied to the cached
+    entry (write-through). Usage changes made in other processes, such as
+    refunds from workers, arrive as "usage" notices on the event bus. Entries
+    also expire after a TTL, which bounds staleness when a notice is lost or the
+    event bus is local to one process.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.cache = TTLCache(
+            maxsize=maxsize or settings.USER_CACHE_MAX_USERS,
+            ttl=ttl or settings.USER_CACHE_TTL
+        )
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.invalidations = 0
+
+    def get(self, clerk_id: str) -> Optional[User]:
+        user = self.cache.get(clerk_id)
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user
+
+    def put(self, user: User) -> User:
+        self.cache[user.clerk_id] = user
+        return user
+
+    def remember(self, document: Optional[dict]) -> Optional[User]:
+        """Cache a user from its database document; documents that aren't a complete user are skipped"""
+        if not document:
+            return None
+        document = dict(document)
+        if "_id" in document:
+            document["id"] = str(document["_id"])
+        try:
+            return self.put(User(**document))
+        except ValueError as e:
+            logger.debug(f"Not caching incomplete user document: {e}")
+            return None
+
+    def update(self, clerk_id: str, fields: dict):
+        """Apply fields just written to the database to the cached user, if there is one"""
+        user = self.cache.get(clerk_id)
+        if user is None:
+            return
+        fields = {key: value for key, value in fields.items() if key in User.model_fields}
+        self.cache[clerk_id] = user.model_copy(update=fields)
+        self.writes += 1
+
+    def invalidate(self, clerk_id: str):
+        if self.cache.pop(clerk_id, None) is not None:
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.cache),
+            "max_size": self.cache.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "writes": self.writes,
+            "invalidations": self.invalidations
+        }
+
+
+user_state = UserStateCache()
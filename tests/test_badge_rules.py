@@ -0,0 +1,48 @@
+import unittest
+from scraper.badge_rules import get_badge_matcher
+from scraper.html_parser import make_soup
+
+
+def remaining_links(platform, markup):
+    soup = make_soup(markup)
+    get_badge_matcher(platform).remove_badges(soup)
+    return [link.get_text(strip=True) for link in soup.find_all('a')]
+
+
+class ShopifyBadgeTest(unittest.TestCase):
+    def test_powered_by_link_in_footer_is_removed(self):
+        markup = (
+            '<html><body><main><a href="/">Home</a></main>'
+            '<div class="site-footer"><p><a href="/pages/about">Powered by Shopify</a></p></div>'
+            '</body></html>'
+        )
+        self.assertEqual(remaining_links("shopify", markup), ["Home"])
+
+    def test_powered_by_link_outside_footer_is_kept(self):
+        markup = (
+            '<html><body><main><a href="/blog/migrating">Powered by Shopify: our migration story</a></main>'
+            '<footer><a href="/pages/contact">Contact</a></footer></body></html>'
+        )
+        self.assertEqual(
+            remaining_links("shopify", markup),
+            ["Powered by Shopify: our migration story", "Contact"]
+        )
+
+    def test_shopify_link_is_removed_anywhere(self):
+        markup = '<html><body><a href="https://www.shopify.com/?ref=store">Built with Shopify</a></body></html>'
+        self.assertEqual(remaining_links("shopify", markup), [])
+
+
+class FramerBadgeTest(unittest.TestCase):
+    def test_outer_badge_container_is_removed_once(self):
+        soup = make_soup(
+            '<html><body><div id="__framer-badge-container">'
+            '<div class="framer-badge"><a href="https://framer.com">Made with Framer</a></div>'
+            '</div><p>Content</p></body></html>'
+        )
+        self.assertEqual(get_badge_matcher("framer").remove_badges(soup), 1)
+        self.assertEqual(soup.body.get_text(), "Content")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from unittest import mock
+from bs4 import BeautifulSoup
+from scraper import html_parser
+from scraper.html_parser import make_soup, _is_mangled, FALLBACK_PARSER
+
+FULL_DOCUMENT = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Example</title>
+  <link rel="stylesheet" href="/css/site.css">
+</head>
+<body>
+  <nav><a href="/">Home</a> <a href="/about">About</a></nav>
+  <main>
+    <h1>Heading</h1>
+    <p class="lead">Some <strong>bold</strong> text.</p>
+    <img src="/images/hero.png" alt="Hero">
+    <ul><li>One</li><li>Two</li></ul>
+  </main>
+  <script src="/js/app.js"></script>
+</body>
+</html>"""
+
+
+def summary(soup):
+    """What the scrapers read from a tree: visible text and the tags that carry URLs"""
+    return {
+        "text": " ".join(soup.get_text(" ").split()),
+        "links": [a.get("href") for a in soup.find_all("a")],
+        "images": [img.get("src") for img in soup.find_all("img")],
+        "stylesheets": [link.get("href") for link in soup.find_all("link")],
+        "scripts": [script.get("src") for script in soup.find_all("script")],
+    }
+
+
+class MakeSoupParityTest(unittest.TestCase):
+    """make_soup with lxml must read documents the same way html.parser does"""
+
+    def assertSameDocument(self, markup):
+        lxml_soup = make_soup(markup, parser="lxml")
+        fallback_soup = make_soup(markup, parser=FALLBACK_PARSER)
+        self.assertEqual(summary(lxml_soup), summary(fallback_soup))
+        return lxml_soup, fallback_soup
+
+    def test_full_document(self):
+        lxml_soup, _ = self.assertSameDocument(FULL_DOCUMENT)
+        self.assertEqual(lxml_soup.builder.NAME, "lxml")
+        self.assertEqual(lxml_soup.title.string, "Example")
+        self.assertIsNotNone(lxml_soup.body)
+
+    def test_full_document_as_bytes(self):
+        self.assertSameDocument(FULL_DOCUMENT.encode("utf-8"))
+
+    def test_fragment_is_not_wrapped(self):
+        fragment = '<section class="card"><p>Card body</p></section>'
+        soup = make_soup(fragment, parser="lxml", fragment=True)
+        self.assertEqual(soup.builder.NAME, FALLBACK_PARSER)
+        self.assertIsNone(soup.find("html"))
+        self.assertIsNone(soup.find("body"))
+        self.assertEqual(str(soup), fragment)
+
+    def test_unclosed_tags(self):
+        markup = "<html><body><div><p>one<p>two<ul><li>three<li>four</ul><a href='/x'>link</body></html>"
+        lxml_soup, fallback_soup = self.assertSameDocument(markup)
+        self.assertEqual(len(lxml_soup.find_all("li")), 2)
+        self.assertEqual(len(fallback_soup.find_all("li")), 2)
+
+    def test_nul_in_text_uses_fallback_parser(self):
+        soup = make_soup("<html><body><p>a\x00b</p><p>c</p></body></html>", parser="lxml")
+        self.assertEqual(soup.builder.NAME, FALLBACK_PARSER)
+        self.assertEqual([p.get_text() for p in soup.find_all("p")], ["a\x00b", "c"])
+
+    def test_nul_in_bytes_keeps_the_encoding(self):
+        soup = make_soup(b"<html><body><p>a\x00b</p><p>c</p></body></html>", parser="lxml")
+        self.assertEqual(len(soup.find_all("p")), 2)
+        self.assertEqual(soup.find_all("p")[1].get_text(), "c")
+
+
+class MangledFallbackTest(unittest.TestCase):
+    def test_no_tags_parsed_from_markup_with_tags(self):
+        self.assertTrue(_is_mangled("<p>text</p>", BeautifulSoup("", FALLBACK_PARSER)))
+
+    def test_missing_body_that_markup_declares(self):
+        markup = "<html><body><p>text</p></body></html>"
+        self.assertTrue(_is_mangled(markup, BeautifulSoup("<p>text</p>", FALLBACK_PARSER)))
+        self.assertTrue(_is_mangled(markup.encode(), BeautifulSoup("<p>text</p>", FALLBACK_PARSER)))
+
+    def test_plain_text_and_good_trees_are_not_mangled(self):
+        self.assertFalse(_is_mangled("just text", BeautifulSoup("just text", FALLBACK_PARSER)))
+        self.assertFalse(_is_mangled(FULL_DOCUMENT, BeautifulSoup(FULL_DOCUMENT, "lxml")))
+
+    def test_mangled_lxml_tree_is_reparsed(self):
+        with mock.patch.object(html_parser, "_is_mangled", return_value=True) as check:
+            soup = make_soup(FULL_DOCUMENT, parser="lxml")
+        check.assert_called_once()
+        self.assertEqual(soup.builder.NAME, FALLBACK_PARSER)
+        self.assertEqual(summary(soup), summary(BeautifulSoup(FULL_DOCUMENT, FALLBACK_PARSER)))
+
+
+if __name__ == "__main__":
+    unittest.main()
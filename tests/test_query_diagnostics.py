@@ -0,0 +1,77 @@
+import unittest
+from query_diagnostics import HOT_QUERIES, declared_indexes, from_indexes, split_filter
+
+
+def estimate(query):
+    return from_indexes(query, declared_indexes(query["collection"]))
+
+
+class FromIndexesTest(unittest.TestCase):
+    """The static estimate used when explain is unavailable, checked against database.INDEXES"""
+
+    def test_hot_queries_use_an_index(self):
+        for query in HOT_QUERIES:
+            with self.subTest(query=query["name"]):
+                result = estimate(query)
+                self.assertFalse(result["collection_scan"])
+                self.assertFalse(result["in_memory_sort"])
+                self.assertTrue(result["indexes"])
+
+    def test_dispatch_uses_dispatch_order(self):
+        for name in ("next job to dispatch", "next bulk job to dispatch"):
+            query = next(query for query in HOT_QUERIES if query["name"] == name)
+            self.assertEqual(estimate(query)["indexes"], ["dispatch_order"])
+
+    def test_listing_is_covered(self):
+        query = next(query for query in HOT_QUERIES if query["name"] == "my jobs")
+        result = estimate(query)
+        self.assertTrue(result["covered"])
+        self.assertNotIn("FETCH", result["stages"])
+
+    def test_implicit_id_defeats_coverage(self):
+        query = next(query for query in HOT_QUERIES if query["name"] == "user's latest queued job")
+        self.assertFalse(estimate(query)["covered"])
+        self.assertTrue(estimate({**query, "projection": {"virtual_finish": 1, "_id": 0}})["covered"])
+
+    def test_unprojected_query_is_not_covered(self):
+        query = {"collection": "users", "filter": {"clerk_id": "user"}}
+        result = estimate(query)
+        self.assertEqual(result["indexes"], ["clerk_id_unique"])
+        self.assertFalse(result["covered"])
+        self.assertIn("FETCH", result["stages"])
+
+    def test_unindexed_filter_scans_the_collection(self):
+        result = estimate({"collection": "scrape_jobs", "filter": {"url": "https://example.com"}})
+        self.assertTrue(result["collection_scan"])
+        self.assertEqual(result["stages"], ["COLLSCAN"])
+
+    def test_unindexed_sort_sorts_in_memory(self):
+        result = estimate({
+            "collection": "scrape_jobs",
+            "filter": {"job_id": "job"},
+            "sort": [("pages_scraped", -1)]
+        })
+        self.assertFalse(result["collection_scan"])
+        self.assertTrue(result["in_memory_sort"])
+        self.assertEqual(result["stages"][0], "SORT")
+
+    def test_one_unindexed_or_branch_scans_the_collection(self):
+        result = estimate({
+            "collection": "scrape_jobs",
+            "filter": {"$or": [{"job_id": "job"}, {"url": "https://example.com"}]}
+        })
+        self.assertTrue(result["collection_scan"])
+        self.assertEqual(result["indexes"], ["job_id_unique"])
+
+
+class SplitFilterTest(unittest.TestCase):
+    def test_or_branches_keep_sibling_fields(self):
+        branches = split_filter({"user_id": "u", "$or": [{"status": "a"}, {"created_at": {"$lt": 1}}]})
+        self.assertEqual(branches, [({"user_id", "status"}, set()), ({"user_id"}, {"created_at"})])
+
+    def test_in_is_equality(self):
+        self.assertEqual(split_filter({"status": {"$in": ["a", "b"]}}), [({"status"}, set())])
+
+
+if __name__ == "__main__":
+    unittest.main()
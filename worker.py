@@ -0,0 +1,98 @@
+import asyncio
+import argparse
+import logging
+import multiprocessing
+import signal
+from config import settings
+from database import connect_to_mongo, close_mongo_connection
+from scraper.asset_store import asset_store
+from scraper.blocking import blocking_executor, loop_monitor
+from services.scrape_worker import ScrapeWorker
+from services.job_events import event_bus
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def worker_stats(worker: ScrapeWorker):
+    return {
+        "worker": worker.stats(),
+        "asset_store": asset_store.stats(),
+        "event_loop": loop_monitor.stats(),
+        "blocking_io": blocking_executor.stats(),
+        "event_bus": event_bus.stats()
+    }
+
+
+async def report_stats(worker: ScrapeWorker, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(f"Scrape worker stats: {worker_stats(worker)}")
+
+
+async def run_worker(concurrency: int):
+    await connect_to_mongo()
+    await asset_store.open()
+    await event_bus.start()
+    loop_monitor.start()
+    worker = ScrapeWorker(concurrency)
+    reporter = asyncio.create_task(report_stats(worker, settings.WORKER_STATS_INTERVAL))
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            pass
+
+    try:
+        await worker.run()
+    finally:
+        reporter.cancel()
+        await loop_monitor.stop()
+        await event_bus.stop()
+        await asset_store.close()
+        await close_mongo_connection()
+        blocking_executor.shutdown()
+        logger.info(f"Scrape worker stopped: {worker_stats(worker)}")
+
+
+def worker_process(concurrency: int):
+    try:
+        asyncio.run(run_worker(concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scrape job workers")
+    parser.add_argument("--processes", type=int, default=settings.WORKER_PROCESSES)
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY,
+                        help="Jobs each worker process runs at once")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        worker_process(args.concurrency)
+        return
+
+    processes = [
+        multiprocessing.Process(target=worker_process, args=(args.concurrency,), name=f"scrape-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()